@@ -0,0 +1,256 @@
+"""Benchmarki wszystkich publicznych metod managerów (pytest-benchmark).
+
+Rozmiary zbioru (liczba książek) ustawia zmienna BENCH_SIZES. Uruchomienie
+z katalogu projektu:
+
+    BENCH_SIZES=1000,10000,100000,1000000 python -m pytest \\
+        benchmarks/bench_managers.py --benchmark-json=wyniki.json
+    python -m benchmarks.compare baseline.json wyniki.json
+
+Operacje modyfikujące są mierzone w parach (np. wypożyczenie i zwrot), żeby
+stan biblioteki był taki sam przed każdą rundą.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.datasets import build_library  # noqa: E402
+
+SIZES = [
+    int(size) for size in os.environ.get("BENCH_SIZES", "1000,10000,100000").split(",")
+]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"n={size}")
+def library(request):
+    library = build_library(request.param)
+    bm = library.book_manager
+    lm = library.loan_manager
+    rm = library.reservation_manager
+
+    # Stałe punkty odniesienia wybrane deterministycznie z wygenerowanych danych.
+    library.probe_book = len(bm.books) // 2
+    library.probe_user = len(library.user_manager.users) // 2
+    library.free_book = next(
+        book_id
+        for book_id in range(len(bm.books), 0, -1)
+        if bm.books[book_id]["available"]
+    )
+    queued = next(iter(rm.book_queues))
+    library.queued_book = queued
+    library.queued_reservation = rm.book_queues[queued][0]
+    library.loaned_without_queue = next(
+        loan["book_id"]
+        for loan in lm.loans.values()
+        if loan["book_id"] not in rm.book_queues
+    )
+    return library
+
+
+# BookManager
+
+
+def test_get_book(benchmark, library):
+    benchmark(library.book_manager.get_book, library.probe_book)
+
+
+def test_find_books_by_title(benchmark, library):
+    benchmark(library.book_manager.find_books_by_title, "zamek noc")
+
+
+def test_find_books_by_author(benchmark, library):
+    benchmark(library.book_manager.find_books_by_author, "Autor 7")
+
+
+def test_list_books(benchmark, library):
+    benchmark(library.book_manager.list_books)
+
+
+def test_update_book(benchmark, library):
+    benchmark(library.book_manager.update_book, library.probe_book, new_year=2001)
+
+
+def test_add_and_remove_book(benchmark, library):
+    bm = library.book_manager
+
+    def run():
+        bm.remove_book(bm.add_book("Nowa", "Autor", "9780547928227"))
+
+    benchmark(run)
+
+
+def test_add_books_batch_1000(benchmark, library):
+    bm = library.book_manager
+    rows = [
+        {"title": f"Nowa {i}", "author": "Autor", "isbn": "9780547928227"}
+        for i in range(1000)
+    ]
+
+    def run():
+        for book_id in bm.add_books(rows):
+            bm.remove_book(book_id)
+
+    benchmark(run)
+
+
+# UserManager
+
+
+def test_get_user(benchmark, library):
+    benchmark(library.user_manager.get_user, library.probe_user)
+
+
+def test_find_users_by_name(benchmark, library):
+    benchmark(library.user_manager.find_users_by_name, "Użytkownik 7")
+
+
+def test_list_users(benchmark, library):
+    benchmark(library.user_manager.list_users)
+
+
+def test_update_user(benchmark, library):
+    benchmark(library.user_manager.update_user, library.probe_user, new_name="Jan")
+
+
+def test_add_and_remove_user(benchmark, library):
+    um = library.user_manager
+
+    def run():
+        um.remove_user(um.add_user("Nowy", "nowy@example.com"))
+
+    benchmark(run)
+
+
+def test_add_users_batch_1000(benchmark, library):
+    um = library.user_manager
+    rows = [{"name": f"Nowy {i}", "email": "nowy@example.com"} for i in range(1000)]
+
+    def run():
+        for user_id in um.add_users(rows):
+            um.remove_user(user_id)
+
+    benchmark(run)
+
+
+# LoanManager
+
+
+def test_loan_and_return_book(benchmark, library):
+    lm = library.loan_manager
+
+    def run():
+        lm.return_book(lm.loan_book(library.probe_user, library.free_book))
+
+    benchmark(run)
+
+
+def test_get_loan(benchmark, library):
+    benchmark(library.loan_manager.get_loan, 1)
+
+
+def test_list_loans(benchmark, library):
+    benchmark(library.loan_manager.list_loans)
+
+
+# ReservationManager
+
+
+def test_reserve_and_cancel(benchmark, library):
+    rm = library.reservation_manager
+
+    def run():
+        reservation_id = rm.reserve_book(
+            library.probe_user, library.loaned_without_queue
+        )
+        rm.cancel_reservation(reservation_id)
+        del rm.reservations[reservation_id]
+
+    benchmark(run)
+
+
+def test_reserve_ready_and_complete(benchmark, library):
+    rm = library.reservation_manager
+
+    def run():
+        reservation_id = rm.reserve_book(
+            library.probe_user, library.loaned_without_queue
+        )
+        rm.book_returned(library.loaned_without_queue)
+        rm.complete_reservation(reservation_id)
+        del rm.reservations[reservation_id]
+
+    benchmark(run)
+
+
+def test_get_reservation(benchmark, library):
+    benchmark(library.reservation_manager.get_reservation, 1)
+
+
+def test_list_reservations(benchmark, library):
+    benchmark(library.reservation_manager.list_reservations, "waiting")
+
+
+def test_get_user_reservations(benchmark, library):
+    benchmark(library.reservation_manager.get_user_reservations, library.probe_user)
+
+
+def test_get_book_reservations(benchmark, library):
+    benchmark(library.reservation_manager.get_book_reservations, library.queued_book)
+
+
+def test_get_position_in_queue(benchmark, library):
+    benchmark(
+        library.reservation_manager.get_position_in_queue,
+        library.queued_reservation,
+    )
+
+
+def test_book_returned(benchmark, library):
+    rm = library.reservation_manager
+    reservation = rm.reservations[library.queued_reservation]
+    benchmark(rm.book_returned, library.queued_book)
+    reservation["status"] = "waiting"
+
+
+def test_check_expired_reservations(benchmark, library):
+    benchmark(library.reservation_manager.check_expired_reservations)
+
+
+# CategoryManager
+
+
+def test_get_all_categories(benchmark, library):
+    benchmark(library.category_manager.get_all_categories)
+
+
+def test_get_books_by_category(benchmark, library):
+    benchmark(library.category_manager.get_books_by_category, "Poezja")
+
+
+def test_assign_and_remove_category_from_book(benchmark, library):
+    cm = library.category_manager
+    book_id = library.probe_book
+    category = next(
+        category
+        for category in cm.get_all_categories()
+        if category not in library.book_manager.books[book_id]["categories"]
+    )
+
+    def run():
+        cm.assign_category(book_id, category)
+        cm.remove_category_from_book(book_id, category)
+
+    benchmark(run)
+
+
+def test_add_and_remove_category(benchmark, library):
+    cm = library.category_manager
+
+    def run():
+        cm.add_category("Nowa kategoria")
+        cm.remove_category("Nowa kategoria")
+
+    benchmark(run)
@@ -0,0 +1,63 @@
+"""Zapytania query_books z planerem indeksów wobec pełnego skanu.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.book_query --books 100000
+"""
+
+import argparse
+import time
+
+from benchmarks.datasets import build_library
+from src.book_index import book_filter
+
+QUERIES = (
+    {"author": "Autor 123", "year_from": 2000},
+    {"title": "zamek noc", "category": "Poezja", "available": True},
+    {"category": "Fantasy", "year_from": 2020, "year_to": 2021},
+    {"title": "wiatr", "available": False},
+    {"available": True},
+)
+
+
+def measure(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    bm = build_library(args.books).book_manager
+    start = time.perf_counter()
+    bm.build_indexes()
+    print(
+        f"budowa indeksów dla {args.books} książek: {time.perf_counter() - start:.2f} s"
+    )
+
+    for filters in QUERIES:
+        matches = book_filter(filters)
+        scan_time, expected = measure(
+            lambda: [book for book in bm.books.values() if matches(book)], args.repeat
+        )
+        query_time, result = measure(lambda: bm.query_books(**filters), args.repeat)
+        assert result == expected
+        limit_time, _ = measure(
+            lambda: bm.query_books(limit=10, **filters), args.repeat
+        )
+        index, estimate = bm.explain_query(**filters)
+        limit_index, _ = bm.explain_query(limit=10, **filters)
+        print(
+            f"{filters}: {len(result)} wyników, indeks {index} (~{estimate}), "
+            f"skan {scan_time * 1000:.2f} ms, query_books {query_time * 1000:.2f} ms, "
+            f"limit=10 ({limit_index}) {limit_time * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
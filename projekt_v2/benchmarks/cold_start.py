@@ -0,0 +1,114 @@
+"""Porównanie czasu startu: pełny odczyt JSON vs. migawka binarna przez mmap.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.cold_start --records 1000000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src.binary_snapshot import SnapshotStorage, write_snapshot
+from src.book_manager import BookManager
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.user_manager import UserManager
+from src.utils import load_data, save_data
+
+
+def generate_tables(records, seed=42):
+    rng = random.Random(seed)
+    books = {
+        book_id: {
+            "title": f"Tytuł {book_id} {rng.randrange(10**6)}",
+            "author": f"Autor {rng.randrange(records // 10 + 1)}",
+            "isbn": f"{rng.randrange(10**12, 10**13)}",
+            "year": rng.randrange(1900, 2025),
+            "available": True,
+            "categories": [],
+        }
+        for book_id in range(1, records + 1)
+    }
+    users = {
+        user_id: {"name": f"Użytkownik {user_id}", "email": f"u{user_id}@example.com"}
+        for user_id in range(1, records + 1)
+    }
+    loans = {}
+    for loan_id in range(1, records // 2 + 1):
+        book_id = rng.randrange(1, records + 1)
+        books[book_id]["available"] = False
+        loans[loan_id] = {
+            "user_id": rng.randrange(1, records + 1),
+            "book_id": book_id,
+            "returned": False,
+        }
+    return {"books": books, "users": users, "loans": loans, "reservations": {}}
+
+
+def start_from_json(path, probe_ids):
+    started = time.perf_counter()
+    data = load_data(path)
+    book_manager = BookManager()
+    user_manager = UserManager()
+    book_manager.books = {int(key): value for key, value in data["books"].items()}
+    user_manager.users = {int(key): value for key, value in data["users"].items()}
+    loan_manager = LoanManager(book_manager, user_manager)
+    loan_manager.loans = {int(key): value for key, value in data["loans"].items()}
+    ReservationManager(book_manager, user_manager)
+    ready = time.perf_counter()
+    for book_id in probe_ids:
+        book_manager.get_book(book_id)
+    return ready - started, time.perf_counter() - ready
+
+
+def start_from_snapshot(path, probe_ids):
+    started = time.perf_counter()
+    storage = SnapshotStorage(path)
+    book_manager = BookManager(storage)
+    user_manager = UserManager(storage)
+    LoanManager(book_manager, user_manager, storage)
+    ReservationManager(book_manager, user_manager, storage)
+    ready = time.perf_counter()
+    for book_id in probe_ids:
+        book_manager.get_book(book_id)
+    first_reads = time.perf_counter() - ready
+    storage.close()
+    return ready - started, first_reads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--probes", type=int, default=1000)
+    args = parser.parse_args()
+
+    tables = generate_tables(args.records)
+    probe_ids = random.Random(7).sample(range(1, args.records + 1), args.probes)
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "library.json")
+        snapshot_path = os.path.join(directory, "library.snap")
+        save_data(
+            {name: {str(k): v for k, v in t.items()} for name, t in tables.items()},
+            json_path,
+        )
+        write_snapshot(snapshot_path, tables)
+
+        print(f"rekordów na tabelę: {args.records}")
+        for label, path, start in (
+            ("json", json_path, start_from_json),
+            ("mmap", snapshot_path, start_from_snapshot),
+        ):
+            startup, reads = start(path, probe_ids)
+            size = os.path.getsize(path) / 2**20
+            print(
+                f"{label:>5}: plik {size:8.1f} MiB, start {startup * 1000:9.1f} ms, "
+                f"{args.probes} pierwszych odczytów {reads * 1000:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
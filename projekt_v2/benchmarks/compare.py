@@ -0,0 +1,71 @@
+"""Porównanie wyników pytest-benchmark z zapisanym punktem odniesienia.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.compare baseline.json wyniki.json --threshold 0.10
+
+Kod wyjścia 1 oznacza, że co najmniej jeden benchmark zwolnił o więcej niż
+zadany próg.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_results(path, stat="median"):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        benchmark["fullname"]: benchmark["stats"][stat]
+        for benchmark in data["benchmarks"]
+    }
+
+
+def compare(baseline, current, threshold=0.10):
+    # Zwraca wiersze (nazwa, czas bazowy, czas bieżący, zmiana, regresja).
+    rows = []
+    for name in sorted(baseline.keys() & current.keys()):
+        change = current[name] / baseline[name] - 1
+        rows.append((name, baseline[name], current[name], change, change > threshold))
+    return rows
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e3), ("µs", 1e6)):
+        if seconds * scale >= 1:
+            return f"{seconds * scale:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--stat", default="median", choices=("min", "mean", "median"))
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline, args.stat)
+    current = load_results(args.current, args.stat)
+    rows = compare(baseline, current, args.threshold)
+
+    width = max((len(row[0]) for row in rows), default=0)
+    for name, before, after, change, regression in rows:
+        marker = "REGRESJA" if regression else ""
+        print(
+            f"{name:<{width}} {format_time(before):>10} {format_time(after):>10} "
+            f"{change:+8.1%} {marker}"
+        )
+    for name in sorted(baseline.keys() - current.keys()):
+        print(f"{name}: brak w bieżących wynikach")
+    for name in sorted(current.keys() - baseline.keys()):
+        print(f"{name}: nowy benchmark")
+
+    regressions = sum(1 for row in rows if row[4])
+    print(f"\nRegresje powyżej {args.threshold:.0%}: {regressions}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Deterministyczny generator syntetycznej biblioteki dla benchmarków."""
+
+import random
+
+from src.library import Library
+
+CATEGORIES = (
+    "Fantasy",
+    "Kryminał",
+    "Literatura faktu",
+    "Poezja",
+    "Reportaż",
+    "Science fiction",
+    "Historia",
+    "Dla dzieci",
+)
+WORDS = (
+    "zamek",
+    "noc",
+    "miasto",
+    "droga",
+    "wojna",
+    "morze",
+    "ogród",
+    "czas",
+    "cień",
+    "kamień",
+    "wiatr",
+    "dom",
+)
+
+
+def generate_books(size, seed=42):
+    rng = random.Random(seed)
+    authors = size // 10 + 1
+    for i in range(size):
+        yield {
+            "title": f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {i}",
+            "author": f"Autor {rng.randrange(authors)}",
+            "isbn": str(rng.randrange(10**12, 10**13)),
+            "year": rng.randrange(1900, 2025),
+        }
+
+
+def generate_users(size, seed=42):
+    rng = random.Random(seed + 1)
+    for i in range(size):
+        yield {
+            "name": f"Użytkownik {rng.randrange(size)} {i}",
+            "email": f"user{i}@example.com",
+        }
+
+
+def build_library(size, seed=42):
+    # size książek, size/10 użytkowników, 10% książek wypożyczonych, połowa
+    # z nich z kolejką rezerwacji; każda książka ma 1-2 kategorie.
+    rng = random.Random(seed + 2)
+    library = Library()
+    bm, um = library.book_manager, library.user_manager
+
+    book_ids = bm.add_books(generate_books(size, seed))
+    user_ids = um.add_users(generate_users(max(size // 10, 2), seed))
+
+    for category in CATEGORIES:
+        library.category_manager.add_category(category)
+    for book_id in book_ids:
+        bm.books[book_id]["categories"] = rng.sample(CATEGORIES, rng.randrange(1, 3))
+
+    loaned = rng.sample(book_ids, size // 10)
+    for book_id in loaned:
+        library.loan_manager.loan_book(rng.choice(user_ids), book_id)
+    for book_id in loaned[: len(loaned) // 2]:
+        library.reservation_manager.reserve_book(rng.choice(user_ids), book_id)
+    return library
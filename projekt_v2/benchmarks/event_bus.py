@@ -0,0 +1,61 @@
+"""Narzut szyny zdarzeń na publikację i na operacje managerów.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.event_bus --events 1000000
+"""
+
+import argparse
+import time
+
+from src.book_manager import BookManager
+from src.events import BookAdded, EventBus
+
+
+def per_event(function, events):
+    started = time.perf_counter()
+    function(events)
+    return (time.perf_counter() - started) / events * 1e6
+
+
+def publish_loop(subscribers):
+    def run(events):
+        bus = EventBus()
+        for _ in range(subscribers):
+            bus.subscribe(BookAdded, lambda event: None)
+        publish = bus.publish
+        book = {}
+        for book_id in range(events):
+            publish(BookAdded(book_id, book))
+
+    return run
+
+
+def add_books(event_bus):
+    def run(events):
+        manager = BookManager(event_bus=event_bus)
+        for i in range(events):
+            manager.add_book("Tytuł", "Autor", "9780547928227")
+
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    subscribed = EventBus()
+    subscribed.subscribe(BookAdded, lambda event: None)
+    for label, function in (
+        ("publish, 0 odbiorców", publish_loop(0)),
+        ("publish, 1 odbiorca", publish_loop(1)),
+        ("publish, 4 odbiorców", publish_loop(4)),
+        ("add_book bez szyny", add_books(None)),
+        ("add_book z szyną", add_books(subscribed)),
+    ):
+        print(f"{label:<24} {per_event(function, args.events):.3f} µs/zdarzenie")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Szybkość odtwarzania stanu biblioteki z dziennika zdarzeń.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.event_replay --events 500000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+
+from src.event_log import EventLog, rebuild
+from src.library import Library
+
+
+def record_workload(library, events, seed=42):
+    # Mieszanka operacji: dodawanie książek i użytkowników, wypożyczenia,
+    # zwroty z kolejkami rezerwacji.
+    rng = random.Random(seed)
+    bm, um = library.book_manager, library.user_manager
+    bm.add_books(
+        {"title": f"Tom {i}", "author": f"Autor {i % 500}", "isbn": "1"}
+        for i in range(events // 10)
+    )
+    um.add_users(
+        {"name": f"Czytelnik {i}", "email": f"c{i}@example.com"}
+        for i in range(events // 20)
+    )
+    books, users = len(bm.books), len(um.users)
+    active = {}
+    while library.log.offset < events:
+        book_id = rng.randrange(1, books + 1)
+        user_id = rng.randrange(1, users + 1)
+        if book_id in active:
+            if rng.random() < 0.3:
+                try:
+                    library.reserve_book(user_id, book_id)
+                except ValueError:
+                    pass
+            else:
+                library.return_book(active.pop(book_id))
+        elif bm.books[book_id]["available"]:
+            active[book_id] = library.loan_book(user_id, book_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        library = Library()
+        library.log = EventLog(
+            directory, library.event_bus, checkpoint_every=10**12, fsync_every=None
+        )
+        record_workload(library, args.events)
+        library.log.flush()
+        total = library.log.offset
+
+        start = time.perf_counter()
+        rebuild(directory)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{total} zdarzeń od zera: {elapsed:.2f} s, {total / elapsed:,.0f} zdarzeń/s"
+        )
+
+        library.log.checkpoint(total // 2)
+        start = time.perf_counter()
+        rebuild(directory)
+        elapsed = time.perf_counter() - start
+        print(f"od punktu kontrolnego w połowie: {elapsed:.2f} s")
+        library.log.close()
+
+
+if __name__ == "__main__":
+    main()
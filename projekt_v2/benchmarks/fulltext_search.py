@@ -0,0 +1,56 @@
+"""Wyszukiwanie pełnotekstowe BM25 z przycinaniem WAND.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.fulltext_search --books 1000000
+"""
+
+import argparse
+import time
+
+from benchmarks.datasets import generate_books
+from src.book_manager import BookManager
+
+QUERIES = ("zamek", "noc wiatr", "dom autor", "kamień 123456", "autor 4242 droga")
+
+
+def measure(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    bm = BookManager()
+    bm.add_books(generate_books(args.books))
+    start = time.perf_counter()
+    index = bm._fulltext()
+    print(
+        f"budowa indeksu dla {args.books} książek: {time.perf_counter() - start:.1f} s"
+    )
+
+    for text in QUERIES:
+        wand_time, result = measure(lambda: index.search(text, args.top), args.repeat)
+        # Limit równy liczbie książek wyłącza przycinanie: liczymy wynik
+        # każdej pasującej książki.
+        full_time, ranked = measure(lambda: index.search(text, len(index)), 1)
+        assert [round(s, 9) for _, s in result] == [
+            round(s, 9) for _, s in ranked[: args.top]
+        ]
+        scan_time, _ = measure(lambda: bm.find_books_by_title(text), 1)
+        print(
+            f"{text!r}: {len(ranked)} pasujących, top-{args.top} WAND "
+            f"{wand_time * 1000:.1f} ms, bez przycinania {full_time * 1000:.1f} ms, "
+            f"find_books_by_title {scan_time * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
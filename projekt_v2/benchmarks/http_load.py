@@ -0,0 +1,121 @@
+"""Test obciążeniowy serwera HTTP/JSON (src.server).
+
+Serwer działa w osobnym procesie, klienci to połączenia asyncio z
+utrzymywanym połączeniem (keep-alive). Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.http_load --books 100000 --requests 200000
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import time
+
+from benchmarks.datasets import build_library
+from src.server import LibraryService, serve
+
+
+def run_server(size, port, ready):
+    service = LibraryService(build_library(size))
+
+    async def main():
+        server = await serve(service, port=port)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def encode_request(method, path, payload=None):
+    body = b"" if payload is None else json.dumps(payload).encode()
+    return (
+        f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode() + body
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = int(head.lower().split(b"content-length: ")[1].split(b"\r\n")[0])
+    await reader.readexactly(length)
+
+
+async def client(port, requests, depth, make_request):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    sent = 0
+    while sent < requests:
+        window = min(depth, requests - sent)
+        writer.write(b"".join(make_request() for _ in range(window)))
+        for _ in range(window):
+            await read_response(reader)
+        sent += window
+    writer.close()
+
+
+async def measure(port, connections, requests, depth, make_request):
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            client(port, requests // connections, depth, make_request)
+            for _ in range(connections)
+        )
+    )
+    return (requests // connections * connections) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=run_server, args=(args.books, args.port, ready), daemon=True
+    )
+    server.start()
+    ready.wait()
+
+    rng = random.Random(1)
+    users = max(args.books // 10, 2)
+
+    def get_book():
+        return encode_request("GET", f"/books/{rng.randrange(1, args.books + 1)}")
+
+    def loan_book():
+        payload = {
+            "user_id": rng.randrange(1, users + 1),
+            "book_id": rng.randrange(1, args.books + 1),
+        }
+        return encode_request("POST", "/loans", payload)
+
+    def batch():
+        operations = [
+            {"path": f"/books/{rng.randrange(1, args.books + 1)}"} for _ in range(50)
+        ]
+        return encode_request("POST", "/batch", operations)
+
+    try:
+        for label, make_request, depth, factor in (
+            ("GET /books/{id}, bez potokowania", get_book, 1, 1),
+            ("GET /books/{id}, potok 16", get_book, 16, 1),
+            ("POST /loans, potok 16", loan_book, 16, 1),
+            ("POST /batch (50 operacji), potok 4", batch, 4, 50),
+        ):
+            total = args.requests // factor
+            rate = asyncio.run(
+                measure(args.port, args.connections, total, depth, make_request)
+            )
+            print(
+                f"{label:<40} {rate:>10.0f} żądań/s  ({rate * factor:.0f} operacji/s)"
+            )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
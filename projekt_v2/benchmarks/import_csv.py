@@ -0,0 +1,65 @@
+"""Przepustowość importu katalogu z pliku CSV.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.import_csv --rows 1000000 --workers 4
+"""
+
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from src.book_manager import BookManager
+from src.importer import import_books
+
+
+def write_catalog(path, rows, seed=42):
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "author", "isbn", "year"])
+        for i in range(rows):
+            writer.writerow(
+                [
+                    f"Tytuł {i}",
+                    f"Autor {rng.randrange(rows // 10 + 1)}",
+                    str(rng.randrange(10**12, 10**13)),
+                    rng.randrange(1900, 2025),
+                ]
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--checksum", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.csv")
+        write_catalog(path, args.rows)
+
+        started = time.perf_counter()
+        report = import_books(
+            path,
+            BookManager(),
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            checksum=args.checksum,
+        )
+        elapsed = time.perf_counter() - started
+
+    print(
+        f"wczytano {report.rows_read}, zaimportowano {report.imported}, "
+        f"odrzucono {report.rejected} w {elapsed:.2f} s "
+        f"({report.rows_read / elapsed / 1000:.0f} tys. wierszy/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
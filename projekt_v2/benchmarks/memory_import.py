@@ -0,0 +1,37 @@
+"""Zużycie pamięci przez managerów i alokacje podczas importu CSV.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.memory_import --rows 100000
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks.import_csv import write_catalog
+from src.book_manager import BookManager
+from src.importer import import_books
+from src.memory import format_memory_report, memory_report, trace_allocations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    book_manager = BookManager()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.csv")
+        write_catalog(path, args.rows)
+        with trace_allocations(top=args.top) as allocations:
+            import_books(path, book_manager, workers=0)
+
+    print(allocations.format())
+    print()
+    print(format_memory_report(memory_report(books=book_manager)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Nagrywanie i odtwarzanie mieszanego obciążenia managerów.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.replay record slad.ndjson.gz --size 100000 --calls 200000
+    python -m benchmarks.replay replay slad.ndjson.gz --size 100000 --speed 0
+
+Obie komendy budują tę samą deterministyczną bibliotekę (benchmarks.datasets),
+więc ślad nagrany na jednej jest poprawny dla drugiej. Ślad z działającego
+procesu nagrywa się przez src.workload.WorkloadRecorder.
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.datasets import WORDS, build_library
+from src.workload import WorkloadRecorder, replay
+
+
+def managers_of(library):
+    return {
+        "books": library.book_manager,
+        "users": library.user_manager,
+        "loans": library.loan_manager,
+        "reservations": library.reservation_manager,
+        "categories": library.category_manager,
+    }
+
+
+def run_mix(library, calls, seed=7):
+    # Przybliżony ruch biblioteki: dużo wyszukiwań, wypożyczenia i zwroty,
+    # rezerwacje zajętych książek oraz okresowe sprawdzanie wygasłych.
+    rng = random.Random(seed)
+    bm = library.book_manager
+    lm = library.loan_manager
+    rm = library.reservation_manager
+    users = len(library.user_manager.users)
+    books = len(bm.books)
+    open_loans = [loan_id for loan_id, loan in lm.loans.items() if not loan["returned"]]
+
+    for i in range(calls):
+        roll = rng.random()
+        user_id = rng.randrange(1, users + 1)
+        book_id = rng.randrange(1, books + 1)
+        try:
+            if roll < 0.30:
+                bm.get_book(book_id)
+            elif roll < 0.40:
+                bm.find_books_by_title(rng.choice(WORDS))
+            elif roll < 0.45:
+                bm.find_books_by_author(f"Autor {rng.randrange(books // 10 + 1)}")
+            elif roll < 0.65:
+                open_loans.append(lm.loan_book(user_id, book_id))
+            elif roll < 0.80 and open_loans:
+                lm.return_book(open_loans.pop(rng.randrange(len(open_loans))))
+            elif roll < 0.95:
+                rm.reserve_book(user_id, book_id)
+            elif roll < 0.99:
+                rm.get_user_reservations(user_id)
+            else:
+                rm.check_expired_reservations()
+        except ValueError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=("record", "replay"))
+    parser.add_argument("trace")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--speed", type=float, default=0.0)
+    args = parser.parse_args()
+
+    library = build_library(args.size)
+    if args.command == "record":
+        started = time.perf_counter()
+        with WorkloadRecorder(args.trace).attach(**managers_of(library)) as recorder:
+            run_mix(library, args.calls)
+        elapsed = time.perf_counter() - started
+        print(f"nagrano {recorder.calls} wywołań w {elapsed:.2f} s do {args.trace}")
+    else:
+        report = replay(args.trace, speed=args.speed or None, **managers_of(library))
+        print(report.format())
+
+
+if __name__ == "__main__":
+    main()
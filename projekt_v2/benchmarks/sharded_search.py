@@ -0,0 +1,58 @@
+"""Skalowanie wyszukiwania w ShardedBookManager względem liczby shardów.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.sharded_search --books 200000 --shards 1 2 4 8 16
+
+Wyniki mają sens tylko na maszynie z co najmniej tyloma rdzeniami, ile
+jest shardów; BookManager w jednym procesie jest punktem odniesienia.
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.datasets import generate_books
+from src.book_manager import BookManager
+from src.sharding import ShardedBookManager
+
+
+def measure(manager, queries, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in queries:
+            manager.find_books_by_author(query)
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=200_000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    books = list(generate_books(args.books))
+    # Zapytania selektywne: pojedynczy autor trafia w ok. 10 książek.
+    queries = [f"Autor {i}1" for i in range(10)]
+
+    baseline = BookManager()
+    baseline.add_books(books)
+    reference = measure(baseline, queries, args.repeat)
+    print(f"rdzenie: {os.cpu_count()}")
+    print(f"BookManager: {reference * 1000:.2f} ms/zapytanie")
+
+    for shards in args.shards:
+        with ShardedBookManager(shards=shards) as manager:
+            manager.add_books(books)
+            elapsed = measure(manager, queries, args.repeat)
+        print(
+            f"{shards:>3} shardów: {elapsed * 1000:.2f} ms/zapytanie, "
+            f"przyspieszenie {reference / elapsed:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Pamięć prywatna procesów roboczych: kopia katalogu a katalog współdzielony.
+
+Uruchomienie z katalogu projektu (Linux, korzysta z /proc):
+
+    python -m benchmarks.shared_catalog --books 100000 --workers 8
+"""
+
+import argparse
+import multiprocessing
+import time
+
+from benchmarks.datasets import generate_books
+from src.book_manager import BookManager
+from src.memory import format_size
+from src.shared_catalog import SharedCatalog, SharedCatalogReader
+
+
+def private_memory():
+    # Strony prywatne procesu (USS); strony pamięci współdzielonej się nie liczą.
+    total = 0
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1]) * 1024
+    return total
+
+
+def copy_worker(books, ready, done):
+    before = private_memory()
+    book_manager = BookManager()
+    book_manager.add_books(books)
+    book_manager.find_books_by_author("autor 1")
+    ready.put(private_memory() - before)
+    done.wait()
+
+
+def shared_worker(name, ready, done):
+    before = private_memory()
+    reader = SharedCatalogReader(name)
+    reader.find_books_by_author("autor 1")
+    ready.put(private_memory() - before)
+    done.wait()
+    reader.close()
+
+
+def run_workers(target, args, workers):
+    ready = multiprocessing.Queue()
+    done = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=target, args=(*args, ready, done))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    total = sum(ready.get() for _ in processes)
+    done.set()
+    for process in processes:
+        process.join()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    books = list(generate_books(args.books))
+    copies = run_workers(copy_worker, (books,), args.workers)
+    print(f"kopie w procesach: {format_size(copies)} łącznie")
+
+    book_manager = BookManager()
+    book_manager.add_books(books)
+    with SharedCatalog(book_manager) as catalog:
+        start = time.perf_counter()
+        catalog.publish()
+        elapsed = time.perf_counter() - start
+        shared = run_workers(shared_worker, (catalog.name,), args.workers)
+        size = catalog._segments[-1].size
+    print(
+        f"katalog współdzielony: {format_size(size)} raz, "
+        f"{format_size(shared)} prywatnie łącznie, publikacja {elapsed * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Przepustowość wsadowych walidatorów z src.utils.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.validators --rows 2000000
+"""
+
+import argparse
+import random
+import time
+
+from src.utils import validate_emails, validate_isbns
+
+
+def generate_rows(rows, seed=42):
+    rng = random.Random(seed)
+    isbns = [
+        str(rng.randrange(10**12, 10**13)) if i % 2 else str(rng.randrange(10**10))
+        for i in range(rows)
+    ]
+    emails = [f"user{rng.randrange(10**9)}@example.com" for _ in range(rows)]
+    return isbns, emails
+
+
+def measure(function, rows):
+    started = time.perf_counter()
+    function(rows)
+    return len(rows) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    isbns, emails = generate_rows(args.rows)
+    for label, function, rows in (
+        ("validate_isbns (suma kontrolna)", validate_isbns, isbns),
+        ("validate_emails", validate_emails, emails),
+    ):
+        print(f"{label:>32}: {measure(function, rows) / 1e6:5.2f} mln wierszy/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+import io
+import json
+import mmap
+import os
+import struct
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+
+# Układ pliku:
+#   nagłówek (MAGIC, offset i długość katalogu)
+#   sterta: teksty UTF-8 i JSON wskazywane z wierszy
+#   tabele: wiersze o stałej szerokości, posortowane po ID
+#   katalog: JSON z opisem tabel, zbiorów i liczników ID
+MAGIC = b"LIBSNAP\x01"
+HEADER = struct.Struct("<8sQQ")
+HEAP_OFFSET = HEADER.size
+
+MISSING_INT = -(2**63)
+MISSING_LENGTH = 0xFFFFFFFF
+MISSING_BOOL = 2
+
+FIELD_FORMATS = {"str": "QI", "json": "QI", "int": "q", "bool": "B"}
+
+SCHEMAS = {
+    "books": (
+        ("title", "str"),
+        ("author", "str"),
+        ("isbn", "str"),
+        ("year", "int"),
+        ("available", "bool"),
+        ("categories", "json"),
+    ),
+    "users": (("name", "str"), ("email", "str")),
+    "loans": (("user_id", "int"), ("book_id", "int"), ("returned", "bool")),
+    "reservations": (
+        ("user_id", "int"),
+        ("book_id", "int"),
+        ("status", "str"),
+        ("reservation_date", "str"),
+        ("notification_sent", "bool"),
+    ),
+}
+
+
+def _row_struct(fields):
+    # Każdy wiersz: ID, kolumny ze schematu i kolumna "extra" na pozostałe pola.
+    formats = "".join(FIELD_FORMATS[kind] for _, kind in fields)
+    return struct.Struct("<q" + formats + "QI")
+
+
+class _HeapWriter:
+    def __init__(self, file):
+        self.file = file
+        self.offset = 0
+
+    def append(self, data):
+        offset = self.offset
+        self.file.write(data)
+        self.offset += len(data)
+        return offset, len(data)
+
+
+def _fits(kind, value):
+    # Wartości, których kolumna nie odda wiernie, trafiają do kolumny "extra".
+    if kind == "int":
+        return isinstance(value, int) and not isinstance(value, bool)
+    if kind == "bool":
+        return isinstance(value, bool)
+    if kind == "str":
+        return isinstance(value, str)
+    return True
+
+
+def _encode_row(row_struct, fields, record_id, record, heap):
+    values = [record_id]
+    stored = set()
+    for name, kind in fields:
+        value = record.get(name)
+        if name not in record or not _fits(kind, value):
+            if kind == "int":
+                values.append(MISSING_INT)
+            elif kind == "bool":
+                values.append(MISSING_BOOL)
+            else:
+                values.extend((0, MISSING_LENGTH))
+            continue
+
+        stored.add(name)
+        if kind == "int":
+            values.append(value)
+        elif kind == "bool":
+            values.append(int(value))
+        elif kind == "str":
+            values.extend(heap.append(value.encode("utf-8")))
+        else:
+            values.extend(heap.append(json.dumps(value).encode("utf-8")))
+
+    extra = {key: value for key, value in record.items() if key not in stored}
+    if extra:
+        values.extend(heap.append(json.dumps(extra, ensure_ascii=False).encode()))
+    else:
+        values.extend((0, MISSING_LENGTH))
+    return row_struct.pack(*values)
+
+
+def _encode_snapshot(f, tables, sets, next_ids):
+    next_ids = next_ids or {}
+    directory = {"version": 1, "tables": {}, "sets": {}}
+
+    f.write(HEADER.pack(MAGIC, 0, 0))
+    heap = _HeapWriter(f)
+
+    encoded_tables = {}
+    for name, records in tables.items():
+        fields = SCHEMAS.get(name, ())
+        row_struct = _row_struct(fields)
+        rows = bytearray()
+        count = 0
+        for record_id in sorted(records):
+            rows += _encode_row(row_struct, fields, record_id, records[record_id], heap)
+            count += 1
+        encoded_tables[name] = (fields, row_struct, rows, count, records)
+
+    position = HEAP_OFFSET + heap.offset
+    padding = -position % 8
+    f.write(b"\0" * padding)
+    position += padding
+
+    for name, (fields, row_struct, rows, count, records) in encoded_tables.items():
+        f.write(rows)
+        directory["tables"][name] = {
+            "offset": position,
+            "count": count,
+            "fields": [list(field) for field in fields],
+            "next_id": next_ids.get(name, max(records, default=0) + 1),
+        }
+        position += len(rows)
+
+    for name, values in (sets or {}).items():
+        directory["sets"][name] = sorted(values)
+
+    directory_bytes = json.dumps(directory, ensure_ascii=False).encode("utf-8")
+    f.write(directory_bytes)
+    f.seek(0)
+    f.write(HEADER.pack(MAGIC, position, len(directory_bytes)))
+
+
+def write_snapshot(path, tables, sets=None, next_ids=None):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        _encode_snapshot(f, tables, sets, next_ids)
+    os.replace(tmp_path, path)
+
+
+def snapshot_bytes(tables, sets=None, next_ids=None):
+    # Ta sama migawka w pamięci, np. do skopiowania do pamięci współdzielonej.
+    buffer = io.BytesIO()
+    _encode_snapshot(buffer, tables, sets, next_ids)
+    return buffer.getvalue()
+
+
+class SnapshotReader:
+    def __init__(self, buffer):
+        self.buffer = buffer
+        magic, directory_offset, directory_length = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Nieprawidłowy format pliku migawki")
+        self.directory = json.loads(
+            bytes(buffer[directory_offset : directory_offset + directory_length])
+        )
+
+    def table_names(self):
+        return list(self.directory["tables"])
+
+    def table(self, name):
+        info = self.directory["tables"].get(name)
+        if info is None:
+            return None
+        return TableView(self.buffer, info)
+
+    def set_values(self, name):
+        return self.directory["sets"].get(name, [])
+
+    def next_id(self, name):
+        info = self.directory["tables"].get(name)
+        return info["next_id"] if info else 1
+
+
+class TableView:
+    def __init__(self, buffer, info):
+        self.buffer = buffer
+        self.offset = info["offset"]
+        self.count = info["count"]
+        self.fields = [tuple(field) for field in info["fields"]]
+        self.row_struct = _row_struct(self.fields)
+        self.row_size = self.row_struct.size
+        self._id_struct = struct.Struct("<q")
+
+        # Pozycja każdej kolumny w rozpakowanej krotce wiersza.
+        self._columns = {}
+        position = 1
+        for name, kind in self.fields:
+            self._columns[name] = (position, kind)
+            position += len(FIELD_FORMATS[kind])
+
+    def id_at(self, index):
+        return self._id_struct.unpack_from(
+            self.buffer, self.offset + index * self.row_size
+        )[0]
+
+    def find(self, record_id):
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.id_at(middle) < record_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self.id_at(low) == record_id:
+            return low
+        return -1
+
+    def _heap(self, offset, length):
+        start = HEAP_OFFSET + offset
+        return bytes(self.buffer[start : start + length])
+
+    def _value(self, row, position, kind):
+        if kind == "int":
+            return row[position]
+        if kind == "bool":
+            return bool(row[position])
+        offset, length = row[position], row[position + 1]
+        if length == MISSING_LENGTH:
+            return None
+        data = self._heap(offset, length)
+        if kind == "str":
+            return data.decode("utf-8")
+        return json.loads(data)
+
+    def _is_missing(self, row, position, kind):
+        if kind == "int":
+            return row[position] == MISSING_INT
+        if kind == "bool":
+            return row[position] == MISSING_BOOL
+        return row[position + 1] == MISSING_LENGTH
+
+    def row(self, index):
+        return self.row_struct.unpack_from(
+            self.buffer, self.offset + index * self.row_size
+        )
+
+    def record(self, index):
+        row = self.row(index)
+        record = {}
+        for name, (position, kind) in self._columns.items():
+            if not self._is_missing(row, position, kind):
+                record[name] = self._value(row, position, kind)
+        offset, length = row[-2], row[-1]
+        if length != MISSING_LENGTH:
+            record.update(json.loads(self._heap(offset, length)))
+        return record
+
+    def has_column(self, name):
+        return name in self._columns
+
+    def column(self, index, name):
+        row = self.row(index)
+        position, kind = self._columns[name]
+        if self._is_missing(row, position, kind):
+            return None
+        return self._value(row, position, kind)
+
+
+class SnapshotTable(MutableMapping):
+    def __init__(self, view):
+        self.view = view
+        self._loaded = {}
+        self._new_keys = set()
+        self._deleted = set()
+
+    def _index(self, key):
+        if self.view is None or not isinstance(key, int):
+            return -1
+        return self.view.find(key)
+
+    def __getitem__(self, key):
+        if key in self._loaded:
+            return self._loaded[key]
+        if key in self._deleted:
+            raise KeyError(key)
+        index = self._index(key)
+        if index < 0:
+            raise KeyError(key)
+        # Rekord materializujemy przy pierwszym dostępie i zapamiętujemy,
+        # żeby zmiany wprowadzane w miejscu były widoczne.
+        record = self.view.record(index)
+        self._loaded[key] = record
+        return record
+
+    def __setitem__(self, key, value):
+        if key not in self._loaded and key not in self._deleted:
+            if self._index(key) < 0:
+                self._new_keys.add(key)
+        self._deleted.discard(key)
+        self._loaded[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._loaded.pop(key, None)
+        if key in self._new_keys:
+            self._new_keys.discard(key)
+        else:
+            self._deleted.add(key)
+
+    def __contains__(self, key):
+        if key in self._loaded:
+            return True
+        if key in self._deleted:
+            return False
+        return self._index(key) >= 0
+
+    def __iter__(self):
+        count = self.view.count if self.view is not None else 0
+        for index in range(count):
+            key = self.view.id_at(index)
+            if key not in self._deleted:
+                yield key
+        yield from sorted(self._new_keys)
+
+    def __len__(self):
+        count = self.view.count if self.view is not None else 0
+        return count - len(self._deleted) + len(self._new_keys)
+
+    def items(self):
+        count = self.view.count if self.view is not None else 0
+        for index in range(count):
+            key = self.view.id_at(index)
+            if key in self._deleted:
+                continue
+            if key in self._loaded:
+                yield key, self._loaded[key]
+            else:
+                yield key, self.view.record(index)
+        for key in sorted(self._new_keys):
+            yield key, self._loaded[key]
+
+    def values(self):
+        for _, record in self.items():
+            yield record
+
+    def select(self, field, value):
+        # Porównanie odbywa się na kolumnie, bez dekodowania całych rekordów.
+        result = []
+        view = self.view
+        columnar = view is not None and view.has_column(field)
+        for key, record in self._loaded.items():
+            if record.get(field) == value:
+                result.append((key, record))
+        if view is not None:
+            for index in range(view.count):
+                key = view.id_at(index)
+                if key in self._deleted or key in self._loaded:
+                    continue
+                if columnar:
+                    if view.column(index, field) == value:
+                        result.append((key, view.record(index)))
+                else:
+                    record = view.record(index)
+                    if record.get(field) == value:
+                        result.append((key, record))
+        result.sort(key=lambda item: item[0])
+        return result
+
+
+class SnapshotStorage:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.reader = SnapshotReader(self._mmap)
+
+    def table(self, name, indexes=()):
+        return SnapshotTable(self.reader.table(name))
+
+    def set(self, name):
+        return set(self.reader.set_values(name))
+
+    def next_id(self, name):
+        return self.reader.next_id(name)
+
+    @contextmanager
+    def transaction(self):
+        yield self
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
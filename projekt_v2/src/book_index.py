@@ -0,0 +1,252 @@
+import bisect
+
+FILTERS = ("title", "author", "category", "year_from", "year_to", "available")
+NGRAM = 3
+# Sprawdzenie rekordu w skanie kosztuje ok. 10 razy więcej niż zebranie
+# i posortowanie ID kandydata z indeksu (benchmarks.book_query).
+SCAN_COST = 10
+_NO_IDS = frozenset()
+_EMPTY_ENTRY = ("", "", None, frozenset())
+
+
+def _ngrams(text):
+    return {text[i : i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _intersection(sets):
+    # Od najmniejszego zbioru, więc każdy kolejny krok tylko go zawęża.
+    sets = sorted(sets, key=len)
+    result = set(sets[0])
+    for ids in sets[1:]:
+        if not result:
+            break
+        result &= ids
+    return result
+
+
+def _union(sets):
+    return set().union(*sets)
+
+
+def _check_names(filters):
+    for name in filters:
+        if name not in FILTERS:
+            raise ValueError(f"Nieznany filtr: {name}")
+
+
+def _indexed_year(year):
+    return year if isinstance(year, int) else None
+
+
+class BookIndex:
+    # Indeksy pomocnicze query_books: n-gramy tytułów i autorów (szukanie
+    # podciągów), kategorie i lata wydania. BookManager aktualizuje je przy
+    # każdym zapisie książki. Kandydaci z indeksu i tak są sprawdzani na
+    # rekordzie, więc indeks może wskazać za dużo książek, ale nigdy za mało.
+
+    def __init__(self, books=()):
+        self._entries = {}
+        self._text = {"title": {}, "author": {}}
+        self._categories = {}
+        self._years = {}
+        self._year_keys = []  # posortowane lata obecne w _years
+        for book_id, book in books:
+            self.update(book_id, book)
+
+    def update(self, book_id, book):
+        entry = (
+            book["title"].lower(),
+            book["author"].lower(),
+            _indexed_year(book.get("year")),
+            frozenset(book.get("categories") or ()),
+        )
+        old = self._entries.get(book_id, _EMPTY_ENTRY)
+        if entry != old:
+            self._apply(book_id, old, entry)
+            self._entries[book_id] = entry
+
+    def remove(self, book_id):
+        old = self._entries.pop(book_id, None)
+        if old is not None:
+            self._apply(book_id, old, _EMPTY_ENTRY)
+
+    def _apply(self, book_id, old, new):
+        # Zmieniamy tylko to, co się zmieniło: zwrot książki czy nowa
+        # kategoria nie przelicza n-gramów tytułu.
+        for position, field in ((0, "title"), (1, "author")):
+            if old[position] != new[position]:
+                postings = self._text[field]
+                old_grams = _ngrams(old[position])
+                new_grams = _ngrams(new[position])
+                for gram in old_grams - new_grams:
+                    self._discard(postings, gram, book_id)
+                for gram in new_grams - old_grams:
+                    ids = postings.get(gram)
+                    if ids is None:
+                        postings[gram] = {book_id}
+                    else:
+                        ids.add(book_id)
+
+        if old[2] != new[2]:
+            if old[2] is not None and self._discard(self._years, old[2], book_id):
+                self._year_keys.remove(old[2])
+            if new[2] is not None:
+                if new[2] not in self._years:
+                    self._years[new[2]] = set()
+                    bisect.insort(self._year_keys, new[2])
+                self._years[new[2]].add(book_id)
+
+        for category in old[3] - new[3]:
+            self._discard(self._categories, category, book_id)
+        for category in new[3] - old[3]:
+            self._categories.setdefault(category, set()).add(book_id)
+
+    @staticmethod
+    def _discard(postings, key, book_id):
+        # Zwraca True, gdy zniknął ostatni element klucza.
+        ids = postings.get(key)
+        if ids is None:
+            return False
+        ids.discard(book_id)
+        if not ids:
+            del postings[key]
+            return True
+        return False
+
+    def options(self, filters):
+        # (szacowana liczba kandydatów, nazwa, zbiory ID, sposób ich łączenia)
+        # dla każdego warunku, który ma tu indeks.
+        options = []
+        for field in ("title", "author"):
+            needle = filters.get(field)
+            if needle is not None and len(needle) >= NGRAM:
+                postings = self._text[field]
+                sets = [postings.get(gram, _NO_IDS) for gram in _ngrams(needle.lower())]
+                # Liczność przecięcia szacujemy najrzadszym n-gramem.
+                options.append((min(map(len, sets)), field, sets, _intersection))
+
+        category = filters.get("category")
+        if category is not None:
+            ids = self._categories.get(category, _NO_IDS)
+            options.append((len(ids), "category", [ids], _intersection))
+
+        year_from, year_to = filters.get("year_from"), filters.get("year_to")
+        if year_from is not None or year_to is not None:
+            keys = self._year_keys
+            low = 0 if year_from is None else bisect.bisect_left(keys, year_from)
+            high = len(keys) if year_to is None else bisect.bisect_right(keys, year_to)
+            sets = [self._years[year] for year in keys[low:high]]
+            options.append((sum(map(len, sets)), "year", sets, _union))
+        return options
+
+
+class AvailabilityIndex:
+    # Zbiory ID książek dostępnych i wypożyczonych. Liczności są O(1),
+    # a zbiory służą planerowi jako indeks warunku available.
+
+    def __init__(self, books=()):
+        self.available = set()
+        self.unavailable = set()
+        for book_id, book in books:
+            self.update(book_id, book)
+
+    def update(self, book_id, book):
+        if book.get("available") is False:
+            self.available.discard(book_id)
+            self.unavailable.add(book_id)
+        else:
+            self.unavailable.discard(book_id)
+            self.available.add(book_id)
+
+    def remove(self, book_id):
+        self.available.discard(book_id)
+        self.unavailable.discard(book_id)
+
+    def options(self, filters):
+        available = filters.get("available")
+        if available is None:
+            return []
+        ids = self.available if available else self.unavailable
+        return [(len(ids), "available", [ids], _intersection)]
+
+
+def plan(indexes, filters, limit=None, total=None):
+    # Zwraca (indeks, szacowana liczba kandydatów, funkcja zwracająca
+    # kandydatów) dla najbardziej selektywnego indeksu albo
+    # ("scan", None, None), gdy żaden warunek nie ma indeksu albo skan
+    # jest tańszy.
+    _check_names(filters)
+    options = [option for index in indexes for option in index.options(filters)]
+    if not options:
+        return "scan", None, None
+    estimate, name, sets, combine = min(options, key=lambda option: option[0])
+    if total is not None and _scan_is_cheaper(estimate, total, limit):
+        return "scan", None, None
+    return name, estimate, lambda: combine(sets)
+
+
+def _scan_is_cheaper(estimate, total, limit):
+    # Kandydatów z indeksu trzeba najpierw zebrać i posortować, a skan
+    # w kolejności ID przy limit kończy się średnio po limit * total /
+    # estimate książkach. Słaby warunek (np. available=True) taniej więc
+    # sprawdzić na kolejnych rekordach.
+    if limit is None:
+        return 2 * estimate > total
+    return limit * total * SCAN_COST < estimate * estimate
+
+
+def book_filter(filters):
+    # Predykat sprawdzający wszystkie warunki na rekordzie książki.
+    _check_names(filters)
+
+    checks = []
+    title = filters.get("title")
+    if title is not None:
+        title = title.lower()
+        checks.append(lambda book: title in book["title"].lower())
+    author = filters.get("author")
+    if author is not None:
+        author = author.lower()
+        checks.append(lambda book: author in book["author"].lower())
+    category = filters.get("category")
+    if category is not None:
+        checks.append(lambda book: category in (book.get("categories") or ()))
+    year_from, year_to = filters.get("year_from"), filters.get("year_to")
+    if year_from is not None or year_to is not None:
+        low = float("-inf") if year_from is None else year_from
+        high = float("inf") if year_to is None else year_to
+        checks.append(
+            lambda book: _indexed_year(book.get("year")) is not None
+            and low <= book["year"] <= high
+        )
+    available = filters.get("available")
+    if available is not None:
+        checks.append(lambda book: book.get("available") == available)
+
+    def matches(book):
+        for check in checks:
+            if not check(book):
+                return False
+        return True
+
+    return matches
+
+
+def run_query(books, indexes, filters, limit=None):
+    if limit is not None and limit < 1:
+        raise ValueError("Limit musi być dodatni")
+    matches = book_filter(filters)
+    total = len(books) if indexes else None
+    _, _, candidates = plan(indexes, filters, limit, total)
+    if candidates is None:
+        rows = books.items()
+    else:
+        rows = ((book_id, books.get(book_id)) for book_id in sorted(candidates()))
+
+    results = []
+    for book_id, book in rows:
+        if book is not None and matches(book):
+            results.append(book)
+            if len(results) == limit:
+                break
+    return results
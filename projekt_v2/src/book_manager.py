@@ -1,7 +1,53 @@
+from datetime import datetime
+
+from src.book_index import AvailabilityIndex, BookIndex, plan, run_query
+from src.events import BookAdded, BookRemoved, BookUpdated
+from src.fulltext import FullTextIndex
+from src.ids import IdAllocator, id_property
+from src.storage import MemoryStorage
+
+
 class BookManager:
-    def __init__(self):
-        self.books = {}
-        self.next_id = 1
+    next_id = id_property()
+
+    def __init__(self, storage=None, event_bus=None, ids=None):
+        self.storage = storage if storage is not None else MemoryStorage()
+        self.books = self.storage.table("books", indexes=("isbn",))
+        # Usunięte książki czekają tu na Vacuum, który sprząta odwołania
+        # do nich (wypożyczenia, rezerwacje) i dopiero wtedy je zapomina.
+        self.tombstones = self.storage.table("removed_books")
+        self.ids = ids if ids is not None else IdAllocator()
+        self.ids.advance_to(self.storage.next_id("books"))
+        self.event_bus = event_bus
+        self._init_indexes()
+
+    def _init_indexes(self):
+        # Indeksy wyszukiwania budowane przez build_indexes() albo przy
+        # pierwszym użyciu, potem aktualizowane przy każdym zapisie książki.
+        self._indexes = []
+        self._query_index = None
+        self._availability_index = None
+        self._fulltext_index = None
+
+    def _index_book(self, book_id, book):
+        for index in self._indexes:
+            index.update(book_id, book)
+
+    def _unindex_book(self, book_id):
+        for index in self._indexes:
+            index.remove(book_id)
+
+    def _reindex_book(self, book_id):
+        if book_id in self.books:
+            self._index_book(book_id, self.books[book_id])
+        else:
+            self._unindex_book(book_id)
+
+    def save_book(self, book_id, book):
+        # Zapis rekordu zmienionego przez innych managerów (wypożyczenia,
+        # kategorie), żeby indeksy wyszukiwania widziały zmianę.
+        self.books[book_id] = book
+        self._index_book(book_id, book)
 
     def add_book(self, title, author, isbn, year=None):
 
@@ -19,36 +65,146 @@ class BookManager:
         if year is not None:
             book["year"] = year
 
-        book_id = self.next_id
+        book_id = self.ids.allocate()
         self.books[book_id] = book
-        self.next_id += 1
+        self._index_book(book_id, book)
+
+        if self.event_bus is not None:
+            self.event_bus.publish(BookAdded(book_id, book))
 
         return book_id
 
+    def add_books(self, books):
+        # Wsadowe dodawanie już zwalidowanych wierszy, np. z importera CSV.
+        book_ids = []
+        with self.storage.transaction():
+            for row in books:
+                book = {
+                    "title": row["title"],
+                    "author": row["author"],
+                    "isbn": row["isbn"],
+                    "available": True,
+                }
+                if row.get("year") is not None:
+                    book["year"] = row["year"]
+
+                book_id = self.ids.allocate()
+                self.books[book_id] = book
+                self._index_book(book_id, book)
+                book_ids.append(book_id)
+
+        if self.event_bus is not None:
+            publish = self.event_bus.publish
+            for book_id in book_ids:
+                publish(BookAdded(book_id, self.books[book_id]))
+
+        return book_ids
+
     def remove_book(self, book_id):
         if book_id not in self.books:
             raise ValueError(f"Książka o ID {book_id} nie istnieje")
+        deleted_at = datetime.now().isoformat()
+        self.tombstones[book_id] = {
+            "deleted_at": deleted_at,
+            "record": self.books[book_id],
+        }
         del self.books[book_id]
+        self._unindex_book(book_id)
+
+        if self.event_bus is not None:
+            self.event_bus.publish(BookRemoved(book_id, deleted_at))
 
     def get_book(self, book_id):
         if book_id not in self.books:
             raise ValueError(f"Książka o ID {book_id} nie istnieje")
         return self.books[book_id]
 
-    def find_books_by_title(self, title):
+    def find_books_by_title(self, title, available=None):
+        if available is not None:
+            return self._find_available("title", title, available)
         return [
             book
             for book_id, book in self.books.items()
             if title.lower() in book["title"].lower()
         ]
 
-    def find_books_by_author(self, author):
+    def find_books_by_author(self, author, available=None):
+        if available is not None:
+            return self._find_available("author", author, available)
         return [
             book
             for book_id, book in self.books.items()
             if author.lower() in book["author"].lower()
         ]
 
+    def _find_available(self, field, needle, available):
+        # Kandydaci z indeksu dostępności (albo skan, gdy pasuje większość
+        # książek) i sprawdzenie podciągu; bez budowy indeksu n-gramów.
+        filters = {field: needle, "available": available}
+        return run_query(self.books, (self._availability(),), filters)
+
+    def build_indexes(self):
+        # Buduje z góry wszystkie indeksy wyszukiwania (np. przy starcie
+        # serwera), żeby żadne zapytanie nie płaciło za ich budowę.
+        self._book_index()
+        self._availability()
+        self._fulltext()
+
+    def _query_indexes(self):
+        # query_books nie buduje indeksów sam: bez nich skanuje książki
+        # w kolejności ID, co przy limit kończy się szybko.
+        return tuple(
+            index
+            for index in (self._query_index, self._availability_index)
+            if index is not None
+        )
+
+    def _book_index(self):
+        if self._query_index is None:
+            self._query_index = BookIndex(self.books.items())
+            self._indexes.append(self._query_index)
+        return self._query_index
+
+    def _availability(self):
+        if self._availability_index is None:
+            self._availability_index = AvailabilityIndex(self.books.items())
+            self._indexes.append(self._availability_index)
+        return self._availability_index
+
+    def _fulltext(self):
+        if self._fulltext_index is None:
+            self._fulltext_index = FullTextIndex(self.books.items())
+            self._indexes.append(self._fulltext_index)
+        return self._fulltext_index
+
+    def search_books(self, text, limit=10):
+        # Pełnotekstowe wyszukiwanie po słowach tytułu i autora, od
+        # najlepszego dopasowania (BM25).
+        return [
+            self.books[book_id] for book_id, _ in self._fulltext().search(text, limit)
+        ]
+
+    def count_available(self):
+        return len(self._availability().available)
+
+    def count_unavailable(self):
+        return len(self._availability().unavailable)
+
+    def query_books(self, limit=None, **filters):
+        # Wyszukiwanie po kilku warunkach naraz: title i author (podciąg, bez
+        # rozróżniania wielkości liter), category, year_from i year_to
+        # (włącznie) oraz available. Planer zaczyna od najbardziej
+        # selektywnego indeksu, pozostałe warunki sprawdza na kolejnych
+        # kandydatach i kończy po limit wynikach. Wyniki w kolejności ID.
+        return run_query(self.books, self._query_indexes(), filters, limit)
+
+    def explain_query(self, limit=None, **filters):
+        # (wybrany indeks, szacowana liczba kandydatów) dla query_books.
+        indexes = self._query_indexes()
+        total = len(self.books) if indexes else None
+        name, estimate, _ = plan(indexes, filters, limit, total)
+        return name, estimate
+
     def update_book(self, book_id, new_title=None, new_author=None, new_year=None):
         if book_id not in self.books:
             raise ValueError(f"Książka o ID {book_id} nie istnieje")
@@ -68,6 +224,12 @@ class BookManager:
         if new_year is not None:
             book["year"] = new_year
 
+        self.books[book_id] = book
+        self._index_book(book_id, book)
+
+        if self.event_bus is not None:
+            self.event_bus.publish(BookUpdated(book_id, book))
+
         return True
 
     def list_books(self):
@@ -1,20 +1,47 @@
+from src.events import (
+    CategoryAdded,
+    CategoryAssigned,
+    CategoryRemoved,
+    CategoryUnassigned,
+)
+from src.storage import MemoryStorage
+from src.tracing import traced
+
+
 class CategoryManager:
-    def __init__(self, book_manager):
+    def __init__(self, book_manager, storage=None, event_bus=None):
+        self.storage = storage if storage is not None else MemoryStorage()
         self.book_manager = book_manager
-        self.categories = set()
+        self.categories = self.storage.set("categories")
+        self.event_bus = event_bus
 
     def add_category(self, category):
         if category in self.categories:
             raise ValueError("Category already exists")
         self.categories.add(category)
 
+        if self.event_bus is not None:
+            self.event_bus.publish(CategoryAdded(category))
+
+    @traced("categories.remove_category")
     def remove_category(self, category):
         if category not in self.categories:
             raise ValueError("Category does not exist")
         self.categories.remove(category)
-        for book in self.book_manager.books.values():
-            if category in book["categories"]:
-                book["categories"].remove(category)
+        changed = [
+            (book_id, book)
+            for book_id, book in self.book_manager.books.items()
+            if category in book.get("categories", ())
+        ]
+        for book_id, book in changed:
+            book["categories"].remove(category)
+            self.book_manager.save_book(book_id, book)
+
+        if self.event_bus is not None:
+            publish = self.event_bus.publish
+            for book_id, book in changed:
+                publish(CategoryUnassigned(book_id, category, book))
+            publish(CategoryRemoved(category))
 
     def get_all_categories(self):
         return list(self.categories)
@@ -23,13 +50,23 @@ class CategoryManager:
         if category not in self.categories:
             raise ValueError("Category does not exist")
         book = self.book_manager.get_book(book_id)
-        if category not in book["categories"]:
-            book["categories"].append(category)
+        # Książki dodane przez add_book nie mają jeszcze listy kategorii.
+        categories = book.setdefault("categories", [])
+        if category not in categories:
+            categories.append(category)
+            self.book_manager.save_book(book_id, book)
+
+            if self.event_bus is not None:
+                self.event_bus.publish(CategoryAssigned(book_id, category, book))
 
     def remove_category_from_book(self, book_id, category):
         book = self.book_manager.get_book(book_id)
-        if category in book["categories"]:
+        if category in book.get("categories", ()):
             book["categories"].remove(category)
+            self.book_manager.save_book(book_id, book)
+
+            if self.event_bus is not None:
+                self.event_bus.publish(CategoryUnassigned(book_id, category, book))
 
     def get_books_by_category(self, category):
         if category not in self.categories:
@@ -37,5 +74,5 @@ class CategoryManager:
         return [
             book_id
             for book_id, book in self.book_manager.books.items()
-            if category in book["categories"]
+            if category in book.get("categories", ())
         ]
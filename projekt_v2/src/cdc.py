@@ -0,0 +1,271 @@
+import asyncio
+import threading
+from collections import deque, namedtuple
+from itertools import islice
+
+from src import events
+
+Change = namedtuple("Change", "seq table op key record")
+# Domyślny limit czekania publikującego przy on_overflow="block" (sekundy).
+BLOCK_TIMEOUT = 10.0
+
+
+def _copy_record(record):
+    # Rekordy managerów są modyfikowane w miejscu, więc zapisujemy ich
+    # stan z chwili zmiany (listy, np. kategorie, również kopiujemy).
+    if record is None:
+        return None
+    copied = dict(record)
+    for field, value in copied.items():
+        if isinstance(value, list):
+            copied[field] = list(value)
+    return copied
+
+
+def _row(table, op):
+    def handler(event):
+        return ((table, op, event[0], event[1]),)
+
+    return handler
+
+
+def _deleted(table):
+    def handler(event):
+        return ((table, "delete", event[0], None),)
+
+    return handler
+
+
+def _loan_created(event):
+    return (
+        ("loans", "insert", event.loan_id, event.loan),
+        ("books", "update", event.loan["book_id"], event.book),
+    )
+
+
+def _book_returned(event):
+    return (
+        ("loans", "update", event.loan_id, event.loan),
+        ("books", "update", event.book_id, event.book),
+    )
+
+
+def _category_book(event):
+    return (("books", "update", event.book_id, event.book),)
+
+
+_HANDLERS = {
+    events.BookAdded: _row("books", "insert"),
+    events.BookUpdated: _row("books", "update"),
+    events.BookRemoved: _deleted("books"),
+    events.UserAdded: _row("users", "insert"),
+    events.UserUpdated: _row("users", "update"),
+    events.UserRemoved: _deleted("users"),
+    events.LoanCreated: _loan_created,
+    events.BookReturned: _book_returned,
+    events.ReservationCreated: _row("reservations", "insert"),
+    events.ReservationReady: _row("reservations", "update"),
+    events.ReservationCancelled: _row("reservations", "update"),
+    events.ReservationExpired: _row("reservations", "update"),
+    events.ReservationCompleted: _row("reservations", "update"),
+    events.CategoryAdded: lambda event: (
+        ("categories", "insert", event.category, None),
+    ),
+    events.CategoryRemoved: lambda event: (
+        ("categories", "delete", event.category, None),
+    ),
+    events.CategoryAssigned: _category_book,
+    events.CategoryUnassigned: _category_book,
+    events.LoanClosed: _row("loans", "update"),
+}
+
+
+class ChangeFeed:
+    def __init__(
+        self,
+        event_bus=None,
+        capacity=100_000,
+        on_overflow="drop",
+        block_timeout=BLOCK_TIMEOUT,
+    ):
+        # on_overflow="drop" usuwa najstarsze zmiany (spóźniony konsument
+        # dostaje błąd), "block" wstrzymuje publikującego najwyżej
+        # block_timeout sekund (None - bez limitu), aż najwolniejszy
+        # konsument zwolni miejsce w buforze.
+        if on_overflow not in ("drop", "block"):
+            raise ValueError(f"Nieobsługiwana polityka przepełnienia: {on_overflow}")
+        if capacity < 1:
+            raise ValueError("Pojemność bufora musi być dodatnia")
+
+        self.capacity = capacity
+        self.on_overflow = on_overflow
+        self.block_timeout = block_timeout
+        self.closed = False
+        self._changes = deque()
+        self._next_seq = 1
+        self._condition = threading.Condition()
+        self._cursors = {}
+        self._loops = {}  # kursor konsumenta asyncio -> jego pętla zdarzeń
+        self._waiters = set()
+        self._pumps = set()
+
+        if event_bus is not None:
+            event_bus.subscribe(None, self.capture)
+
+    @property
+    def first_seq(self):
+        return self._changes[0].seq if self._changes else self._next_seq
+
+    @property
+    def last_seq(self):
+        return self._next_seq - 1
+
+    def capture(self, event):
+        handler = _HANDLERS.get(type(event))
+        if handler is None:
+            return
+        for table, op, key, record in handler(event):
+            self.append(table, op, key, record)
+
+    def append(self, table, op, key, record=None):
+        with self._condition:
+            if self.closed:
+                raise ValueError("Strumień zmian został zamknięty")
+            if len(self._changes) >= self.capacity:
+                self._make_room()
+            seq = self._next_seq
+            self._changes.append(Change(seq, table, op, key, _copy_record(record)))
+            self._next_seq += 1
+            self._condition.notify_all()
+            waiters = tuple(self._waiters)
+
+        for loop, wakeup in waiters:
+            loop.call_soon_threadsafe(wakeup.set)
+        return seq
+
+    def _make_room(self):
+        if self.on_overflow == "block":
+            oldest = self._changes[0].seq
+            # Konsument asyncio z pętli tego wątku nie ruszy, dopóki
+            # publikujący czeka, więc czekanie byłoby zakleszczeniem.
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None and any(
+                self._loops.get(token) is loop and position <= oldest
+                for token, position in self._cursors.items()
+            ):
+                raise RuntimeError(
+                    "Konsument asyncio w pętli publikującego nie nadąża; "
+                    "polityka block zablokowałaby pętlę zdarzeń"
+                )
+            if not self._condition.wait_for(
+                lambda: self.closed
+                or all(position > oldest for position in self._cursors.values()),
+                self.block_timeout,
+            ):
+                raise TimeoutError("Konsumenci strumienia zmian nie nadążają")
+        self._changes.popleft()
+
+    def _read(self, offset, limit=None):
+        first_seq = self.first_seq
+        if offset < first_seq:
+            raise ValueError(
+                f"Zmiany od numeru {offset} zostały już usunięte z bufora "
+                f"(najstarsza dostępna: {first_seq})"
+            )
+        start = offset - first_seq
+        stop = None if limit is None else start + limit
+        return list(islice(self._changes, start, stop))
+
+    def read(self, offset, limit=None):
+        with self._condition:
+            return self._read(offset, limit)
+
+    def _register(self, offset):
+        token = object()
+        position = self._next_seq if offset is None else offset
+        self._cursors[token] = position
+        return token, position
+
+    def _release(self, token):
+        with self._condition:
+            del self._cursors[token]
+            self._condition.notify_all()
+
+    def tail(self, offset=None, timeout=None, batch_size=1000):
+        # Blokujący iterator dla wątków. offset=None oznacza tylko nowe zmiany;
+        # iteracja kończy się po close() albo po timeout sekund bez zmian.
+        with self._condition:
+            token, position = self._register(offset)
+        try:
+            while True:
+                with self._condition:
+                    if not self._condition.wait_for(
+                        lambda: self._next_seq > position or self.closed, timeout
+                    ):
+                        return
+                    batch = self._read(position, batch_size)
+                    if not batch:
+                        return
+                    position = batch[-1].seq + 1
+                    self._cursors[token] = position
+                    self._condition.notify_all()
+                yield from batch
+        finally:
+            self._release(token)
+
+    async def stream(self, offset=None, batch_size=1000):
+        # Asynchroniczny odpowiednik tail(); kończy się po close().
+        loop = asyncio.get_running_loop()
+        waiter = (loop, asyncio.Event())
+        with self._condition:
+            token, position = self._register(offset)
+            self._loops[token] = loop
+            self._waiters.add(waiter)
+        try:
+            while True:
+                waiter[1].clear()
+                with self._condition:
+                    batch = self._read(position, batch_size)
+                    if batch:
+                        position = batch[-1].seq + 1
+                        self._cursors[token] = position
+                        self._condition.notify_all()
+                    elif self.closed:
+                        return
+                if not batch:
+                    await waiter[1].wait()
+                    continue
+                for change in batch:
+                    yield change
+        finally:
+            with self._condition:
+                self._waiters.discard(waiter)
+                del self._loops[token]
+            self._release(token)
+
+    def queue(self, offset=None, maxsize=1000):
+        # Kolejka asyncio zasilana ze strumienia; pełna kolejka wstrzymuje
+        # odczyt, więc konsument utrzymuje pozycję i dławi publikujących
+        # przy on_overflow="block". Po close() w kolejce pojawia się None.
+        changes = asyncio.Queue(maxsize)
+
+        async def pump():
+            async for change in self.stream(offset):
+                await changes.put(change)
+            await changes.put(None)
+
+        task = asyncio.get_running_loop().create_task(pump())
+        self._pumps.add(task)
+        task.add_done_callback(self._pumps.discard)
+        return changes
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+            waiters = tuple(self._waiters)
+        for loop, wakeup in waiters:
+            loop.call_soon_threadsafe(wakeup.set)
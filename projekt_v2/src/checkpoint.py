@@ -0,0 +1,182 @@
+import os
+import re
+
+from src.snapshot import (
+    hydrate_library,
+    restore_tombstones,
+    snapshot_library,
+    snapshot_tombstones,
+)
+from src.utils import load_data, save_data
+
+FILE_PATTERN = re.compile(r"^(base|delta)-(\d+)\.json$")
+
+
+def _file_name(kind, sequence):
+    return f"{kind}-{sequence:06d}.json"
+
+
+def _write_atomic(data, file_path):
+    tmp_path = f"{file_path}.tmp"
+    save_data(data, tmp_path, indent=None)
+    os.replace(tmp_path, file_path)
+
+
+def _checkpoint_files(directory, kind):
+    files = []
+    for name in os.listdir(directory):
+        match = FILE_PATTERN.match(name)
+        if match and match.group(1) == kind:
+            files.append((int(match.group(2)), os.path.join(directory, name)))
+    return sorted(files)
+
+
+class Checkpointer:
+    def __init__(
+        self,
+        directory,
+        book_manager,
+        user_manager,
+        loan_manager,
+        reservation_manager,
+        category_manager,
+        compact_every=10,
+    ):
+        self.directory = directory
+        self.book_manager = book_manager
+        self.user_manager = user_manager
+        self.loan_manager = loan_manager
+        self.reservation_manager = reservation_manager
+        self.category_manager = category_manager
+        self.compact_every = compact_every
+
+        os.makedirs(directory, exist_ok=True)
+        bases = _checkpoint_files(directory, "base")
+        deltas = _checkpoint_files(directory, "delta")
+        base_sequence = bases[-1][0] if bases else 0
+        self.has_base = bool(bases)
+        self.sequence = max([base_sequence] + [sequence for sequence, _ in deltas])
+        self.deltas_since_base = self.sequence - base_sequence
+
+    def _tables(self):
+        return {
+            "books": (self.book_manager.books, self.book_manager.next_id),
+            "users": (self.user_manager.users, self.user_manager.next_id),
+            "loans": (self.loan_manager.loans, self.loan_manager.next_id),
+            "reservations": (
+                self.reservation_manager.reservations,
+                self.reservation_manager.next_id,
+            ),
+        }
+
+    def tracks_changes(self):
+        # Delty wymagają zbioru zmian (TrackedDict z MemoryStorage). Tabele
+        # SQLite albo zwykłe słowniki go nie mają, więc wtedy każdy punkt
+        # kontrolny jest pełną migawką.
+        return all(
+            hasattr(records, "changes") for records, next_id in self._tables().values()
+        )
+
+    def pending_changes(self):
+        return {
+            name: records.changes
+            for name, (records, next_id) in self._tables().items()
+            if getattr(records, "changes", None)
+        }
+
+    def checkpoint(self):
+        if (
+            not self.has_base
+            or self.deltas_since_base >= self.compact_every
+            or not self.tracks_changes()
+        ):
+            return self.compact()
+
+        delta = {"sequence": self.sequence + 1, "tables": {}}
+        for name, (records, next_id) in self._tables().items():
+            changes = records.changes
+            delta["tables"][name] = {
+                "next_id": next_id,
+                "upserts": {
+                    str(record_id): records[record_id]
+                    for record_id in changes.created | changes.modified
+                },
+                "deletes": sorted(changes.deleted),
+            }
+        # Kolejki i kategorie są małe, więc zapisujemy je w całości.
+        delta["book_queues"] = {
+            str(book_id): list(queue)
+            for book_id, queue in self.reservation_manager.book_queues.items()
+        }
+        delta["categories"] = sorted(self.category_manager.categories)
+        delta["tombstones"] = snapshot_tombstones(self.book_manager, self.user_manager)
+
+        file_path = os.path.join(self.directory, _file_name("delta", delta["sequence"]))
+        _write_atomic(delta, file_path)
+        self.sequence += 1
+        self.deltas_since_base += 1
+        self._clear_changes()
+        return file_path
+
+    def compact(self):
+        data = snapshot_library(
+            self.book_manager,
+            self.user_manager,
+            self.loan_manager,
+            self.reservation_manager,
+            self.category_manager,
+        )
+        # Numer sekwencji w nazwie bazy pozwala pominąć stare delty, jeśli
+        # proces przerwano przed ich usunięciem.
+        file_path = os.path.join(self.directory, _file_name("base", self.sequence))
+        _write_atomic(data, file_path)
+
+        for kind in ("base", "delta"):
+            for sequence, old_path in _checkpoint_files(self.directory, kind):
+                if old_path != file_path:
+                    os.remove(old_path)
+        self.has_base = True
+        self.deltas_since_base = 0
+        self._clear_changes()
+        return file_path
+
+    def _clear_changes(self):
+        for records, next_id in self._tables().values():
+            if hasattr(records, "changes"):
+                records.changes.clear()
+
+
+def restore_library(directory):
+    bases = _checkpoint_files(directory, "base")
+    if not bases:
+        raise ValueError(f"Brak punktu kontrolnego w katalogu {directory}")
+    base_sequence, base_path = bases[-1]
+    managers = hydrate_library(load_data(base_path))
+    owners = {
+        "books": managers["book_manager"],
+        "users": managers["user_manager"],
+        "loans": managers["loan_manager"],
+        "reservations": managers["reservation_manager"],
+    }
+
+    for sequence, delta_path in _checkpoint_files(directory, "delta"):
+        if sequence <= base_sequence:
+            continue
+        delta = load_data(delta_path)
+        for name, table in delta["tables"].items():
+            manager = owners[name]
+            records = getattr(manager, name)
+            for record_id, record in table["upserts"].items():
+                records[int(record_id)] = record
+            for record_id in table["deletes"]:
+                records.pop(record_id, None)
+            manager.next_id = table["next_id"]
+        managers["reservation_manager"].book_queues = {
+            int(book_id): queue for book_id, queue in delta["book_queues"].items()
+        }
+        managers["category_manager"].categories = set(delta["categories"])
+        restore_tombstones(delta, managers["book_manager"], managers["user_manager"])
+
+    for name, manager in owners.items():
+        getattr(manager, name).changes.clear()
+    return managers
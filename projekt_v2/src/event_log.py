@@ -0,0 +1,314 @@
+import json
+import os
+import re
+import threading
+from itertools import islice
+
+from src import events
+from src.snapshot import SNAPSHOT_VERSION, hydrate_library
+
+# Katalog dziennika:
+#   events.jsonl              jedno zdarzenie na wiersz: [typ, pola...]
+#   checkpoint-<offset>.json  stan po <offset> zdarzeniach (format migawki)
+#                             i pozycja w bajtach, od której czytać dalej
+LOG_FILE = "events.jsonl"
+CHECKPOINT_PATTERN = re.compile(r"^checkpoint-(\d+)\.json$")
+EVENT_TYPES = {event_type.__name__: event_type for event_type in events.EVENT_TYPES}
+READ_BATCH = 4096
+
+
+def _checkpoint_name(offset):
+    return f"checkpoint-{offset:012d}.json"
+
+
+def list_checkpoints(directory):
+    checkpoints = []
+    for name in os.listdir(directory):
+        match = CHECKPOINT_PATTERN.match(name)
+        if match:
+            checkpoints.append((int(match.group(1)), os.path.join(directory, name)))
+    return sorted(checkpoints)
+
+
+class EventLog:
+    # Dopisuje każde zdarzenie szyny do pliku. Stan biblioteki po dowolnej
+    # liczbie zdarzeń odtwarza rebuild(); punkty kontrolne co checkpoint_every
+    # zdarzeń są budowane w wątku w tle z samych plików (ostatni punkt plus
+    # dziennik), więc nie dotykają żywych managerów. Każde zdarzenie trafia
+    # do systemu od razu, a na dysk (fsync) co fsync_every zdarzeń: 1 to
+    # fsync po każdym, None zostawia zapis na dysk systemowi.
+
+    def __init__(
+        self,
+        directory,
+        event_bus=None,
+        checkpoint_every=100_000,
+        keep=3,
+        fsync_every=1,
+    ):
+        if fsync_every is not None and fsync_every < 1:
+            raise ValueError("fsync_every musi być dodatnie albo None")
+        self.directory = directory
+        self.checkpoint_every = checkpoint_every
+        self.keep = keep
+        self.fsync_every = fsync_every
+        self._unsynced = 0
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, LOG_FILE)
+        self.offset, self.position = self._recover()
+        self._file = open(self.path, "ab")
+        checkpoints = list_checkpoints(directory)
+        self._last_checkpoint = checkpoints[-1][0] if checkpoints else 0
+        self._checkpoint_thread = None
+        if event_bus is not None:
+            self.attach(event_bus)
+
+    def _recover(self):
+        # Po awarii w połowie zapisu obcinamy niepełny ostatni wiersz.
+        if not os.path.exists(self.path):
+            return 0, 0
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                f.truncate(end)
+        return data.count(b"\n", 0, end), end
+
+    def attach(self, event_bus):
+        event_bus.subscribe(None, self.append)
+
+    def append(self, event):
+        line = json.dumps(
+            (type(event).__name__, *event), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        self._file.write(line + b"\n")
+        self._file.flush()
+        self.offset += 1
+        self.position += len(line) + 1
+        self._unsynced += 1
+        if self.fsync_every is not None and self._unsynced >= self.fsync_every:
+            self._sync()
+        if self.offset - self._last_checkpoint >= self.checkpoint_every:
+            self._checkpoint_in_background()
+
+    def _checkpoint_in_background(self):
+        if self._checkpoint_thread is not None and self._checkpoint_thread.is_alive():
+            return
+        self._last_checkpoint = self.offset
+        self._checkpoint_thread = threading.Thread(
+            target=self.checkpoint, args=(self.offset,), daemon=True
+        )
+        self._checkpoint_thread.start()
+
+    def checkpoint(self, offset=None):
+        if offset is None:
+            offset = self.offset
+        data, position = replay_state(self.directory, offset)
+        data["offset"] = offset
+        data["log_position"] = position
+        path = os.path.join(self.directory, _checkpoint_name(offset))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        self._last_checkpoint = max(self._last_checkpoint, offset)
+
+        for _, old_path in list_checkpoints(self.directory)[: -self.keep]:
+            os.remove(old_path)
+        return path
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def flush(self):
+        self._file.flush()
+        if self.fsync_every is not None and self._unsynced:
+            self._sync()
+
+    def close(self):
+        if self._checkpoint_thread is not None:
+            self._checkpoint_thread.join()
+        self.flush()
+        self._file.close()
+
+
+# Odtwarzanie: zdarzenia niosą pełne rekordy, więc każde to jedno
+# przypisanie lub usunięcie w słownikach stanu.
+
+
+def _set(table, key_index, record_index):
+    def apply(state, fields):
+        state[table][fields[key_index]] = fields[record_index]
+
+    return apply
+
+
+def _insert(table):
+    def apply(state, fields):
+        key = fields[0]
+        state[table][key] = fields[1]
+        if key >= state["next_ids"][table]:
+            state["next_ids"][table] = key + 1
+
+    return apply
+
+
+def _remove(table):
+    def apply(state, fields):
+        key = fields[0]
+        record = state[table].pop(key, None)
+        state["tombstones"][table][key] = {"deleted_at": fields[1], "record": record}
+
+    return apply
+
+
+def _loan_created(state, fields):
+    loan_id, loan, book = fields
+    state["loans"][loan_id] = loan
+    state["books"][loan["book_id"]] = book
+    if loan_id >= state["next_ids"]["loans"]:
+        state["next_ids"]["loans"] = loan_id + 1
+
+
+def _book_returned(state, fields):
+    loan_id, book_id, loan, book = fields
+    state["loans"][loan_id] = loan
+    state["books"][book_id] = book
+
+
+def _tombstones_purged(state, fields):
+    book_ids, user_ids = fields
+    for book_id in book_ids:
+        state["tombstones"]["books"].pop(book_id, None)
+    for user_id in user_ids:
+        state["tombstones"]["users"].pop(user_id, None)
+
+
+_APPLY = {
+    "BookAdded": _insert("books"),
+    "BookUpdated": _set("books", 0, 1),
+    "BookRemoved": _remove("books"),
+    "UserAdded": _insert("users"),
+    "UserUpdated": _set("users", 0, 1),
+    "UserRemoved": _remove("users"),
+    "LoanCreated": _loan_created,
+    "BookReturned": _book_returned,
+    "ReservationCreated": _insert("reservations"),
+    "ReservationReady": _set("reservations", 0, 1),
+    "ReservationCancelled": _set("reservations", 0, 1),
+    "ReservationExpired": _set("reservations", 0, 1),
+    "ReservationCompleted": _set("reservations", 0, 1),
+    "CategoryAdded": lambda state, fields: state["categories"].add(fields[0]),
+    "CategoryRemoved": lambda state, fields: state["categories"].discard(fields[0]),
+    "CategoryAssigned": _set("books", 0, 2),
+    "CategoryUnassigned": _set("books", 0, 2),
+    "LoanClosed": _set("loans", 0, 1),
+    "TombstonesPurged": _tombstones_purged,
+}
+
+_TABLES = ("books", "users", "loans", "reservations")
+
+
+def _int_keys(records):
+    return {int(key): value for key, value in records.items()}
+
+
+def _empty_state():
+    return {
+        "books": {},
+        "users": {},
+        "loans": {},
+        "reservations": {},
+        "categories": set(),
+        "tombstones": {"books": {}, "users": {}},
+        "next_ids": dict.fromkeys(_TABLES, 1),
+        "reservation_expiry_days": 3,
+    }
+
+
+def _state_from_checkpoint(data):
+    state = _empty_state()
+    for table in _TABLES:
+        state[table] = _int_keys(data[table]["records"])
+        state["next_ids"][table] = data[table]["next_id"]
+    state["categories"] = set(data["categories"])
+    state["reservation_expiry_days"] = data["reservation_expiry_days"]
+    for table, records in data.get("tombstones", {}).items():
+        state["tombstones"][table] = _int_keys(records)
+    return state
+
+
+def _snapshot_data(state):
+    # Format migawki z snapshot.py; kolejki rezerwacji hydrate_library
+    # odtworzy z aktywnych rezerwacji.
+    data = {"version": SNAPSHOT_VERSION}
+    for table in _TABLES:
+        data[table] = {"next_id": state["next_ids"][table], "records": state[table]}
+    data["categories"] = sorted(state["categories"])
+    data["reservation_expiry_days"] = state["reservation_expiry_days"]
+    data["tombstones"] = state["tombstones"]
+    return data
+
+
+def _read_lines(f, count):
+    # Wiersze są dekodowane partiami jednym wywołaniem json.loads.
+    while count is None or count > 0:
+        size = READ_BATCH if count is None else min(READ_BATCH, count)
+        lines = list(islice(f, size))
+        if not lines:
+            return
+        if count is not None:
+            count -= len(lines)
+        yield json.loads(b"[" + b",".join(lines) + b"]")
+
+
+def replay_state(directory, offset=None):
+    # Zwraca stan po pierwszych offset zdarzeniach (None = wszystkich) w formacie
+    # migawki oraz pozycję w pliku dziennika tuż za ostatnim z nich.
+    start, state, position = 0, _empty_state(), 0
+    for checkpoint_offset, path in reversed(list_checkpoints(directory)):
+        if offset is None or checkpoint_offset <= offset:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            start, position = checkpoint_offset, data["log_position"]
+            state = _state_from_checkpoint(data)
+            break
+
+    path = os.path.join(directory, LOG_FILE)
+    applied = start
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            f.seek(position)
+            remaining = None if offset is None else offset - start
+            apply = _APPLY
+            for batch in _read_lines(f, remaining):
+                for name, *fields in batch:
+                    apply[name](state, fields)
+                applied += len(batch)
+            position = f.tell()
+    if offset is not None and applied < offset:
+        raise ValueError(
+            f"Dziennik zawiera tylko {applied} zdarzeń, żądano stanu po {offset}"
+        )
+    return _snapshot_data(state), position
+
+
+def rebuild(directory, offset=None):
+    # Managerowie w stanie po offset zdarzeniach, np. do audytu albo do
+    # uruchomienia nowej repliki (Library.from_managers(**rebuild(...))).
+    data, _ = replay_state(directory, offset)
+    return hydrate_library(data)
+
+
+def read_events(directory, start=1, stop=None):
+    # Zdarzenia o numerach start..stop (numeracja od 1) jako obiekty z events.
+    path = os.path.join(directory, LOG_FILE)
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            if number < start:
+                continue
+            if stop is not None and number > stop:
+                return
+            name, *fields = json.loads(line)
+            yield number, EVENT_TYPES[name](*fields)
@@ -0,0 +1,162 @@
+import asyncio
+import inspect
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+BookAdded = namedtuple("BookAdded", "book_id book")
+BookUpdated = namedtuple("BookUpdated", "book_id book")
+BookRemoved = namedtuple("BookRemoved", "book_id deleted_at", defaults=(None,))
+UserAdded = namedtuple("UserAdded", "user_id user")
+UserUpdated = namedtuple("UserUpdated", "user_id user")
+UserRemoved = namedtuple("UserRemoved", "user_id deleted_at", defaults=(None,))
+LoanCreated = namedtuple("LoanCreated", "loan_id loan book")
+BookReturned = namedtuple("BookReturned", "loan_id book_id loan book")
+ReservationCreated = namedtuple("ReservationCreated", "reservation_id reservation")
+ReservationReady = namedtuple("ReservationReady", "reservation_id reservation")
+ReservationCancelled = namedtuple("ReservationCancelled", "reservation_id reservation")
+ReservationExpired = namedtuple("ReservationExpired", "reservation_id reservation")
+ReservationCompleted = namedtuple("ReservationCompleted", "reservation_id reservation")
+CategoryAdded = namedtuple("CategoryAdded", "category")
+CategoryRemoved = namedtuple("CategoryRemoved", "category")
+CategoryAssigned = namedtuple("CategoryAssigned", "book_id category book")
+CategoryUnassigned = namedtuple("CategoryUnassigned", "book_id category book")
+LoanClosed = namedtuple("LoanClosed", "loan_id loan")
+TombstonesPurged = namedtuple("TombstonesPurged", "book_ids user_ids")
+
+EVENT_TYPES = (
+    BookAdded,
+    BookUpdated,
+    BookRemoved,
+    UserAdded,
+    UserUpdated,
+    UserRemoved,
+    LoanCreated,
+    BookReturned,
+    ReservationCreated,
+    ReservationReady,
+    ReservationCancelled,
+    ReservationExpired,
+    ReservationCompleted,
+    CategoryAdded,
+    CategoryRemoved,
+    CategoryAssigned,
+    CategoryUnassigned,
+    LoanClosed,
+    TombstonesPurged,
+)
+
+
+class EventBus:
+    def __init__(self):
+        self._subscribers = []
+        # Trasy dla trybu dostarczania: None - wszyscy odbiorcy, True - tylko
+        # natychmiastowi (wewnątrz transakcji), False - tylko pozostali
+        # (przy zatwierdzeniu transakcji).
+        self._routes = {None: {}, True: {}, False: {}}
+        self._mode = None
+        self._held = None
+        self._pending = []
+        self._tasks = set()
+        self._queued = deque()
+        self._dispatching = False
+
+    def subscribe(self, event_type, handler, immediate=False):
+        # event_type=None oznacza subskrypcję wszystkich zdarzeń. Funkcje
+        # async są uruchamiane jako zadania asyncio, pozostałe od razu.
+        # Odbiorca immediate jest częścią samej operacji (np. promocja
+        # kolejki rezerwacji) i dostaje zdarzenia także wewnątrz transakcji.
+        is_async = inspect.iscoroutinefunction(handler)
+        self._subscribers.append((event_type, handler, is_async, immediate))
+        self._clear_routes()
+
+    def unsubscribe(self, event_type, handler):
+        for index, (subscribed_type, subscribed, _, _) in enumerate(self._subscribers):
+            if subscribed_type is event_type and subscribed == handler:
+                del self._subscribers[index]
+                self._clear_routes()
+                return
+        raise ValueError("Subskrypcja nie istnieje")
+
+    def _clear_routes(self):
+        for routes in self._routes.values():
+            routes.clear()
+
+    def _route(self, event_type, mode):
+        # Lista odbiorców jest wyliczana raz na typ zdarzenia, dzięki czemu
+        # publish to jedno wyszukanie w słowniku i pętla po krotce.
+        route = tuple(
+            (handler, is_async)
+            for subscribed_type, handler, is_async, immediate in self._subscribers
+            if (subscribed_type is None or subscribed_type is event_type)
+            and (mode is None or immediate is mode)
+        )
+        self._routes[mode][event_type] = route
+        return route
+
+    def publish(self, event):
+        self._publish(event, self._mode)
+
+    def _publish(self, event, mode):
+        # Zdarzenia publikowane przez odbiorców są dostarczane dopiero po
+        # obsłużeniu bieżącego, więc każdy odbiorca widzi je w kolejności
+        # przyczynowej (np. BookReturned przed ReservationReady).
+        if self._dispatching:
+            self._queued.append((event, mode))
+            return
+        self._dispatching = True
+        try:
+            self._dispatch(event, mode)
+            while self._queued:
+                self._dispatch(*self._queued.popleft())
+        except BaseException:
+            self._queued.clear()
+            raise
+        finally:
+            self._dispatching = False
+
+    def _dispatch(self, event, mode):
+        route = self._routes[mode].get(type(event))
+        if route is None:
+            route = self._route(type(event), mode)
+        for handler, is_async in route:
+            if is_async:
+                self._schedule(handler(event))
+            else:
+                handler(event)
+        if mode is True:
+            self._held.append(event)
+
+    @contextmanager
+    def hold(self):
+        # Zdarzenia otwartej transakcji: odbiorcy immediate dostają je od
+        # razu, pozostali (dziennik zdarzeń, CDC, statystyki) dopiero po
+        # zatwierdzeniu. Po wycofaniu są odrzucane, więc nikt poza samą
+        # operacją nie widzi zmian, których nie było.
+        if self._held is not None:
+            yield
+            return
+        self._held, self._mode = [], True
+        try:
+            yield
+        finally:
+            held, self._held, self._mode = self._held, None, None
+        for event in held:
+            self._publish(event, False)
+
+    def _schedule(self, coroutine):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Poza pętlą zdarzeń korutyny czekają na drain().
+            self._pending.append(coroutine)
+            return
+        task = loop.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def drain(self):
+        # Czeka na zakończenie wszystkich asynchronicznych odbiorców.
+        while self._pending or self._tasks:
+            pending, self._pending = self._pending, []
+            awaitables = pending + list(self._tasks)
+            await asyncio.gather(*awaitables)
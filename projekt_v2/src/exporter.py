@@ -0,0 +1,97 @@
+import csv
+import json
+
+BUFFER_SIZE = 1 << 20
+
+BOOK_FIELDS = ("title", "author", "isbn", "year", "available", "categories")
+LOAN_FIELDS = ("user_id", "book_id", "returned")
+RESERVATION_FIELDS = (
+    "user_id",
+    "book_id",
+    "status",
+    "reservation_date",
+    "ready_date",
+    "expiry_date",
+    "notification_sent",
+)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def export_records(
+    records, file_path, file_format="csv", fields=None, where=None, buffer_size=None
+):
+    # records to iterowalne pary (id, rekord), np. manager.books.items();
+    # nic nie jest materializowane, więc pamięć nie zależy od liczby wierszy.
+    if file_format not in ("csv", "ndjson"):
+        raise ValueError(f"Nieobsługiwany format eksportu: {file_format}")
+    if fields is None:
+        raise ValueError("Należy podać listę pól do eksportu")
+
+    if where is not None:
+        records = (
+            (record_id, record) for record_id, record in records if where(record)
+        )
+
+    written = 0
+    with open(
+        file_path,
+        "w",
+        encoding="utf-8",
+        newline="",
+        buffering=buffer_size or BUFFER_SIZE,
+    ) as f:
+        if file_format == "csv":
+            writer = csv.writer(f)
+            writer.writerow(("id",) + tuple(fields))
+            for record_id, record in records:
+                writer.writerow(
+                    [record_id] + [_csv_value(record.get(field)) for field in fields]
+                )
+                written += 1
+        else:
+            dumps = json.JSONEncoder(ensure_ascii=False).encode
+            for record_id, record in records:
+                row = {"id": record_id}
+                for field in fields:
+                    if field in record:
+                        row[field] = record[field]
+                f.write(dumps(row))
+                f.write("\n")
+                written += 1
+
+    return written
+
+
+def export_books(
+    book_manager, file_path, file_format="csv", fields=BOOK_FIELDS, where=None
+):
+    return export_records(
+        book_manager.books.items(), file_path, file_format, fields, where
+    )
+
+
+def export_loans(
+    loan_manager, file_path, file_format="csv", fields=LOAN_FIELDS, where=None
+):
+    return export_records(
+        loan_manager.loans.items(), file_path, file_format, fields, where
+    )
+
+
+def export_reservations(
+    reservation_manager,
+    file_path,
+    file_format="csv",
+    fields=RESERVATION_FIELDS,
+    where=None,
+):
+    return export_records(
+        reservation_manager.reservations.items(), file_path, file_format, fields, where
+    )
@@ -0,0 +1,159 @@
+import bisect
+import heapq
+import math
+import re
+
+TOKEN = re.compile(r"\w+")
+# Wagi pól jak w BM25F: słowo z tytułu liczy się bardziej niż z autora.
+FIELD_WEIGHTS = (("title", 2.0), ("author", 1.0))
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+class FullTextIndex:
+    # Indeks odwrócony tytułów i autorów z rankingiem BM25. Listy postingów
+    # są posortowane po ID książki, więc top-k liczymy algorytmem WAND:
+    # książki, które nawet z maksymalnym wkładem wszystkich swoich słów nie
+    # wejdą do najlepszych k, są przeskakiwane bez liczenia wyniku.
+
+    def __init__(self, books=()):
+        self._postings = {}  # słowo -> posortowane ID książek
+        # Do górnych ograniczeń WAND: największa częstość i najkrótszy opis
+        # wśród książek ze słowem. Po usunięciach mogą być zbyt luźne,
+        # ale nigdy za ciasne.
+        self._max_tf = {}
+        self._min_length = {}
+        self._docs = {}  # ID -> (tytuł, autor, długość, {słowo: częstość})
+        self._total_length = 0.0
+        for book_id, book in books:
+            self.update(book_id, book)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def update(self, book_id, book):
+        title, author = book["title"], book["author"]
+        doc = self._docs.get(book_id)
+        if doc is not None:
+            if doc[0] == title and doc[1] == author:
+                return  # np. wypożyczenie: tekst się nie zmienił
+            self.remove(book_id)
+
+        frequencies = {}
+        length = 0.0
+        for field, weight in FIELD_WEIGHTS:
+            for term in tokenize(book[field]):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+                length += weight
+        for term, frequency in frequencies.items():
+            ids = self._postings.get(term)
+            if ids is None:
+                self._postings[term] = [book_id]
+            elif ids[-1] < book_id:
+                ids.append(book_id)  # nowe książki mają rosnące ID
+            else:
+                bisect.insort(ids, book_id)
+            if frequency > self._max_tf.get(term, 0.0):
+                self._max_tf[term] = frequency
+            if length < self._min_length.get(term, math.inf):
+                self._min_length[term] = length
+        self._docs[book_id] = (title, author, length, frequencies)
+        self._total_length += length
+
+    def remove(self, book_id):
+        doc = self._docs.pop(book_id, None)
+        if doc is None:
+            return
+        self._total_length -= doc[2]
+        for term in doc[3]:
+            ids = self._postings[term]
+            del ids[bisect.bisect_left(ids, book_id)]
+            if not ids:
+                del self._postings[term]
+                del self._max_tf[term]
+                del self._min_length[term]
+
+    def _idf(self, term):
+        count = len(self._postings[term])
+        return math.log(1 + (len(self._docs) - count + 0.5) / (count + 0.5))
+
+    def search(self, text, limit=10):
+        # Zwraca do limit par (ID, wynik) od najlepszego dopasowania.
+        if limit < 1:
+            raise ValueError("Limit musi być dodatni")
+        terms = [
+            term for term in dict.fromkeys(tokenize(text)) if term in self._postings
+        ]
+        if not terms:
+            return []
+
+        docs = self._docs
+        average = self._total_length / len(docs)
+        # Kursor: [bieżące ID, pozycja, lista ID, idf, górne ograniczenie, słowo]
+        cursors = []
+        for term in terms:
+            idf = self._idf(term)
+            max_tf = self._max_tf[term]
+            # Wynik rośnie z częstością i maleje z długością opisu, więc
+            # ograniczenie to wkład największej częstości przy najkrótszym opisie.
+            norm = K1 * (1 - B + B * self._min_length[term] / average)
+            bound = idf * max_tf * (K1 + 1) / (max_tf + norm)
+            ids = self._postings[term]
+            cursors.append([ids[0], 0, ids, idf, bound, term])
+
+        top = []  # kopiec (wynik, -ID) najlepszych limit książek
+        threshold = 0.0
+        while cursors:
+            cursors.sort(key=lambda cursor: cursor[0])
+            # Pivot: pierwszy kursor, przy którym suma ograniczeń przekracza próg.
+            reach = 0.0
+            pivot = None
+            for index, cursor in enumerate(cursors):
+                reach += cursor[4]
+                if len(top) < limit or reach > threshold:
+                    pivot = index
+                    break
+            if pivot is None:
+                break
+            pivot_id = cursors[pivot][0]
+
+            if cursors[0][0] == pivot_id:
+                _, _, length, frequencies = docs[pivot_id]
+                norm = K1 * (1 - B + B * length / average)
+                score = 0.0
+                for cursor in cursors:
+                    if cursor[0] != pivot_id:
+                        break
+                    tf = frequencies[cursor[5]]
+                    score += cursor[3] * tf * (K1 + 1) / (tf + norm)
+                if len(top) < limit:
+                    heapq.heappush(top, (score, -pivot_id))
+                elif score > threshold:
+                    heapq.heapreplace(top, (score, -pivot_id))
+                if len(top) == limit:
+                    threshold = top[0][0]
+                advance = [cursor for cursor in cursors if cursor[0] == pivot_id]
+                target = pivot_id + 1
+            else:
+                advance = cursors[:pivot]
+                target = pivot_id
+
+            exhausted = False
+            for cursor in advance:
+                ids = cursor[2]
+                position = bisect.bisect_left(ids, target, cursor[1])
+                if position == len(ids):
+                    cursor[0] = None
+                    exhausted = True
+                else:
+                    cursor[0], cursor[1] = ids[position], position
+            if exhausted:
+                cursors = [cursor for cursor in cursors if cursor[0] is not None]
+
+        return [
+            (-negative_id, score) for score, negative_id in sorted(top, reverse=True)
+        ]
@@ -0,0 +1,153 @@
+import multiprocessing
+import sqlite3
+import threading
+
+# Liczniki przechowują high-water mark: najmniejsze ID, które nie zostało
+# jeszcze nikomu wydane. take(n) rezerwuje blok n kolejnych ID.
+
+
+class LocalCounter:
+    # Licznik jednego procesu, bezpieczny dla wątków.
+
+    def __init__(self, start=1):
+        self._value = start
+        self._lock = threading.Lock()
+
+    def take(self, count=1):
+        with self._lock:
+            first = self._value
+            self._value += count
+        return first
+
+    @property
+    def value(self):
+        return self._value
+
+    def reset(self, value):
+        with self._lock:
+            self._value = value
+
+    def advance_to(self, value):
+        with self._lock:
+            self._value = max(self._value, value)
+
+
+class SharedCounter(LocalCounter):
+    # Licznik we wspólnej pamięci dla procesów potomnych (multiprocessing),
+    # np. procesów importu zapisujących do jednego magazynu.
+
+    def __init__(self, start=1):
+        self._shared = multiprocessing.Value("q", start)
+        self._lock = self._shared.get_lock()
+
+    @property
+    def _value(self):
+        return self._shared.value
+
+    @_value.setter
+    def _value(self, value):
+        self._shared.value = value
+
+
+class SQLiteCounter:
+    # Licznik w pliku SQLite dla niezależnych procesów, także uruchamianych
+    # osobno. Blok jest rezerwowany w transakcji BEGIN IMMEDIATE.
+
+    def __init__(self, path, name, start=1):
+        self.name = name
+        self.connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False, timeout=30
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS id_counters "
+            "(name TEXT PRIMARY KEY, next_id INTEGER NOT NULL)"
+        )
+        self.connection.execute(
+            "INSERT OR IGNORE INTO id_counters (name, next_id) VALUES (?, ?)",
+            (name, start),
+        )
+        self._lock = threading.Lock()
+
+    def _update(self, sql, value):
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                first = self.value
+                self.connection.execute(sql, (value, self.name))
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+        return first
+
+    def take(self, count=1):
+        return self._update(
+            "UPDATE id_counters SET next_id = next_id + ? WHERE name = ?", count
+        )
+
+    @property
+    def value(self):
+        return self.connection.execute(
+            "SELECT next_id FROM id_counters WHERE name = ?", (self.name,)
+        ).fetchone()[0]
+
+    def reset(self, value):
+        self._update("UPDATE id_counters SET next_id = ? WHERE name = ?", value)
+
+    def advance_to(self, value):
+        self._update(
+            "UPDATE id_counters SET next_id = MAX(next_id, ?) WHERE name = ?", value
+        )
+
+    def close(self):
+        self.connection.close()
+
+
+class IdAllocator:
+    # Każdy wątek dostaje z licznika własny blok (dzierżawę) block_size ID
+    # i wydaje z niego bez blokad; licznik jest odpytywany raz na blok.
+    # Niewykorzystane ID z dzierżaw przepadają, więc ID są unikalne, ale
+    # przy block_size > 1 mogą mieć luki. Luki zostawia też wycofana
+    # transakcja: licznika nie cofamy, bo inne wątki albo procesy mogły już
+    # pobrać kolejne ID.
+    def __init__(self, start=1, block_size=1, counter=None):
+        if block_size < 1:
+            raise ValueError("Rozmiar bloku ID musi być dodatni")
+        self.counter = counter if counter is not None else LocalCounter(start)
+        self.block_size = block_size
+        self._local = threading.local()
+        if block_size == 1:
+            self.allocate = self.counter.take
+
+    def allocate(self):
+        try:
+            return next(self._local.ids)
+        except (AttributeError, StopIteration):
+            pass
+        first = self.counter.take(self.block_size)
+        self._local.ids = iter(range(first + 1, first + self.block_size))
+        return first
+
+    @property
+    def next_id(self):
+        # High-water mark zapisywany w migawkach: po odtworzeniu żadne
+        # wydzierżawione wcześniej ID nie zostanie użyte ponownie.
+        return self.counter.value
+
+    def reset(self, value):
+        # Tylko przy odtwarzaniu migawki: unieważnia dzierżawy wszystkich
+        # wątków.
+        self._local = threading.local()
+        self.counter.reset(value)
+
+    def advance_to(self, value):
+        self.counter.advance_to(value)
+
+
+def id_property():
+    # manager.next_id działa jak dawny licznik: odczyt zwraca high-water mark,
+    # a przypisanie (odtworzenie migawki) ustawia go na nowo.
+    return property(
+        lambda manager: manager.ids.next_id,
+        lambda manager, value: manager.ids.reset(value),
+    )
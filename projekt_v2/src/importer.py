@@ -0,0 +1,196 @@
+import csv
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from src.utils import validate_emails, validate_isbns
+
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows_read = 0
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []  # (numer wiersza, komunikat), najwyżej MAX_REPORTED_ERRORS
+
+    def add_errors(self, errors):
+        self.rejected += len(errors)
+        free = MAX_REPORTED_ERRORS - len(self.errors)
+        if free > 0:
+            self.errors.extend(errors[:free])
+
+
+def validate_book_rows(rows, checksum=False):
+    # Funkcja modułowa, żeby dało się ją przekazać do procesu roboczego.
+    isbn_mask = validate_isbns((row[2] for line, row in rows), checksum=checksum)
+    valid = []
+    errors = []
+    for (line, row), isbn_ok in zip(rows, isbn_mask):
+        title, author, isbn, year = row
+        if not title:
+            errors.append((line, "Tytuł musi być niepustym ciągiem znaków"))
+        elif len(title) > 200:
+            errors.append((line, "Tytuł jest zbyt długi"))
+        elif not author:
+            errors.append((line, "Autor musi być niepustym ciągiem znaków"))
+        elif not isbn_ok:
+            errors.append((line, f"Nieprawidłowy ISBN: {isbn}"))
+        else:
+            try:
+                year = int(year) if year else None
+            except ValueError:
+                errors.append((line, f"Nieprawidłowy rok: {year}"))
+                continue
+            valid.append({"title": title, "author": author, "isbn": isbn, "year": year})
+    return valid, errors
+
+
+def validate_user_rows(rows):
+    email_mask = validate_emails(row[1] for line, row in rows)
+    valid = []
+    errors = []
+    for (line, row), email_ok in zip(rows, email_mask):
+        name, email = row
+        if not name:
+            errors.append((line, "Imię musi być niepustym ciągiem znaków"))
+        elif len(name) > 200:
+            errors.append((line, "Imię jest zbyt długie"))
+        elif not email_ok:
+            errors.append((line, f"Nieprawidłowy email: {email}"))
+        else:
+            valid.append({"name": name, "email": email})
+    return valid, errors
+
+
+def _column_positions(header, fields, optional):
+    missing = [
+        field for field in fields if field not in header and field not in optional
+    ]
+    if missing:
+        raise ValueError(f"Brak kolumn w pliku CSV: {', '.join(missing)}")
+    return [header.index(field) if field in header else None for field in fields]
+
+
+def _read_text_chunks(f, chunk_size):
+    # Do procesów roboczych trafia surowy tekst - jego serializacja jest
+    # znacznie tańsza niż list wierszy. Paczkę tniemy tylko na granicy
+    # rekordu, czyli gdy liczba cudzysłowów jest parzysta.
+    first_line = 2
+    lines = []
+    quotes = 0
+    for line in f:
+        lines.append(line)
+        quotes += line.count('"')
+        if len(lines) >= chunk_size and quotes % 2 == 0:
+            yield first_line, "".join(lines)
+            first_line += len(lines)
+            lines = []
+            quotes = 0
+    if lines:
+        yield first_line, "".join(lines)
+
+
+def parse_and_validate(validator, positions, first_line, text):
+    reader = csv.reader(io.StringIO(text))
+    rows = []
+    for row in reader:
+        rows.append(
+            (
+                first_line + reader.line_num - 1,
+                [
+                    (
+                        row[position].strip()
+                        if position is not None and position < len(row)
+                        else ""
+                    )
+                    for position in positions
+                ],
+            )
+        )
+    valid, errors = validator(rows)
+    return len(rows), valid, errors
+
+
+def _import(
+    file_path, fields, optional, validator, insert, chunk_size, workers, progress
+):
+    report = ImportReport()
+
+    def apply(result):
+        rows_read, valid, errors = result
+        report.rows_read += rows_read
+        report.add_errors(errors)
+        if valid:
+            insert(valid)
+            report.imported += len(valid)
+        if progress is not None:
+            progress(report)
+
+    with open(file_path, newline="", encoding="utf-8") as f:
+        header_line = f.readline()
+        if not header_line:
+            return report
+        header = next(csv.reader([header_line]))
+        job = partial(
+            parse_and_validate, validator, _column_positions(header, fields, optional)
+        )
+        chunks = _read_text_chunks(f, chunk_size)
+
+        if workers == 0:
+            for first_line, text in chunks:
+                apply(job(first_line, text))
+            return report
+
+        # Ograniczona liczba paczek w locie trzyma pamięć w ryzach, a
+        # kolejka FIFO zachowuje kolejność wierszy z pliku.
+        workers = workers or os.cpu_count() or 1
+        max_in_flight = 2 * workers
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for first_line, text in chunks:
+                pending.append(executor.submit(job, first_line, text))
+                if len(pending) >= max_in_flight:
+                    apply(pending.popleft().result())
+            while pending:
+                apply(pending.popleft().result())
+
+    return report
+
+
+def import_books(
+    file_path,
+    book_manager,
+    chunk_size=10000,
+    workers=None,
+    checksum=False,
+    progress=None,
+):
+    return _import(
+        file_path,
+        ("title", "author", "isbn", "year"),
+        ("year",),
+        partial(validate_book_rows, checksum=checksum),
+        book_manager.add_books,
+        chunk_size,
+        workers,
+        progress,
+    )
+
+
+def import_users(
+    file_path, user_manager, chunk_size=10000, workers=None, progress=None
+):
+    return _import(
+        file_path,
+        ("name", "email"),
+        (),
+        validate_user_rows,
+        user_manager.add_users,
+        chunk_size,
+        workers,
+        progress,
+    )
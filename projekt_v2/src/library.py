@@ -0,0 +1,190 @@
+import copy
+from contextlib import contextmanager
+
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.events import EventBus
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.storage import MemoryStorage
+from src.tracing import traced
+from src.user_manager import UserManager
+
+MISSING = object()
+
+
+class Transaction:
+    def __init__(self, library):
+        self.library = library
+        self._undo = []
+        self._saved = set()
+        self._users = {}
+        self._books = {}
+
+    def user(self, user_id):
+        # Każdy rekord pobieramy najwyżej raz na transakcję.
+        if user_id not in self._users:
+            try:
+                self._users[user_id] = self.library.user_manager.get_user(user_id)
+            except ValueError:
+                raise ValueError(f"Użytkownik o ID {user_id} nie istnieje")
+        return self._users[user_id]
+
+    def book(self, book_id):
+        if book_id not in self._books:
+            try:
+                self._books[book_id] = self.library.book_manager.get_book(book_id)
+            except ValueError:
+                raise ValueError(f"Książka o ID {book_id} nie istnieje")
+        return self._books[book_id]
+
+    def save(self, mapping, key):
+        # Zapamiętuje stan rekordu sprzed pierwszej zmiany w transakcji.
+        marker = (id(mapping), key)
+        if marker in self._saved:
+            return
+        self._saved.add(marker)
+        previous = copy.deepcopy(mapping[key]) if key in mapping else MISSING
+        self._undo.append((mapping, key, previous))
+
+    def rollback(self):
+        for mapping, key, previous in reversed(self._undo):
+            if previous is MISSING:
+                if key in mapping:
+                    del mapping[key]
+                continue
+            current = mapping.get(key)
+            # Przywracamy zawartość w miejscu, żeby zachować tożsamość obiektów.
+            if isinstance(current, dict):
+                current.clear()
+                current.update(previous)
+                previous = current
+            elif isinstance(current, list):
+                current[:] = previous
+                previous = current
+            mapping[key] = previous
+        # Przywrócone książki wracają też do indeksów wyszukiwania.
+        book_manager = self.library.book_manager
+        for mapping, key, _ in self._undo:
+            if mapping is book_manager.books:
+                book_manager._reindex_book(key)
+        self._undo.clear()
+        self._saved.clear()
+
+
+class Library:
+    def __init__(self, storage=None, event_bus=None):
+        self.storage = storage if storage is not None else MemoryStorage()
+        self.event_bus = event_bus if event_bus is not None else EventBus()
+        self.book_manager = BookManager(self.storage, self.event_bus)
+        self.user_manager = UserManager(self.storage, self.event_bus)
+        self.category_manager = CategoryManager(
+            self.book_manager, self.storage, self.event_bus
+        )
+        self.loan_manager = LoanManager(
+            self.book_manager, self.user_manager, self.storage, self.event_bus
+        )
+        self.reservation_manager = ReservationManager(
+            self.book_manager, self.user_manager, self.storage, self.event_bus
+        )
+        self._transaction = None
+
+    @classmethod
+    def from_managers(
+        cls,
+        book_manager,
+        user_manager,
+        loan_manager,
+        reservation_manager,
+        category_manager,
+    ):
+        # Managerowie bez szyny zdarzeń (np. z hydrate_library) zostają
+        # podłączeni do wspólnej szyny.
+        event_bus = reservation_manager.event_bus
+        if event_bus is None:
+            event_bus = EventBus()
+            reservation_manager.connect(event_bus)
+        for manager in (book_manager, user_manager, loan_manager, category_manager):
+            if manager.event_bus is None:
+                manager.event_bus = event_bus
+
+        library = cls.__new__(cls)
+        library.storage = book_manager.storage
+        library.event_bus = event_bus
+        library.book_manager = book_manager
+        library.user_manager = user_manager
+        library.loan_manager = loan_manager
+        library.reservation_manager = reservation_manager
+        library.category_manager = category_manager
+        library._transaction = None
+        return library
+
+    @contextmanager
+    def transaction(self):
+        # Zagnieżdżone operacje dołączają do transakcji zewnętrznej.
+        # Zdarzenia trafiają do obserwatorów szyny dopiero po zatwierdzeniu.
+        if self._transaction is not None:
+            yield self._transaction
+            return
+
+        with self.event_bus.hold():
+            transaction = Transaction(self)
+            self._transaction = transaction
+            try:
+                with self.storage.transaction():
+                    try:
+                        yield transaction
+                    except BaseException:
+                        transaction.rollback()
+                        raise
+            finally:
+                self._transaction = None
+
+    @traced("library.loan_book")
+    def loan_book(self, user_id, book_id):
+        with self.transaction() as tx:
+            tx.user(user_id)
+            book = tx.book(book_id)
+            tx.save(self.book_manager.books, book_id)
+            return self.loan_manager._create_loan(user_id, book_id, book, tx)
+
+    @traced("library.return_book")
+    def return_book(self, loan_id):
+        # Zwraca ID rezerwacji gotowej do odbioru albo False.
+        with self.transaction() as tx:
+            rm = self.reservation_manager
+            loan = self.loan_manager.get_loan(loan_id)
+            book_id = loan["book_id"]
+            tx.save(self.loan_manager.loans, loan_id)
+            tx.save(self.book_manager.books, book_id)
+            queue = rm.book_queues.get(book_id)
+            if queue:
+                tx.save(rm.reservations, queue[0])
+
+            # Początek kolejki promuje ReservationManager w reakcji na
+            # zdarzenie BookReturned.
+            self.loan_manager.return_book(loan_id)
+
+            if queue and rm.reservations[queue[0]]["status"] == "ready":
+                return queue[0]
+            return False
+
+    @traced("library.reserve_book")
+    def reserve_book(self, user_id, book_id):
+        with self.transaction() as tx:
+            tx.user(user_id)
+            book = tx.book(book_id)
+            rm = self.reservation_manager
+            tx.save(rm.book_queues, book_id)
+            return rm._create_reservation(user_id, book_id, book, tx)
+
+    @traced("library.collect_reservation")
+    def collect_reservation(self, reservation_id):
+        # Realizuje gotową rezerwację i od razu wypożycza książkę.
+        with self.transaction() as tx:
+            rm = self.reservation_manager
+            reservation = rm.get_reservation(reservation_id)
+            tx.save(rm.reservations, reservation_id)
+            tx.save(rm.book_queues, reservation["book_id"])
+            rm.complete_reservation(reservation_id)
+            return self.loan_book(reservation["user_id"], reservation["book_id"])
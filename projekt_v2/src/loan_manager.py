@@ -1,34 +1,62 @@
+from src.events import BookReturned, LoanCreated
+from src.ids import IdAllocator, id_property
+from src.storage import MemoryStorage
+from src.tracing import span, traced
+
+
 class LoanManager:
-    def __init__(self, book_manager, user_manager):
-        self.loans = {}
-        self.next_id = 1
+    next_id = id_property()
+
+    def __init__(
+        self, book_manager, user_manager, storage=None, event_bus=None, ids=None
+    ):
+        self.storage = storage if storage is not None else MemoryStorage()
+        self.loans = self.storage.table("loans", indexes=("user_id", "book_id"))
+        self.ids = ids if ids is not None else IdAllocator()
+        self.ids.advance_to(self.storage.next_id("loans"))
         self.book_manager = book_manager
         self.user_manager = user_manager
+        self.event_bus = event_bus
 
+    @traced("loans.loan_book")
     def loan_book(self, user_id, book_id):
         try:
-            self.user_manager.get_user(user_id)
+            with span("users.get_user", user_id=user_id):
+                self.user_manager.get_user(user_id)
         except ValueError:
             raise ValueError(f"Użytkownik o ID {user_id} nie istnieje")
 
         try:
-            book = self.book_manager.get_book(book_id)
+            with span("books.get_book", book_id=book_id):
+                book = self.book_manager.get_book(book_id)
         except ValueError:
             raise ValueError(f"Książka o ID {book_id} nie istnieje")
 
+        return self._create_loan(user_id, book_id, book)
+
+    def _create_loan(self, user_id, book_id, book, tx=None):
+        # Wywoływane także przez Library z rekordami pobranymi raz na transakcję.
+        # Transakcja zapamiętuje faktycznie wydane ID (przy dzierżawach bloków
+        # nie musi to być next_id), żeby wycofanie usunęło nowy rekord.
         if book.get("available") is False:
             raise ValueError(f"Książka o ID {book_id} jest już wypożyczona")
 
         book["available"] = False
+        self.book_manager.save_book(book_id, book)
 
         loan = {"user_id": user_id, "book_id": book_id, "returned": False}
 
-        loan_id = self.next_id
+        loan_id = self.ids.allocate()
+        if tx is not None:
+            tx.save(self.loans, loan_id)
         self.loans[loan_id] = loan
-        self.next_id += 1
+
+        if self.event_bus is not None:
+            self.event_bus.publish(LoanCreated(loan_id, loan, book))
 
         return loan_id
 
+    @traced("loans.return_book")
     def return_book(self, loan_id):
         if loan_id not in self.loans:
             raise ValueError(f"Wypożyczenie o ID {loan_id} nie istnieje")
@@ -41,9 +69,15 @@ class LoanManager:
             )
 
         loan["returned"] = True
+        self.loans[loan_id] = loan
 
         book = self.book_manager.get_book(loan["book_id"])
         book["available"] = True
+        self.book_manager.save_book(loan["book_id"], book)
+
+        # Subskrybenci (np. ReservationManager) reagują na zwrot od razu.
+        if self.event_bus is not None:
+            self.event_bus.publish(BookReturned(loan_id, loan["book_id"], loan, book))
 
         return True
 
@@ -0,0 +1,118 @@
+import sys
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from types import FunctionType, ModuleType
+
+_CONTAINERS = (dict, list, set, frozenset, tuple, deque)
+
+
+def deep_size(obj, seen=None):
+    # Rozmiar obiektu razem ze wszystkim, do czego się odwołuje. Obiekty
+    # współdzielone są liczone raz w ramach jednego zbioru seen.
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, (type, ModuleType, FunctionType)):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, set, frozenset, tuple, deque)):
+            stack.extend(current)
+        if hasattr(current, "__dict__"):
+            stack.append(vars(current))
+    return size
+
+
+def memory_report(**managers):
+    # np. memory_report(books=book_manager, reservations=reservation_manager)
+    # Dla każdego managera raportuje każdą strukturę trzymaną w pamięci
+    # (tabele, kolejki, indeksy). Tabele w SQLite lub migawce mmap nie
+    # zajmują pamięci procesu i są pomijane.
+    seen = set()
+    report = {}
+    total = 0
+    for name, manager in managers.items():
+        structures = {}
+        attributes = vars(manager)
+        indexes = attributes.get("_indexes", ())
+        for attribute, value in attributes.items():
+            if isinstance(value, _CONTAINERS) and value is not indexes:
+                structures[attribute] = deep_size(value, seen)
+        # Indeksy wyszukiwania BookManager to obiekty, a nie kontenery:
+        # każdy raportujemy osobno, pod nazwą atrybutu managera.
+        names = {id(value): attribute for attribute, value in attributes.items()}
+        for index in indexes:
+            attribute = names.get(id(index), type(index).__name__)
+            structures[attribute] = deep_size(index, seen)
+        structures["total"] = sum(structures.values())
+        total += structures["total"]
+        report[name] = structures
+    report["total"] = total
+    return report
+
+
+def format_size(size):
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def format_memory_report(report):
+    lines = []
+    for name, structures in report.items():
+        if name == "total":
+            continue
+        lines.append(f"{name}: {format_size(structures['total'])}")
+        for attribute, size in structures.items():
+            if attribute != "total":
+                lines.append(f"  {attribute}: {format_size(size)}")
+    lines.append(f"razem: {format_size(report['total'])}")
+    return "\n".join(lines)
+
+
+class AllocationReport:
+    def __init__(self):
+        self.allocated = 0
+        self.peak = 0
+        self.top = []
+
+    def format(self):
+        lines = [
+            f"przyrost: {format_size(self.allocated)}, szczyt: {format_size(self.peak)}"
+        ]
+        lines.extend(str(stat) for stat in self.top)
+        return "\n".join(lines)
+
+
+@contextmanager
+def trace_allocations(top=10, key_type="lineno"):
+    # Różnica migawek tracemalloc wokół operacji, np. importu 100 tys. wierszy:
+    #     with trace_allocations() as allocations:
+    #         import_books(path, book_manager)
+    #     print(allocations.format())
+    report = AllocationReport()
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    before = tracemalloc.take_snapshot().filter_traces(ignore)
+    try:
+        yield report
+    finally:
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+        report.peak = tracemalloc.get_traced_memory()[1]
+        if started_here:
+            tracemalloc.stop()
+        stats = after.compare_to(before, key_type)
+        report.allocated = sum(stat.size_diff for stat in stats)
+        report.top = stats[:top]
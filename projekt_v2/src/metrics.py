@@ -0,0 +1,206 @@
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.workload import MANAGER_METHODS, install_wrapper, uninstall_wrapper
+
+# Histogram logarytmiczno-liniowy w stylu HDR: każda potęga dwójki jest
+# dzielona na 2**SUB_BUCKET_BITS równych przedziałów, co daje błąd względny
+# poniżej 1/32 niezależnie od rzędu wielkości opóźnienia.
+SUB_BUCKET_BITS = 5
+_LINEAR_LIMIT = 1 << (SUB_BUCKET_BITS + 1)
+
+
+def bucket_index(value):
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    if shift <= 0:
+        return value
+    return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+
+def bucket_upper_bound(index):
+    if index < _LINEAR_LIMIT:
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    top = index - (shift << SUB_BUCKET_BITS)
+    return ((top + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction):
+        if not self.count:
+            return 0
+        target = max(1, fraction * self.count)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(bucket_upper_bound(index), self.max)
+        return self.max
+
+    def buckets(self):
+        # Skumulowane liczności dla niepustych przedziałów: (górna granica, n).
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            yield bucket_upper_bound(index), seen
+
+
+class MethodStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class ManagerMetrics:
+    def __init__(self):
+        # Instrumentacja jest opcjonalna: dopóki instrument() nie zostanie
+        # wywołane, metody managerów pozostają nietknięte.
+        self.stats = {}
+        self._wrapped = []
+
+    def instrument(self, **managers):
+        # np. metrics.instrument(books=book_manager, loans=loan_manager)
+        for name, manager in managers.items():
+            if name not in MANAGER_METHODS:
+                raise ValueError(f"Nieznany manager: {name}")
+            for method_name in MANAGER_METHODS[name]:
+                stats = self.stats.setdefault((name, method_name), MethodStats())
+                wrapper = self._wrap(manager, method_name, stats)
+                self._wrapped.append(install_wrapper(manager, method_name, wrapper))
+        return self
+
+    def _wrap(self, manager, method_name, stats):
+        method = getattr(manager, method_name)
+        clock = time.perf_counter_ns
+        record = stats.latency.record
+
+        @functools.wraps(method)
+        def measured(*args, **kwargs):
+            if not measured.active:
+                return method(*args, **kwargs)
+            started = clock()
+            try:
+                return method(*args, **kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.calls += 1
+                record(clock() - started)
+
+        return measured
+
+    def uninstrument(self):
+        for entry in reversed(self._wrapped):
+            uninstall_wrapper(*entry)
+        self._wrapped.clear()
+
+    def reset(self):
+        for key in self.stats:
+            self.stats[key] = MethodStats()
+
+    def summary(self):
+        # Czasy w mikrosekundach, tylko dla metod, które były wywołane.
+        return {
+            f"{name}.{method_name}": {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "p50": stats.latency.percentile(0.50) / 1000,
+                "p99": stats.latency.percentile(0.99) / 1000,
+                "max": stats.latency.max / 1000,
+            }
+            for (name, method_name), stats in sorted(self.stats.items())
+            if stats.calls
+        }
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP library_calls_total Liczba wywołań metod managerów.",
+            "# TYPE library_calls_total counter",
+        ]
+        called = [
+            (f'manager="{_escape(name)}",method="{_escape(method_name)}"', stats)
+            for (name, method_name), stats in sorted(self.stats.items())
+            if stats.calls
+        ]
+        for labels, stats in called:
+            lines.append(f"library_calls_total{{{labels}}} {stats.calls}")
+
+        lines.append("# HELP library_errors_total Liczba wywołań zakończonych błędem.")
+        lines.append("# TYPE library_errors_total counter")
+        for labels, stats in called:
+            lines.append(f"library_errors_total{{{labels}}} {stats.errors}")
+
+        lines.append(
+            "# HELP library_call_duration_seconds Czas wykonania metod managerów."
+        )
+        lines.append("# TYPE library_call_duration_seconds histogram")
+        for labels, stats in called:
+            histogram = stats.latency
+            for upper, cumulative in histogram.buckets():
+                lines.append(
+                    f"library_call_duration_seconds_bucket{{{labels},"
+                    f'le="{upper / 1e9:.9g}"}} {cumulative}'
+                )
+            lines.append(
+                f'library_call_duration_seconds_bucket{{{labels},le="+Inf"}} '
+                f"{histogram.count}"
+            )
+            lines.append(
+                f"library_call_duration_seconds_sum{{{labels}}} "
+                f"{histogram.total / 1e9:.9g}"
+            )
+            lines.append(
+                f"library_call_duration_seconds_count{{{labels}}} {histogram.count}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, file_path):
+        # Zapis atomowy, np. dla node_exporter textfile collector.
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, file_path)
+
+    def serve_prometheus(self, host="127.0.0.1", port=9464):
+        # Udostępnia metryki pod /metrics w wątku w tle; zwraca serwer,
+        # który zatrzymuje się przez shutdown().
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -0,0 +1,140 @@
+import bisect
+import random
+import time
+
+from src.events import LoanCreated, ReservationCreated
+
+_PRIME = (1 << 61) - 1  # liczba pierwsza dla haszowania uniwersalnego
+
+
+class CountMinSketch:
+    # Przybliżone liczniki w stałej pamięci: depth wierszy po width komórek.
+    # Oszacowanie nigdy nie jest mniejsze od prawdziwej liczby, a zawyżenie
+    # to najwyżej ok. 2/width wszystkich zliczeń z prawdopodobieństwem
+    # 1 - 2^-depth. Szkice o tych samych parametrach można odejmować.
+
+    def __init__(self, width=2048, depth=4, seed=0):
+        rng = random.Random(seed)
+        self.width = width
+        self.depth = depth
+        self._hashes = [
+            (rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(depth)
+        ]
+        self._rows = [[0] * width for _ in range(depth)]
+
+    def _cells(self, key):
+        width = self.width
+        return [(a * key + b) % _PRIME % width for a, b in self._hashes]
+
+    def add(self, key, count=1, cells=None):
+        for row, cell in zip(self._rows, cells or self._cells(key)):
+            row[cell] += count
+
+    def estimate(self, key, cells=None):
+        return min(
+            row[cell] for row, cell in zip(self._rows, cells or self._cells(key))
+        )
+
+    def subtract(self, other):
+        for row, other_row in zip(self._rows, other._rows):
+            for cell, value in enumerate(other_row):
+                if value:
+                    row[cell] -= value
+
+    def clear(self):
+        for row in self._rows:
+            row[:] = [0] * self.width
+
+
+class PopularityTracker:
+    # Najpopularniejsze książki w przesuwanym oknie czasu (domyślnie tydzień)
+    # z wypożyczeń i rezerwacji. Okno to buckets szkiców count-min; szkic
+    # zbiorczy jest ich sumą, więc przy przesunięciu okna wystarczy odjąć
+    # najstarszy. Kandydaci do czołówki (capacity książek o największych
+    # oszacowaniach) są trzymani w posortowanej liście, więc top(k) to O(k).
+
+    def __init__(
+        self,
+        event_bus=None,
+        window=7 * 24 * 3600,
+        buckets=7,
+        width=2048,
+        depth=4,
+        capacity=100,
+        clock=time.time,
+    ):
+        if buckets < 1 or window <= 0 or capacity < 1:
+            raise ValueError("Okno, liczba przedziałów i capacity muszą być dodatnie")
+        self.span = window / buckets
+        self.capacity = capacity
+        self.clock = clock
+        self._buckets = [CountMinSketch(width, depth) for _ in range(buckets)]
+        self._total = CountMinSketch(width, depth)
+        self._epoch = int(clock() // self.span)
+        self._estimates = {}  # ID książki -> oszacowanie
+        self._ranked = []  # posortowane (oszacowanie, -ID)
+        if event_bus is not None:
+            self.attach(event_bus)
+
+    def attach(self, event_bus):
+        event_bus.subscribe(LoanCreated, self._on_loan)
+        event_bus.subscribe(ReservationCreated, self._on_reservation)
+
+    def _on_loan(self, event):
+        self.record(event.loan["book_id"])
+
+    def _on_reservation(self, event):
+        self.record(event.reservation["book_id"])
+
+    def _advance(self):
+        epoch = int(self.clock() // self.span)
+        if epoch <= self._epoch:
+            return
+        for step in range(min(epoch - self._epoch, len(self._buckets))):
+            expired = self._buckets[(self._epoch + step + 1) % len(self._buckets)]
+            self._total.subtract(expired)
+            expired.clear()
+        self._epoch = epoch
+
+        # Stare zliczenia wypadły z okna: przeliczamy kandydatów.
+        estimates = {}
+        for book_id in self._estimates:
+            estimate = self._total.estimate(book_id)
+            if estimate > 0:
+                estimates[book_id] = estimate
+        self._estimates = estimates
+        self._ranked = sorted(
+            (estimate, -book_id) for book_id, estimate in estimates.items()
+        )
+
+    def record(self, book_id, count=1):
+        self._advance()
+        cells = self._total._cells(book_id)
+        self._buckets[self._epoch % len(self._buckets)].add(book_id, count, cells)
+        self._total.add(book_id, count, cells)
+        estimate = self._total.estimate(book_id, cells)
+
+        ranked = self._ranked
+        previous = self._estimates.get(book_id)
+        if previous is not None:
+            del ranked[bisect.bisect_left(ranked, (previous, -book_id))]
+        elif len(ranked) >= self.capacity:
+            if estimate <= ranked[0][0]:
+                return
+            _, evicted = ranked.pop(0)
+            del self._estimates[-evicted]
+        self._estimates[book_id] = estimate
+        bisect.insort(ranked, (estimate, -book_id))
+
+    def estimate(self, book_id):
+        self._advance()
+        return self._total.estimate(book_id)
+
+    def top(self, k=10):
+        # Lista (ID książki, oszacowanie) od najpopularniejszej.
+        self._advance()
+        if k < 1:
+            return []
+        return [
+            (-negative_id, count) for count, negative_id in self._ranked[: -k - 1 : -1]
+        ]
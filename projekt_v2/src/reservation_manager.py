@@ -1,40 +1,88 @@
 from datetime import datetime, timedelta
 
+from src.events import (
+    BookReturned,
+    ReservationCancelled,
+    ReservationCompleted,
+    ReservationCreated,
+    ReservationExpired,
+    ReservationReady,
+)
+from src.ids import IdAllocator, id_property
+from src.storage import MemoryStorage, select
+from src.tracing import span, traced
+
 
 class ReservationManager:
-    def __init__(self, book_manager, user_manager):
-        self.reservations = {}
-        self.next_id = 1
+    next_id = id_property()
+
+    def __init__(
+        self, book_manager, user_manager, storage=None, event_bus=None, ids=None
+    ):
+        self.storage = storage if storage is not None else MemoryStorage()
+        self.reservations = self.storage.table(
+            "reservations", indexes=("user_id", "book_id", "status")
+        )
+        self.ids = ids if ids is not None else IdAllocator()
+        self.ids.advance_to(self.storage.next_id("reservations"))
         self.book_manager = book_manager
         self.user_manager = user_manager
-        self.book_queues = {}
+        self.book_queues = self._build_queues()
         self.reservation_expiry_days = 3
-
+        self.event_bus = None
+        if event_bus is not None:
+            self.connect(event_bus)
+
+    def connect(self, event_bus):
+        # Zwrot książki od razu promuje początek kolejki rezerwacji, także
+        # wewnątrz transakcji Library (odbiorca natychmiastowy).
+        self.event_bus = event_bus
+        event_bus.subscribe(BookReturned, self._on_book_returned, immediate=True)
+
+    def _on_book_returned(self, event):
+        self.book_returned(event.book_id)
+
+    def _build_queues(self):
+        # Kolejki wynikają z aktywnych rezerwacji, więc przy trwałym
+        # magazynie odtwarzamy je zamiast przechowywać.
+        active = select(self.reservations, "status", "waiting") + select(
+            self.reservations, "status", "ready"
+        )
+        queues = {}
+        for res_id, res in sorted(active, key=lambda item: item[0]):
+            queues.setdefault(res["book_id"], []).append(res_id)
+        return queues
+
+    @traced("reservations.reserve_book")
     def reserve_book(self, user_id, book_id):
         try:
-            self.user_manager.get_user(user_id)
+            with span("users.get_user", user_id=user_id):
+                self.user_manager.get_user(user_id)
         except ValueError:
             raise ValueError(f"Użytkownik o ID {user_id} nie istnieje")
 
         try:
-            book = self.book_manager.get_book(book_id)
+            with span("books.get_book", book_id=book_id):
+                book = self.book_manager.get_book(book_id)
         except ValueError:
             raise ValueError(f"Książka o ID {book_id} nie istnieje")
 
+        return self._create_reservation(user_id, book_id, book)
+
+    def _create_reservation(self, user_id, book_id, book, tx=None):
+        # Wywoływane także przez Library z rekordami pobranymi raz na transakcję
+        # (tx zapamiętuje wydane ID, jak w LoanManager._create_loan).
         if book.get("available") is True:
             raise ValueError(
                 f"Książka o ID {book_id} jest już dostępna, można ją wypożyczyć zamiast rezerwować"
             )
 
-        for res_id, res in self.reservations.items():
-            if (
-                res["user_id"] == user_id
-                and res["book_id"] == book_id
-                and res["status"] in ["waiting", "ready"]
-            ):
-                raise ValueError(
-                    f"Użytkownik o ID {user_id} już zarezerwował książkę o ID {book_id}"
-                )
+        with span("reservations.duplicate_scan"):
+            for res_id, res in select(self.reservations, "user_id", user_id):
+                if res["book_id"] == book_id and res["status"] in ["waiting", "ready"]:
+                    raise ValueError(
+                        f"Użytkownik o ID {user_id} już zarezerwował książkę o ID {book_id}"
+                    )
 
         reservation = {
             "user_id": user_id,
@@ -44,16 +92,22 @@ class ReservationManager:
             "notification_sent": False,
         }
 
-        reservation_id = self.next_id
+        reservation_id = self.ids.allocate()
+        if tx is not None:
+            tx.save(self.reservations, reservation_id)
         self.reservations[reservation_id] = reservation
-        self.next_id += 1
 
-        if book_id not in self.book_queues:
-            self.book_queues[book_id] = []
-        self.book_queues[book_id].append(reservation_id)
+        with span("reservations.queue_append"):
+            if book_id not in self.book_queues:
+                self.book_queues[book_id] = []
+            self.book_queues[book_id].append(reservation_id)
+
+        if self.event_bus is not None:
+            self.event_bus.publish(ReservationCreated(reservation_id, reservation))
 
         return reservation_id
 
+    @traced("reservations.cancel_reservation")
     def cancel_reservation(self, reservation_id):
         if reservation_id not in self.reservations:
             raise ValueError(f"Rezerwacja o ID {reservation_id} nie istnieje")
@@ -68,10 +122,14 @@ class ReservationManager:
 
         reservation["status"] = "cancelled"
         reservation["cancel_date"] = datetime.now().isoformat()
+        self.reservations[reservation_id] = reservation
 
         if book_id in self.book_queues and reservation_id in self.book_queues[book_id]:
             self.book_queues[book_id].remove(reservation_id)
 
+        if self.event_bus is not None:
+            self.event_bus.publish(ReservationCancelled(reservation_id, reservation))
+
         return True
 
     def get_reservation(self, reservation_id):
@@ -81,27 +139,16 @@ class ReservationManager:
 
     def list_reservations(self, status=None):
         if status:
-            return [
-                res
-                for res_id, res in self.reservations.items()
-                if res["status"] == status
-            ]
+            return [res for res_id, res in select(self.reservations, "status", status)]
         return list(self.reservations.values())
 
     def get_user_reservations(self, user_id):
-        return [
-            res
-            for res_id, res in self.reservations.items()
-            if res["user_id"] == user_id
-        ]
+        return [res for res_id, res in select(self.reservations, "user_id", user_id)]
 
     def get_book_reservations(self, book_id):
-        return [
-            res
-            for res_id, res in self.reservations.items()
-            if res["book_id"] == book_id
-        ]
+        return [res for res_id, res in select(self.reservations, "book_id", book_id)]
 
+    @traced("reservations.book_returned")
     def book_returned(self, book_id):
         if book_id not in self.book_queues or not self.book_queues[book_id]:
             return False
@@ -115,18 +162,26 @@ class ReservationManager:
             datetime.now() + timedelta(days=self.reservation_expiry_days)
         ).isoformat()
         next_reservation["notification_sent"] = True
+        self.reservations[next_reservation_id] = next_reservation
+
+        if self.event_bus is not None:
+            self.event_bus.publish(
+                ReservationReady(next_reservation_id, next_reservation)
+            )
 
         return next_reservation_id
 
+    @traced("reservations.check_expired_reservations")
     def check_expired_reservations(self):
         now = datetime.now()
         expired_reservations = []
 
-        for res_id, res in self.reservations.items():
-            if res["status"] == "ready" and "expiry_date" in res:
+        for res_id, res in select(self.reservations, "status", "ready"):
+            if "expiry_date" in res:
                 expiry_date = datetime.fromisoformat(res["expiry_date"])
                 if now > expiry_date:
                     res["status"] = "expired"
+                    self.reservations[res_id] = res
                     book_id = res["book_id"]
                     if (
                         book_id in self.book_queues
@@ -135,10 +190,14 @@ class ReservationManager:
                         self.book_queues[book_id].remove(res_id)
                     expired_reservations.append(res_id)
 
+                    if self.event_bus is not None:
+                        self.event_bus.publish(ReservationExpired(res_id, res))
+
                     self.book_returned(book_id)
 
         return expired_reservations
 
+    @traced("reservations.complete_reservation")
     def complete_reservation(self, reservation_id):
         if reservation_id not in self.reservations:
             raise ValueError(f"Rezerwacja o ID {reservation_id} nie istnieje")
@@ -153,10 +212,14 @@ class ReservationManager:
 
         reservation["status"] = "completed"
         reservation["completion_date"] = datetime.now().isoformat()
+        self.reservations[reservation_id] = reservation
 
         if book_id in self.book_queues and reservation_id in self.book_queues[book_id]:
             self.book_queues[book_id].remove(reservation_id)
 
+        if self.event_bus is not None:
+            self.event_bus.publish(ReservationCompleted(reservation_id, reservation))
+
         return True
 
     def get_position_in_queue(self, reservation_id):
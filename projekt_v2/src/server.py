@@ -0,0 +1,526 @@
+"""Serwer HTTP/JSON udostępniający operacje biblioteki.
+
+Uruchomienie z katalogu projektu:
+
+    python -m src.server --port 8080 [--snapshot biblioteka.json]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+from http import HTTPStatus
+from itertools import islice
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from src.library import Library
+from src.popularity import PopularityTracker
+from src.snapshot import load_library
+from src.vacuum import Vacuum
+
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 16 * 1024 * 1024
+MAX_BATCH_SIZE = 1000
+DEFAULT_PAGE_SIZE = 1000
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HttpError(400, f"Parametr {name} musi być liczbą całkowitą")
+
+
+def _bool(value, name):
+    if value is None or value in ("true", "false"):
+        return None if value is None else value == "true"
+    raise HttpError(400, f"Parametr {name} musi mieć wartość true albo false")
+
+
+def _field(payload, name, convert=None):
+    if not isinstance(payload, dict) or name not in payload:
+        raise HttpError(400, f"Brak pola {name}")
+    value = payload[name]
+    return _int(value, name) if convert is int else value
+
+
+def _page(items, query):
+    offset = _int(query.get("offset", 0), "offset")
+    limit = _int(query.get("limit", DEFAULT_PAGE_SIZE), "limit")
+    return list(islice(items, offset, offset + limit))
+
+
+def _with_ids(items):
+    return ({"id": record_id, **record} for record_id, record in items)
+
+
+class LibraryService:
+    def __init__(self, library=None):
+        # Jeden wspólny stan w pamięci; pętla zdarzeń wykonuje żądania po
+        # kolei, więc operacje na managerach nie wymagają blokad.
+        self.library = library if library is not None else Library()
+        # Indeksy wyszukiwania budujemy przed startem, żeby pierwsze
+        # wyszukiwanie nie wstrzymało pętli zdarzeń na czas ich budowy.
+        self.library.book_manager.build_indexes()
+        # Najczęściej wypożyczane i rezerwowane książki z ostatniego tygodnia.
+        self.popularity = PopularityTracker(self.library.event_bus)
+        self.routes = {}
+        self._register_routes()
+
+    def route(self, method, pattern, handler):
+        # Trasy są grupowane po pierwszym segmencie ścieżki, więc żądanie
+        # sprawdza tylko kilka wyrażeń zamiast całej tabeli.
+        resource = pattern.split("/")[1]
+        self.routes.setdefault(resource, []).append(
+            (method, re.compile(f"^{pattern}$"), handler)
+        )
+
+    def _register_routes(self):
+        number = r"(\d+)"
+        name = r"([^/]+)"
+        self.route("GET", "/books", self.list_books)
+        self.route("POST", "/books", self.add_book)
+        self.route("GET", "/books/search", self.search_books)
+        self.route("GET", "/books/availability", self.books_availability)
+        self.route("GET", "/books/popular", self.popular_books)
+        self.route("GET", f"/books/{number}", self.get_book)
+        self.route("PATCH", f"/books/{number}", self.update_book)
+        self.route("DELETE", f"/books/{number}", self.remove_book)
+        self.route("POST", f"/books/{number}/categories", self.assign_category)
+        self.route(
+            "DELETE", f"/books/{number}/categories/{name}", self.unassign_category
+        )
+        self.route("GET", "/users", self.list_users)
+        self.route("POST", "/users", self.add_user)
+        self.route("GET", "/users/search", self.search_users)
+        self.route("GET", f"/users/{number}", self.get_user)
+        self.route("PATCH", f"/users/{number}", self.update_user)
+        self.route("DELETE", f"/users/{number}", self.remove_user)
+        self.route("GET", f"/users/{number}/reservations", self.user_reservations)
+        self.route("GET", "/loans", self.list_loans)
+        self.route("POST", "/loans", self.loan_book)
+        self.route("GET", f"/loans/{number}", self.get_loan)
+        self.route("POST", f"/loans/{number}/return", self.return_book)
+        self.route("GET", "/reservations", self.list_reservations)
+        self.route("POST", "/reservations", self.reserve_book)
+        self.route("POST", "/reservations/check-expired", self.check_expired)
+        self.route("GET", f"/reservations/{number}", self.get_reservation)
+        self.route("GET", f"/reservations/{number}/position", self.queue_position)
+        self.route("POST", f"/reservations/{number}/cancel", self.cancel_reservation)
+        self.route("POST", f"/reservations/{number}/collect", self.collect_reservation)
+        self.route("GET", "/categories", self.list_categories)
+        self.route("POST", "/categories", self.add_category)
+        self.route("DELETE", f"/categories/{name}", self.remove_category)
+        self.route("GET", f"/categories/{name}/books", self.category_books)
+        self.route("POST", "/batch", self.batch)
+
+    def dispatch(self, method, target, payload):
+        # Zwraca (status, dane JSON); błędy walidacji managerów to 400,
+        # brakujące rekordy to 404, a każdy inny wyjątek to 500, żeby jedno
+        # żądanie nie przerwało obsługi połączenia.
+        try:
+            parts = urlsplit(target)
+        except ValueError:
+            return 400, {"error": f"Nieprawidłowy adres: {target}"}
+        path = parts.path.rstrip("/") or "/"
+        if not path.startswith("/"):
+            return 404, {"error": f"Nieznany zasób: {path}"}
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        allowed = False
+        resource = path.split("/", 2)[1]
+        for route_method, pattern, handler in self.routes.get(resource, ()):
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            args = [unquote(group) for group in match.groups()]
+            try:
+                return handler(*args, query=query, payload=payload)
+            except HttpError as error:
+                return error.status, {"error": str(error)}
+            except ValueError as error:
+                message = str(error)
+                status = (
+                    404 if "nie istnieje" in message or "not exist" in message else 400
+                )
+                return status, {"error": message}
+            except Exception as error:
+                return 500, {"error": f"Błąd serwera: {type(error).__name__}"}
+        if allowed:
+            return 405, {"error": f"Metoda {method} nie jest obsługiwana dla {path}"}
+        return 404, {"error": f"Nieznany zasób: {path}"}
+
+    # Książki
+
+    def list_books(self, query, payload):
+        return 200, _page(_with_ids(self.library.book_manager.books.items()), query)
+
+    def search_books(self, query, payload):
+        bm = self.library.book_manager
+        if "q" in query:
+            # Ranking BM25: pobieramy tyle najlepszych, ile obejmuje strona.
+            wanted = _int(query.get("offset", 0), "offset") + _int(
+                query.get("limit", DEFAULT_PAGE_SIZE), "limit"
+            )
+            books = bm.search_books(query["q"], max(wanted, 1))
+            return 200, _page(iter(books), query)
+        available = _bool(query.get("available"), "available")
+        if "title" in query:
+            books = bm.find_books_by_title(query["title"], available)
+        elif "author" in query:
+            books = bm.find_books_by_author(query["author"], available)
+        else:
+            raise HttpError(400, "Podaj parametr q, title albo author")
+        return 200, _page(iter(books), query)
+
+    def books_availability(self, query, payload):
+        bm = self.library.book_manager
+        return 200, {
+            "available": bm.count_available(),
+            "unavailable": bm.count_unavailable(),
+        }
+
+    def popular_books(self, query, payload):
+        books = self.library.book_manager.books
+        limit = _int(query.get("limit", 10), "limit")
+        return 200, [
+            {"id": book_id, "score": score, **books[book_id]}
+            for book_id, score in self.popularity.top(limit)
+            if book_id in books
+        ]
+
+    def add_book(self, query, payload):
+        book_id = self.library.book_manager.add_book(
+            _field(payload, "title"),
+            _field(payload, "author"),
+            _field(payload, "isbn"),
+            payload.get("year"),
+        )
+        return 201, {"id": book_id}
+
+    def get_book(self, book_id, query, payload):
+        book_id = int(book_id)
+        return 200, {"id": book_id, **self.library.book_manager.get_book(book_id)}
+
+    def update_book(self, book_id, query, payload):
+        if not isinstance(payload, dict):
+            raise HttpError(400, "Oczekiwano obiektu JSON")
+        self.library.book_manager.update_book(
+            int(book_id),
+            new_title=payload.get("title"),
+            new_author=payload.get("author"),
+            new_year=payload.get("year"),
+        )
+        return self.get_book(book_id, query, payload)
+
+    def remove_book(self, book_id, query, payload):
+        self.library.book_manager.remove_book(int(book_id))
+        return 204, None
+
+    # Użytkownicy
+
+    def list_users(self, query, payload):
+        return 200, _page(_with_ids(self.library.user_manager.users.items()), query)
+
+    def search_users(self, query, payload):
+        if "name" not in query:
+            raise HttpError(400, "Podaj parametr name")
+        users = self.library.user_manager.find_users_by_name(query["name"])
+        return 200, _page(iter(users), query)
+
+    def add_user(self, query, payload):
+        user_id = self.library.user_manager.add_user(
+            _field(payload, "name"), _field(payload, "email")
+        )
+        return 201, {"id": user_id}
+
+    def get_user(self, user_id, query, payload):
+        user_id = int(user_id)
+        return 200, {"id": user_id, **self.library.user_manager.get_user(user_id)}
+
+    def update_user(self, user_id, query, payload):
+        if not isinstance(payload, dict):
+            raise HttpError(400, "Oczekiwano obiektu JSON")
+        self.library.user_manager.update_user(
+            int(user_id), new_name=payload.get("name"), new_email=payload.get("email")
+        )
+        return self.get_user(user_id, query, payload)
+
+    def remove_user(self, user_id, query, payload):
+        self.library.user_manager.remove_user(int(user_id))
+        return 204, None
+
+    def user_reservations(self, user_id, query, payload):
+        rm = self.library.reservation_manager
+        return 200, rm.get_user_reservations(int(user_id))
+
+    # Wypożyczenia
+
+    def list_loans(self, query, payload):
+        return 200, _page(_with_ids(self.library.loan_manager.loans.items()), query)
+
+    def loan_book(self, query, payload):
+        loan_id = self.library.loan_book(
+            _field(payload, "user_id", int), _field(payload, "book_id", int)
+        )
+        return 201, {"id": loan_id}
+
+    def get_loan(self, loan_id, query, payload):
+        loan_id = int(loan_id)
+        return 200, {"id": loan_id, **self.library.loan_manager.get_loan(loan_id)}
+
+    def return_book(self, loan_id, query, payload):
+        ready = self.library.return_book(int(loan_id))
+        return 200, {"returned": True, "ready_reservation_id": ready or None}
+
+    # Rezerwacje
+
+    def list_reservations(self, query, payload):
+        rm = self.library.reservation_manager
+        if "status" in query:
+            return 200, _page(iter(rm.list_reservations(query["status"])), query)
+        return 200, _page(_with_ids(rm.reservations.items()), query)
+
+    def reserve_book(self, query, payload):
+        reservation_id = self.library.reserve_book(
+            _field(payload, "user_id", int), _field(payload, "book_id", int)
+        )
+        return 201, {"id": reservation_id}
+
+    def get_reservation(self, reservation_id, query, payload):
+        reservation_id = int(reservation_id)
+        reservation = self.library.reservation_manager.get_reservation(reservation_id)
+        return 200, {"id": reservation_id, **reservation}
+
+    def queue_position(self, reservation_id, query, payload):
+        rm = self.library.reservation_manager
+        return 200, {"position": rm.get_position_in_queue(int(reservation_id))}
+
+    def cancel_reservation(self, reservation_id, query, payload):
+        self.library.reservation_manager.cancel_reservation(int(reservation_id))
+        return self.get_reservation(reservation_id, query, payload)
+
+    def collect_reservation(self, reservation_id, query, payload):
+        loan_id = self.library.collect_reservation(int(reservation_id))
+        return 201, {"loan_id": loan_id}
+
+    def check_expired(self, query, payload):
+        expired = self.library.reservation_manager.check_expired_reservations()
+        return 200, {"expired": expired}
+
+    # Kategorie
+
+    def list_categories(self, query, payload):
+        return 200, sorted(self.library.category_manager.get_all_categories())
+
+    def add_category(self, query, payload):
+        self.library.category_manager.add_category(_field(payload, "name"))
+        return 201, {"name": payload["name"]}
+
+    def remove_category(self, category, query, payload):
+        self.library.category_manager.remove_category(category)
+        return 204, None
+
+    def category_books(self, category, query, payload):
+        return 200, self.library.category_manager.get_books_by_category(category)
+
+    def assign_category(self, book_id, query, payload):
+        self.library.category_manager.assign_category(
+            int(book_id), _field(payload, "category")
+        )
+        return self.get_book(book_id, query, payload)
+
+    def unassign_category(self, book_id, category, query, payload):
+        self.library.category_manager.remove_category_from_book(int(book_id), category)
+        return self.get_book(book_id, query, payload)
+
+    # Wsadowe wykonanie wielu operacji w jednym żądaniu
+
+    def batch(self, query, payload):
+        if not isinstance(payload, list):
+            raise HttpError(400, "Oczekiwano listy operacji")
+        if len(payload) > MAX_BATCH_SIZE:
+            raise HttpError(413, f"Maksymalnie {MAX_BATCH_SIZE} operacji w partii")
+        results = []
+        for operation in payload:
+            if (
+                not isinstance(operation, dict)
+                or not isinstance(operation.get("path", ""), str)
+                or not isinstance(operation.get("method", "GET"), str)
+                or operation.get("path") == "/batch"
+            ):
+                results.append(
+                    {"status": 400, "body": {"error": "Nieprawidłowa operacja"}}
+                )
+                continue
+            status, body = self.dispatch(
+                operation.get("method", "GET").upper(),
+                operation.get("path", ""),
+                operation.get("body"),
+            )
+            results.append({"status": status, "body": body})
+        return 200, results
+
+
+def _response(status, data, keep_alive):
+    body = b"" if data is None else json.dumps(data, ensure_ascii=False).encode()
+    head = (
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+    )
+    if not keep_alive:
+        head += "Connection: close\r\n"
+    return head.encode("latin-1") + b"\r\n" + body
+
+
+class HttpProtocol(asyncio.Protocol):
+    # Wszystkie kompletne żądania z bufora (także potokowane) są obsługiwane
+    # od razu, a odpowiedzi wysyłane jednym zapisem w kolejności żądań.
+
+    def __init__(self, service):
+        self.service = service
+        self.buffer = bytearray()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def pause_writing(self):
+        # Klient nie odbiera odpowiedzi: przestajemy czytać kolejne żądania.
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+    def data_received(self, data):
+        self.buffer += data
+        responses = []
+        close = False
+        while True:
+            header_end = self.buffer.find(b"\r\n\r\n")
+            if header_end < 0:
+                if len(self.buffer) > MAX_HEADER_SIZE:
+                    responses.append(
+                        _response(431, {"error": "Za duże nagłówki"}, False)
+                    )
+                    close = True
+                break
+            request = self._parse_head(bytes(self.buffer[:header_end]))
+            if request is None:
+                responses.append(
+                    _response(400, {"error": "Nieprawidłowe żądanie"}, False)
+                )
+                close = True
+                break
+            method, target, keep_alive, length = request
+            if length > MAX_BODY_SIZE:
+                responses.append(_response(413, {"error": "Za duża treść"}, False))
+                close = True
+                break
+            body_start = header_end + 4
+            if len(self.buffer) < body_start + length:
+                break
+            body = bytes(self.buffer[body_start : body_start + length])
+            del self.buffer[: body_start + length]
+
+            responses.append(self._handle(method, target, body, keep_alive))
+            if not keep_alive:
+                close = True
+                break
+
+        if responses:
+            self.transport.write(b"".join(responses))
+        if close:
+            self.transport.close()
+
+    def _parse_head(self, head):
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ")
+        if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+            return None
+        method, target, version = parts
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        # int() przyjąłby też "-5", "+5" czy "1_0": dopuszczamy tylko cyfry.
+        length = headers.get("content-length") or "0"
+        if not (length.isascii() and length.isdigit()):
+            return None
+        length = int(length)
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = connection == "keep-alive"
+        else:
+            keep_alive = connection != "close"
+        return method, target, keep_alive, length
+
+    def _handle(self, method, target, body, keep_alive):
+        payload = None
+        if body:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return _response(400, {"error": "Nieprawidłowy JSON"}, keep_alive)
+        try:
+            status, data = self.service.dispatch(method, target, payload)
+            return _response(status, data, keep_alive)
+        except Exception as error:
+            # Np. odpowiedź, której nie da się zapisać jako JSON.
+            error = {"error": f"Błąd serwera: {type(error).__name__}"}
+            return _response(500, error, keep_alive)
+
+
+async def serve(service=None, host="127.0.0.1", port=8080):
+    service = service if service is not None else LibraryService()
+    loop = asyncio.get_running_loop()
+    return await loop.create_server(lambda: HttpProtocol(service), host, port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--snapshot", help="plik migawki z save_library")
+    parser.add_argument(
+        "--vacuum-interval",
+        type=float,
+        default=1.0,
+        help="co ile sekund sprawdzać usunięte rekordy do posprzątania",
+    )
+    args = parser.parse_args()
+
+    library = None
+    if args.snapshot:
+        library = Library.from_managers(**load_library(args.snapshot))
+
+    async def run():
+        service = LibraryService(library)
+        vacuum = Vacuum(
+            service.library.book_manager,
+            service.library.user_manager,
+            service.library.loan_manager,
+            service.library.reservation_manager,
+        )
+        server = await serve(service, args.host, args.port)
+        cleanup = asyncio.create_task(vacuum.run(args.vacuum_interval))
+        async with server:
+            try:
+                await server.serve_forever()
+            finally:
+                cleanup.cancel()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import heapq
+import multiprocessing
+import threading
+from collections.abc import MutableMapping
+
+from src.book_manager import BookManager
+from src.events import BookAdded
+from src.ids import IdAllocator
+from src.storage import MemoryStorage
+
+# Operacje wykonywane przez proces shardu na jego części katalogu.
+
+
+def _shard_get(books, book_id):
+    if book_id not in books:
+        raise ValueError(f"Książka o ID {book_id} nie istnieje")
+    return books[book_id]
+
+
+def _shard_set(books, book_id, book):
+    books[book_id] = book
+
+
+def _shard_set_many(books, rows):
+    books.update(rows)
+
+
+def _shard_delete(books, book_id):
+    if book_id not in books:
+        raise ValueError(f"Książka o ID {book_id} nie istnieje")
+    del books[book_id]
+
+
+def _shard_search(books, field, needle, available=None):
+    # Zwracamy pary (id, rekord), żeby rodzic mógł scalić wyniki w kolejności ID.
+    needle = needle.lower()
+    return [
+        (book_id, book)
+        for book_id, book in books.items()
+        if needle in book[field].lower()
+        and (available is None or book["available"] == available)
+    ]
+
+
+_SHARD_OPERATIONS = {
+    "get": _shard_get,
+    "set": _shard_set,
+    "set_many": _shard_set_many,
+    "delete": _shard_delete,
+    "contains": lambda books, book_id: book_id in books,
+    "len": len,
+    "ids": lambda books: list(books),
+    "items": lambda books: list(books.items()),
+    "search": _shard_search,
+}
+
+
+def _serve_shard(connection):
+    books = {}
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        operation, args = message
+        try:
+            connection.send(("ok", _SHARD_OPERATIONS[operation](books, *args)))
+        except ValueError as error:
+            connection.send(("error", str(error)))
+        except Exception as error:
+            # Np. rekord bez wymaganego pola: shard odpowiada błędem i działa
+            # dalej, zamiast kończyć proces.
+            connection.send(("failure", f"{type(error).__name__}: {error}"))
+
+
+class ShardedBooks(MutableMapping):
+    # Widok słownika books rozproszonego po shardach; pozwala LoanManager
+    # i CategoryManager zapisywać zmienione rekordy jak do zwykłego słownika.
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def __getitem__(self, book_id):
+        try:
+            return self.manager._call(book_id, "get", book_id)
+        except ValueError:
+            raise KeyError(book_id)
+
+    def __setitem__(self, book_id, book):
+        self.manager._call(book_id, "set", book_id, book)
+
+    def __delitem__(self, book_id):
+        try:
+            self.manager._call(book_id, "delete", book_id)
+        except ValueError:
+            raise KeyError(book_id)
+
+    def __contains__(self, book_id):
+        return self.manager._call(book_id, "contains", book_id)
+
+    def __len__(self):
+        return sum(self.manager._scatter("len"))
+
+    def __iter__(self):
+        return iter(
+            sorted(book_id for ids in self.manager._scatter("ids") for book_id in ids)
+        )
+
+    def items(self):
+        return heapq.merge(*self.manager._scatter("items"))
+
+    def values(self):
+        return (book for book_id, book in self.items())
+
+
+class ShardedBookManager(BookManager):
+    # Książki są rozdzielone między procesy według book_id % shards. Operacje
+    # punktowe trafiają do jednego shardu, wyszukiwania są rozsyłane do
+    # wszystkich równolegle, a wyniki scalane w kolejności ID. add_book,
+    # update_book i remove_book dziedziczymy: działają przez widok books.
+
+    def __init__(self, shards=4, event_bus=None, ids=None):
+        if shards < 1:
+            raise ValueError("Liczba shardów musi być dodatnia")
+        self.shards = shards
+        self.ids = ids if ids is not None else IdAllocator()
+        self.event_bus = event_bus
+        # Magazyn dla pozostałych managerów (np. Library.from_managers).
+        self.storage = MemoryStorage()
+        self.tombstones = self.storage.table("removed_books")
+        self._init_indexes()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._processes = []
+        for _ in range(shards):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_serve_shard, args=(child,), daemon=True
+            )
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+        self.books = ShardedBooks(self)
+
+    @staticmethod
+    def _result(reply):
+        status, value = reply
+        if status == "error":
+            raise ValueError(value)
+        if status == "failure":
+            raise RuntimeError(f"Błąd w procesie shardu: {value}")
+        return value
+
+    def _call(self, book_id, operation, *args):
+        connection = self._connections[book_id % self.shards]
+        with self._lock:
+            connection.send((operation, args))
+            return self._result(connection.recv())
+
+    def _scatter(self, operation, *args, per_shard=None):
+        # Najpierw wysyłamy do wszystkich shardów, potem zbieramy odpowiedzi,
+        # więc shardy pracują równolegle. Odpowiedzi odbieramy ze wszystkich
+        # potoków także po błędzie jednego shardu, żeby żadna nie została
+        # w potoku i nie przyszła jako wynik następnego wywołania.
+        replies = {}
+        with self._lock:
+            for index, connection in enumerate(self._connections):
+                shard_args = args if per_shard is None else (per_shard[index],)
+                try:
+                    connection.send((operation, shard_args))
+                except OSError as error:
+                    replies[index] = ("failure", f"{type(error).__name__}: {error}")
+            for index, connection in enumerate(self._connections):
+                if index in replies:
+                    continue
+                try:
+                    replies[index] = connection.recv()
+                except (EOFError, OSError) as error:
+                    replies[index] = ("failure", f"{type(error).__name__}: {error}")
+        return [self._result(replies[index]) for index in range(self.shards)]
+
+    def add_books(self, books):
+        per_shard = [{} for _ in range(self.shards)]
+        book_ids = []
+        for row in books:
+            book = {
+                "title": row["title"],
+                "author": row["author"],
+                "isbn": row["isbn"],
+                "available": True,
+            }
+            if row.get("year") is not None:
+                book["year"] = row["year"]
+            book_id = self.ids.allocate()
+            per_shard[book_id % self.shards][book_id] = book
+            book_ids.append(book_id)
+
+        self._scatter("set_many", per_shard=per_shard)
+        for rows in per_shard:
+            for book_id, book in rows.items():
+                self._index_book(book_id, book)
+
+        if self.event_bus is not None:
+            for rows in per_shard:
+                for book_id, book in rows.items():
+                    self.event_bus.publish(BookAdded(book_id, book))
+
+        return book_ids
+
+    def get_book(self, book_id):
+        # Rekord pochodzi z innego procesu, więc zmiany trzeba zapisać
+        # z powrotem przez books[book_id] = book, jak przy magazynie SQLite.
+        return self._call(book_id, "get", book_id)
+
+    def _search(self, field, needle, available=None):
+        # Filtr dostępności sprawdzają shardy, więc do rodzica wracają
+        # tylko pasujące rekordy.
+        results = self._scatter("search", field, needle, available)
+        return [book for book_id, book in heapq.merge(*results)]
+
+    def find_books_by_title(self, title, available=None):
+        return self._search("title", title, available)
+
+    def find_books_by_author(self, author, available=None):
+        return self._search("author", author, available)
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                try:
+                    connection.send(None)
+                except OSError:
+                    pass
+                connection.close()
+        for process in self._processes:
+            process.join(timeout=5)
+        self._connections.clear()
+        self._processes.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
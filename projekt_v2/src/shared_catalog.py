@@ -0,0 +1,249 @@
+import bisect
+import json
+import os
+import re
+import struct
+import sys
+from collections import deque
+from multiprocessing import resource_tracker, shared_memory
+
+from src.binary_snapshot import SnapshotReader, snapshot_bytes
+
+# Segment kontrolny "<nazwa>" zawiera tylko numer bieżącej generacji. Każda
+# generacja to osobny segment "<nazwa>_g<numer>":
+#   nagłówek (SEGMENT_MAGIC, długość migawki, offset i długość katalogu indeksu)
+#   migawka binarna tabeli books (format binary_snapshot)
+#   indeksy wyszukiwania: dla title i author tablica offsetów wierszy (uint64)
+#   oraz tekst z małymi literami, jeden wiersz na książkę w kolejności ID
+#   katalog indeksu: JSON z położeniem tablic
+SEGMENT_MAGIC = b"LIBSHM\x00\x01"
+SEGMENT_HEADER = struct.Struct("<8sQQQ")
+GENERATION = struct.Struct("<Q")
+SEARCH_FIELDS = ("title", "author")
+
+
+def _open_segment(name, size=0):
+    # Czasem życia segmentów zarządza SharedCatalog, a nie resource_tracker,
+    # który przy wyjściu dowolnego czytelnika usunąłby segment piszącemu.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, create=size > 0, size=size, track=False)
+    segment = shared_memory.SharedMemory(name, create=size > 0, size=size)
+    resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+
+def _unlink_segment(segment):
+    if sys.version_info < (3, 13):
+        # unlink() sam wyrejestrowuje segment, więc rejestrujemy go ponownie.
+        resource_tracker.register(segment._name, "shared_memory")
+    segment.unlink()
+    segment.close()
+
+
+def _segment_name(name, generation):
+    return f"{name}_g{generation}"
+
+
+def _encode_catalog(book_manager):
+    books = dict(book_manager.books.items())
+    snapshot = snapshot_bytes(
+        {"books": books}, next_ids={"books": book_manager.next_id}
+    )
+
+    data = bytearray(SEGMENT_HEADER.size)
+    data += snapshot
+    data += b"\0" * (-len(data) % 8)
+
+    directory = {"count": len(books)}
+    ordered = [books[book_id] for book_id in sorted(books)]
+    for field in SEARCH_FIELDS:
+        offsets = [0]
+        text = bytearray()
+        for book in ordered:
+            text += book[field].lower().encode("utf-8") + b"\n"
+            offsets.append(len(text))
+        offsets_position = len(data)
+        data += struct.pack(f"<{len(offsets)}Q", *offsets)
+        directory[field] = [offsets_position, len(data), len(text)]
+        data += text
+        data += b"\0" * (-len(data) % 8)
+
+    directory_bytes = json.dumps(directory).encode("utf-8")
+    directory_position = len(data)
+    data += directory_bytes
+    SEGMENT_HEADER.pack_into(
+        data,
+        0,
+        SEGMENT_MAGIC,
+        len(snapshot),
+        directory_position,
+        len(directory_bytes),
+    )
+    return data
+
+
+class SharedCatalog:
+    # Strona pisząca: publish() kopiuje katalog BookManager do nowego segmentu
+    # pamięci współdzielonej i dopiero po jego wypełnieniu podmienia numer
+    # generacji, więc czytelnicy widzą starą albo nową wersję w całości.
+    # keep ostatnich generacji pozostaje dostępnych dla czytelników, którzy
+    # jeszcze się nie przełączyli.
+
+    def __init__(self, book_manager, name=None, keep=2):
+        if keep < 1:
+            raise ValueError("Liczba zachowywanych generacji musi być dodatnia")
+        self.book_manager = book_manager
+        self.name = name or f"biblioteka_{os.getpid()}"
+        self.keep = keep
+        self.generation = 0
+        self._control = _open_segment(self.name, GENERATION.size)
+        GENERATION.pack_into(self._control.buf, 0, 0)
+        self._segments = deque()
+
+    def publish(self):
+        data = _encode_catalog(self.book_manager)
+        generation = self.generation + 1
+        segment = _open_segment(_segment_name(self.name, generation), len(data))
+        segment.buf[: len(data)] = data
+        # Wyrównany zapis 8 bajtów: czytelnik nie zobaczy połowy numeru.
+        GENERATION.pack_into(self._control.buf, 0, generation)
+        self.generation = generation
+
+        self._segments.append(segment)
+        while len(self._segments) > self.keep:
+            _unlink_segment(self._segments.popleft())
+        return generation
+
+    def close(self):
+        while self._segments:
+            _unlink_segment(self._segments.popleft())
+        if self._control is not None:
+            _unlink_segment(self._control)
+            self._control = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+class SharedCatalogReader:
+    # Strona czytająca, np. w procesie roboczym. Rekordy są dekodowane wprost
+    # z pamięci współdzielonej, bez własnej kopii katalogu. Każde wywołanie
+    # sprawdza numer generacji i w razie potrzeby przełącza się na nowszą.
+
+    def __init__(self, name):
+        self.name = name
+        self.generation = 0
+        self._control = _open_segment(name)
+        self._segment = None
+        self._views = []
+        try:
+            self._refresh()
+        except BaseException:
+            self.close()
+            raise
+
+    def _refresh(self):
+        generation = GENERATION.unpack_from(self._control.buf, 0)[0]
+        if generation == 0:
+            raise ValueError("Katalog nie został jeszcze opublikowany")
+        if generation == self.generation:
+            return
+        while True:
+            try:
+                segment = _open_segment(_segment_name(self.name, generation))
+                break
+            except FileNotFoundError:
+                # Pisarz zdążył opublikować kolejne generacje i usunąć tę.
+                generation = GENERATION.unpack_from(self._control.buf, 0)[0]
+        self._detach()
+        self._attach(segment)
+        self.generation = generation
+
+    def _attach(self, segment):
+        buffer = segment.buf
+        magic, snapshot_length, directory_position, directory_length = (
+            SEGMENT_HEADER.unpack_from(buffer, 0)
+        )
+        if magic != SEGMENT_MAGIC:
+            raise ValueError("Nieprawidłowy format katalogu współdzielonego")
+        directory = json.loads(
+            bytes(buffer[directory_position : directory_position + directory_length])
+        )
+        count = directory["count"]
+
+        snapshot = buffer[SEGMENT_HEADER.size : SEGMENT_HEADER.size + snapshot_length]
+        self._views = [snapshot]
+        self._books = SnapshotReader(snapshot).table("books")
+        self._indexes = {}
+        for field in SEARCH_FIELDS:
+            offsets_position, text_position, text_length = directory[field]
+            offsets = buffer[offsets_position : offsets_position + 8 * (count + 1)]
+            offsets = offsets.cast("Q")
+            self._views.append(offsets)
+            self._indexes[field] = (offsets, text_position, text_length)
+        self._buffer = buffer
+        self._segment = segment
+
+    def _detach(self):
+        # Segmentu nie można zamknąć, dopóki istnieją widoki na jego bufor.
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._books = None
+        self._indexes = {}
+        self._buffer = None
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def get_book(self, book_id):
+        self._refresh()
+        index = self._books.find(book_id)
+        if index < 0:
+            raise ValueError(f"Książka o ID {book_id} nie istnieje")
+        return self._books.record(index)
+
+    def list_books(self):
+        self._refresh()
+        return [self._books.record(index) for index in range(self._books.count)]
+
+    def _search(self, field, needle):
+        self._refresh()
+        offsets, start, length = self._indexes[field]
+        pattern = re.compile(re.escape(needle.lower().encode("utf-8")))
+        end = start + length
+        results = []
+        position = start
+        while position < end:
+            match = pattern.search(self._buffer, position, end)
+            if match is None:
+                break
+            row = bisect.bisect_right(offsets, match.start() - start) - 1
+            # Dopasowanie musi mieścić się w jednym wierszu (bez znaku "\n").
+            if match.end() - start < offsets[row + 1]:
+                results.append(self._books.record(row))
+                position = start + offsets[row + 1]
+            else:
+                position = match.start() + 1
+        return results
+
+    def find_books_by_title(self, title):
+        return self._search("title", title)
+
+    def find_books_by_author(self, author):
+        return self._search("author", author)
+
+    def close(self):
+        self._detach()
+        if self._control is not None:
+            self._control.close()
+            self._control = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
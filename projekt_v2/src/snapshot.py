@@ -0,0 +1,115 @@
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.storage import TrackedDict
+from src.user_manager import UserManager
+from src.utils import load_data, save_data
+
+SNAPSHOT_VERSION = 1
+
+
+def _table(records, next_id):
+    return {
+        "next_id": next_id,
+        "records": {str(record_id): record for record_id, record in records.items()},
+    }
+
+
+def _records(table):
+    return TrackedDict(
+        (int(record_id), record) for record_id, record in table["records"].items()
+    )
+
+
+def snapshot_tombstones(book_manager, user_manager):
+    # Usunięcia, po których Vacuum jeszcze nie posprzątał.
+    return {
+        "books": {str(key): value for key, value in book_manager.tombstones.items()},
+        "users": {str(key): value for key, value in user_manager.tombstones.items()},
+    }
+
+
+def restore_tombstones(data, book_manager, user_manager):
+    tombstones = data.get("tombstones", {})
+    book_manager.tombstones = _records({"records": tombstones.get("books", {})})
+    user_manager.tombstones = _records({"records": tombstones.get("users", {})})
+
+
+def snapshot_library(
+    book_manager, user_manager, loan_manager, reservation_manager, category_manager
+):
+    # Rekordy nie są kopiowane - wynik jest przeznaczony do natychmiastowej
+    # serializacji.
+    return {
+        "version": SNAPSHOT_VERSION,
+        "books": _table(book_manager.books, book_manager.next_id),
+        "users": _table(user_manager.users, user_manager.next_id),
+        "loans": _table(loan_manager.loans, loan_manager.next_id),
+        "reservations": _table(
+            reservation_manager.reservations, reservation_manager.next_id
+        ),
+        "book_queues": {
+            str(book_id): list(queue)
+            for book_id, queue in reservation_manager.book_queues.items()
+        },
+        "reservation_expiry_days": reservation_manager.reservation_expiry_days,
+        "categories": sorted(category_manager.categories),
+        "tombstones": snapshot_tombstones(book_manager, user_manager),
+    }
+
+
+def hydrate_library(data):
+    if not data or data.get("version") != SNAPSHOT_VERSION:
+        raise ValueError("Nieobsługiwany format migawki biblioteki")
+
+    book_manager = BookManager()
+    user_manager = UserManager()
+    loan_manager = LoanManager(book_manager, user_manager)
+    reservation_manager = ReservationManager(book_manager, user_manager)
+    category_manager = CategoryManager(book_manager)
+
+    # Struktury podstawiamy w całości zamiast odtwarzać je wywołaniami add_*.
+    book_manager.books = _records(data["books"])
+    book_manager.next_id = data["books"]["next_id"]
+    user_manager.users = _records(data["users"])
+    user_manager.next_id = data["users"]["next_id"]
+    loan_manager.loans = _records(data["loans"])
+    loan_manager.next_id = data["loans"]["next_id"]
+    reservation_manager.reservations = _records(data["reservations"])
+    reservation_manager.next_id = data["reservations"]["next_id"]
+    reservation_manager.reservation_expiry_days = data["reservation_expiry_days"]
+    if "book_queues" in data:
+        reservation_manager.book_queues = {
+            int(book_id): queue for book_id, queue in data["book_queues"].items()
+        }
+    else:
+        reservation_manager.book_queues = reservation_manager._build_queues()
+    category_manager.categories = set(data["categories"])
+    restore_tombstones(data, book_manager, user_manager)
+
+    return {
+        "book_manager": book_manager,
+        "user_manager": user_manager,
+        "loan_manager": loan_manager,
+        "reservation_manager": reservation_manager,
+        "category_manager": category_manager,
+    }
+
+
+def save_library(
+    file_path,
+    book_manager,
+    user_manager,
+    loan_manager,
+    reservation_manager,
+    category_manager,
+):
+    data = snapshot_library(
+        book_manager, user_manager, loan_manager, reservation_manager, category_manager
+    )
+    save_data(data, file_path, indent=None)
+
+
+def load_library(file_path):
+    return hydrate_library(load_data(file_path))
@@ -0,0 +1,264 @@
+import json
+import sqlite3
+from collections.abc import MutableMapping, MutableSet
+from contextlib import contextmanager
+
+
+def select(table, field, value):
+    # Tabele z indeksem (SQLite) same wykonują zapytanie, słowniki skanujemy.
+    if hasattr(table, "select"):
+        return table.select(field, value)
+    return [
+        (record_id, record)
+        for record_id, record in table.items()
+        if record.get(field) == value
+    ]
+
+
+class ChangeSet:
+    def __init__(self):
+        self.created = set()
+        self.modified = set()
+        self.deleted = set()
+
+    def record_set(self, key, existed):
+        if not existed:
+            self.created.add(key)
+        elif key not in self.created:
+            self.modified.add(key)
+
+    def record_delete(self, key):
+        if key in self.created:
+            self.created.discard(key)
+        else:
+            self.modified.discard(key)
+            self.deleted.add(key)
+
+    def clear(self):
+        self.created.clear()
+        self.modified.clear()
+        self.deleted.clear()
+
+    def __bool__(self):
+        return bool(self.created or self.modified or self.deleted)
+
+
+class TrackedDict(dict):
+    # Śledzone są tylko przypisania i usunięcia przez [], z których
+    # korzystają managerowie; odczyty zostają w C.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.changes = ChangeSet()
+
+    def __setitem__(self, key, value):
+        self.changes.record_set(key, key in self)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.changes.record_delete(key)
+
+
+class MemoryStorage:
+    def table(self, name, indexes=()):
+        return TrackedDict()
+
+    def set(self, name):
+        return set()
+
+    def next_id(self, name):
+        return 1
+
+    @contextmanager
+    def transaction(self):
+        yield self
+
+    def close(self):
+        pass
+
+
+class SQLiteStorage:
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._transaction_depth = 0
+
+    def table(self, name, indexes=()):
+        return SQLiteTable(self.connection, name, indexes)
+
+    def set(self, name):
+        return SQLiteSet(self.connection, name)
+
+    def next_id(self, name):
+        # Największe ID, jakie kiedykolwiek trafiło do tabeli, także usunięte
+        # (np. przeniesione do tombstones), więc po ponownym otwarciu żadne
+        # ID nie zostanie wydane drugi raz.
+        row = self.connection.execute(
+            f"SELECT MAX(COALESCE(MAX(id), 0), COALESCE("
+            f"(SELECT value FROM {HIGH_WATER_TABLE} WHERE name = ?), 0)) + 1 "
+            f"FROM {name}",
+            (name,),
+        ).fetchone()
+        return row[0]
+
+    @contextmanager
+    def transaction(self):
+        # Zagnieżdżone transakcje łączą się w jedną zewnętrzną.
+        if self._transaction_depth:
+            self._transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self._transaction_depth -= 1
+            return
+
+        self.connection.execute("BEGIN")
+        self._transaction_depth = 1
+        try:
+            yield self
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        else:
+            self.connection.execute("COMMIT")
+        finally:
+            self._transaction_depth = 0
+
+    def close(self):
+        self.connection.close()
+
+
+HIGH_WATER_TABLE = "id_high_water"
+
+
+class SQLiteTable(MutableMapping):
+    # Odczyt zwraca nową kopię rekordu zdekodowaną z JSON, więc zmiana
+    # w miejscu nie trafia do bazy: zmieniony rekord trzeba przypisać
+    # z powrotem (table[key] = record), jak robią to managerowie.
+    def __init__(self, connection, name, indexes=()):
+        self.connection = connection
+        self.name = name
+        self.indexes = tuple(indexes)
+
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} "
+            "(id INTEGER PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {HIGH_WATER_TABLE} "
+            "(name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        connection.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {name}_high_water AFTER INSERT ON {name} "
+            f"WHEN NEW.id > COALESCE((SELECT value FROM {HIGH_WATER_TABLE} "
+            f"WHERE name = '{name}'), 0) "
+            f"BEGIN INSERT INTO {HIGH_WATER_TABLE} (name, value) "
+            f"VALUES ('{name}', NEW.id) "
+            "ON CONFLICT(name) DO UPDATE SET value = excluded.value; END"
+        )
+        for field in self.indexes:
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {name}_{field} "
+                f"ON {name}(json_extract(data, '$.{field}'))"
+            )
+
+        # Stałe teksty zapytań pozwalają sqlite3 trzymać je w cache
+        # przygotowanych instrukcji połączenia.
+        self._get_sql = f"SELECT data FROM {name} WHERE id = ?"
+        self._contains_sql = f"SELECT 1 FROM {name} WHERE id = ?"
+        self._set_sql = f"INSERT OR REPLACE INTO {name} (id, data) VALUES (?, ?)"
+        self._delete_sql = f"DELETE FROM {name} WHERE id = ?"
+        self._keys_sql = f"SELECT id FROM {name} ORDER BY id"
+        self._items_sql = f"SELECT id, data FROM {name} ORDER BY id"
+        self._len_sql = f"SELECT COUNT(*) FROM {name}"
+        self._select_sql = {
+            field: f"SELECT id, data FROM {name} "
+            f"WHERE json_extract(data, '$.{field}') = ? ORDER BY id"
+            for field in self.indexes
+        }
+
+    def __getitem__(self, key):
+        row = self.connection.execute(self._get_sql, (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __setitem__(self, key, value):
+        self.connection.execute(
+            self._set_sql, (key, json.dumps(value, ensure_ascii=False))
+        )
+
+    def __delitem__(self, key):
+        cursor = self.connection.execute(self._delete_sql, (key,))
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return (
+            self.connection.execute(self._contains_sql, (key,)).fetchone() is not None
+        )
+
+    def __iter__(self):
+        for (key,) in self.connection.execute(self._keys_sql):
+            yield key
+
+    def __len__(self):
+        return self.connection.execute(self._len_sql).fetchone()[0]
+
+    def items(self):
+        for key, data in self.connection.execute(self._items_sql):
+            yield key, json.loads(data)
+
+    def values(self):
+        for _, data in self.connection.execute(self._items_sql):
+            yield json.loads(data)
+
+    def select(self, field, value):
+        sql = self._select_sql.get(field)
+        if sql is None:
+            sql = (
+                f"SELECT id, data FROM {self.name} "
+                f"WHERE json_extract(data, '$.{field}') = ? ORDER BY id"
+            )
+        return [
+            (key, json.loads(data))
+            for key, data in self.connection.execute(sql, (value,))
+        ]
+
+
+class SQLiteSet(MutableSet):
+    def __init__(self, connection, name):
+        self.connection = connection
+        self.name = name
+
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} (value TEXT PRIMARY KEY)"
+        )
+
+        self._contains_sql = f"SELECT 1 FROM {name} WHERE value = ?"
+        self._add_sql = f"INSERT OR IGNORE INTO {name} (value) VALUES (?)"
+        self._discard_sql = f"DELETE FROM {name} WHERE value = ?"
+        self._iter_sql = f"SELECT value FROM {name} ORDER BY value"
+        self._len_sql = f"SELECT COUNT(*) FROM {name}"
+
+    def __contains__(self, value):
+        return (
+            self.connection.execute(self._contains_sql, (value,)).fetchone() is not None
+        )
+
+    def __iter__(self):
+        for (value,) in self.connection.execute(self._iter_sql):
+            yield value
+
+    def __len__(self):
+        return self.connection.execute(self._len_sql).fetchone()[0]
+
+    def add(self, value):
+        self.connection.execute(self._add_sql, (value,))
+
+    def discard(self, value):
+        self.connection.execute(self._discard_sql, (value,))
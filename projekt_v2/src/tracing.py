@@ -0,0 +1,202 @@
+import contextvars
+import functools
+import json
+import random
+import threading
+import time
+
+# Aktywny span bieżącego kontekstu; contextvars przenosi go także do zadań asyncio.
+_current_span = contextvars.ContextVar("current_span", default=None)
+_tracer = None
+
+
+class _NoopSpan:
+    # Zwracany, gdy śledzenie jest wyłączone albo ślad nie został wylosowany.
+    sampled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _UnsampledSpan(_NoopSpan):
+    # Korzeń niewylosowanego śladu: zajmuje kontekst, żeby spany potomne
+    # nie zaczynały nowych śladów.
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        _current_span.reset(self._token)
+        return False
+
+
+class Span:
+    sampled = True
+
+    def __init__(self, tracer, name, trace_id, parent_id, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = tracer.new_id(64)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = 0
+        self.end_time = 0
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self.start_time = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.end_time = time.time_ns()
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.tracer.exporter.export(self)
+        return False
+
+
+def _attribute_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def span_to_otlp(span, resource):
+    # Kształt zgodny z OTLP/JSON (pola span z resourceSpans.scopeSpans.spans).
+    data = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": "SPAN_KIND_INTERNAL",
+        "startTimeUnixNano": str(span.start_time),
+        "endTimeUnixNano": str(span.end_time),
+        "attributes": [
+            {"key": key, "value": _attribute_value(value)}
+            for key, value in span.attributes.items()
+        ],
+        "status": (
+            {"code": "STATUS_CODE_ERROR", "message": span.error}
+            if span.error
+            else {"code": "STATUS_CODE_OK"}
+        ),
+        "resource": {
+            "attributes": [
+                {"key": key, "value": _attribute_value(value)}
+                for key, value in resource.items()
+            ]
+        },
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+class JsonLinesExporter:
+    def __init__(self, file_path, resource=None, buffer_spans=256):
+        self.file_path = file_path
+        self.resource = resource or {"service.name": "biblioteka"}
+        self.buffer_spans = buffer_spans
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._file = open(file_path, "a", encoding="utf-8")
+
+    def export(self, span):
+        line = json.dumps(span_to_otlp(span, self.resource), ensure_ascii=False)
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.buffer_spans:
+                self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+        self._file.flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._file.close()
+
+
+class Tracer:
+    def __init__(self, exporter, sample_rate=1.0, seed=None):
+        # sample_rate to odsetek śladów zapisywanych w całości; decyzja zapada
+        # przy spanie głównym i jest dziedziczona przez spany potomne.
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("Częstość próbkowania musi być z przedziału [0, 1]")
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self._random = random.Random(seed)
+
+    def new_id(self, bits):
+        return f"{self._random.getrandbits(bits):0{bits // 4}x}"
+
+    def start_span(self, name, attributes=None):
+        parent = _current_span.get()
+        if parent is None:
+            if self.sample_rate < 1.0 and self._random.random() >= self.sample_rate:
+                return _UnsampledSpan()
+            return Span(self, name, self.new_id(128), None, attributes or {})
+        if not parent.sampled:
+            return _NOOP
+        return Span(self, name, parent.trace_id, parent.span_id, attributes or {})
+
+
+def set_tracer(tracer):
+    # None wyłącza śledzenie; wtedy span() i @traced prawie nic nie kosztują.
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer():
+    return _tracer
+
+
+def current_span():
+    return _current_span.get()
+
+
+def span(name, **attributes):
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP
+    return tracer.start_span(name, attributes)
+
+
+def traced(name):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return function(*args, **kwargs)
+            with tracer.start_span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
@@ -1,7 +1,20 @@
+from datetime import datetime
+
+from src.events import UserAdded, UserRemoved, UserUpdated
+from src.ids import IdAllocator, id_property
+from src.storage import MemoryStorage
+
+
 class UserManager:
-    def __init__(self):
-        self.users = {}  # słownik z ID jako kluczami
-        self.next_id = 1  # zaczynamy od ID=1
+    next_id = id_property()
+
+    def __init__(self, storage=None, event_bus=None, ids=None):
+        self.storage = storage if storage is not None else MemoryStorage()
+        self.users = self.storage.table("users", indexes=("email",))
+        self.tombstones = self.storage.table("removed_users")
+        self.ids = ids if ids is not None else IdAllocator()  # zaczynamy od ID=1
+        self.ids.advance_to(self.storage.next_id("users"))
+        self.event_bus = event_bus
 
     def add_user(self, name, email):
         if not name or not isinstance(name, str):
@@ -13,17 +26,43 @@ class UserManager:
 
         user = {"name": name, "email": email}
 
-        user_id = self.next_id
+        user_id = self.ids.allocate()
         self.users[user_id] = user
-        self.next_id += 1
+
+        if self.event_bus is not None:
+            self.event_bus.publish(UserAdded(user_id, user))
 
         return user_id
 
+    def add_users(self, users):
+        # Wsadowe dodawanie już zwalidowanych wierszy, np. z importera CSV.
+        user_ids = []
+        with self.storage.transaction():
+            for row in users:
+                user_id = self.ids.allocate()
+                self.users[user_id] = {"name": row["name"], "email": row["email"]}
+                user_ids.append(user_id)
+
+        if self.event_bus is not None:
+            publish = self.event_bus.publish
+            for user_id in user_ids:
+                publish(UserAdded(user_id, self.users[user_id]))
+
+        return user_ids
+
     def remove_user(self, user_id):
         if user_id not in self.users:
             raise ValueError(f"Użytkownik o ID {user_id} nie istnieje")
+        deleted_at = datetime.now().isoformat()
+        self.tombstones[user_id] = {
+            "deleted_at": deleted_at,
+            "record": self.users[user_id],
+        }
         del self.users[user_id]
 
+        if self.event_bus is not None:
+            self.event_bus.publish(UserRemoved(user_id, deleted_at))
+
     def get_user(self, user_id):
         if user_id not in self.users:
             raise ValueError(f"Użytkownik o ID {user_id} nie istnieje")
@@ -52,6 +91,11 @@ class UserManager:
                 raise ValueError("Email musi być niepustym ciągiem znaków")
             user["email"] = new_email
 
+        self.users[user_id] = user
+
+        if self.event_bus is not None:
+            self.event_bus.publish(UserUpdated(user_id, user))
+
         return True
 
     def list_users(self):
@@ -1,10 +1,19 @@
 import re
 import json
+from functools import lru_cache
+from itertools import accumulate
 
+EMAIL_PATTERN = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")
+ISBN_SEPARATORS = str.maketrans("", "", "- ")
 
-def save_data(data, file_path):
+# Suma kontrolna liczona na bajtach ASCII: każda cyfra to jej wartość + 48.
+ISBN10_OFFSET = 48 * 55
+ISBN13_OFFSET = 48 * (7 + 3 * 6)
+
+
+def save_data(data, file_path, indent=4):
     with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+        f.write(json.dumps(data, ensure_ascii=False, indent=indent))
 
 
 def load_data(file_path):
@@ -16,13 +25,62 @@ def load_data(file_path):
 
 
 def validate_email(email):
-    pattern = r"^[\w\.-]+@[\w\.-]+\.\w+$"
-    return re.match(pattern, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
+
+
+def validate_emails(emails):
+    match = EMAIL_PATTERN.match
+    return [isinstance(email, str) and match(email) is not None for email in emails]
 
 
 def validate_isbn(isbn):
     return isbn.isdigit() and len(isbn) in (10, 13)
 
 
+def validate_isbn_checksum(isbn):
+    if not isinstance(isbn, str) or not isbn.isascii():
+        return False
+    if len(isbn) == 13:
+        if not isbn.isdigit():
+            return False
+        data = isbn.encode()
+        return (sum(data[0::2]) + 3 * sum(data[1::2]) - ISBN13_OFFSET) % 10 == 0
+    if len(isbn) == 10:
+        data = isbn.encode()
+        if data[9] in b"Xx":  # "X" oznacza 10, zastępujemy go znakiem ":" (48 + 10)
+            data = data[:9] + b":"
+            if not isbn[:9].isdigit():
+                return False
+        elif not isbn.isdigit():
+            return False
+        # Suma sum prefiksowych daje wagi 10, 9, ..., 1.
+        return (sum(accumulate(data)) - ISBN10_OFFSET) % 11 == 0
+    return False
+
+
+def validate_isbns(isbns, checksum=True):
+    if checksum:
+        return [validate_isbn_checksum(isbn) for isbn in isbns]
+    return [
+        isinstance(isbn, str) and isbn.isdigit() and len(isbn) in (10, 13)
+        for isbn in isbns
+    ]
+
+
+@lru_cache(maxsize=65536)
+def normalize_isbn(isbn):
+    if not isinstance(isbn, str):
+        return None
+    isbn = isbn.translate(ISBN_SEPARATORS).upper()
+    if not validate_isbn_checksum(isbn):
+        return None
+    if len(isbn) == 13:
+        return isbn
+    body = "978" + isbn[:9]
+    data = body.encode()
+    total = sum(data[0::2]) + 3 * sum(data[1::2]) - 48 * (6 + 3 * 6)
+    return body + str(-total % 10)
+
+
 def validate_user_id(user_id):
     return isinstance(user_id, int) and user_id > 0
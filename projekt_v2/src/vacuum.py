@@ -0,0 +1,145 @@
+import asyncio
+from datetime import datetime
+
+from src.events import LoanClosed, ReservationCancelled, TombstonesPurged
+
+
+def _referencing(table, field, ids):
+    # Tabele z indeksem (SQLite) pytamy o każde ID, słowniki skanujemy raz
+    # dla całej partii.
+    if hasattr(table, "select"):
+        return [item for value in ids for item in table.select(field, value)]
+    return [(key, record) for key, record in table.items() if record.get(field) in ids]
+
+
+class Vacuum:
+    # Sprzątanie po usuniętych książkach i użytkownikach. remove_book
+    # i remove_user tylko przenoszą rekord do tombstones, więc zapytania go
+    # nie widzą; step() w partiach anuluje odwołujące się do nich aktywne
+    # rezerwacje, naprawia kolejki i zamyka aktywne wypożyczenia, a na końcu
+    # kasuje przetworzone tombstones. Zwrócone wypożyczenia i zakończone
+    # rezerwacje zostają jako historia.
+
+    def __init__(
+        self,
+        book_manager,
+        user_manager,
+        loan_manager,
+        reservation_manager,
+        batch_size=100,
+    ):
+        if batch_size < 1:
+            raise ValueError("Rozmiar partii musi być dodatni")
+        self.book_manager = book_manager
+        self.user_manager = user_manager
+        self.loan_manager = loan_manager
+        self.reservation_manager = reservation_manager
+        self.batch_size = batch_size
+
+    def pending(self):
+        return len(self.book_manager.tombstones) + len(self.user_manager.tombstones)
+
+    def _batch(self, tombstones, size):
+        batch = []
+        for key in tombstones:
+            if len(batch) >= size:
+                break
+            batch.append(key)
+        return batch
+
+    def step(self):
+        books = self._batch(self.book_manager.tombstones, self.batch_size)
+        users = self._batch(self.user_manager.tombstones, self.batch_size - len(books))
+        if not books and not users:
+            return 0
+
+        with self.loan_manager.storage.transaction():
+            self._cancel_reservations(set(books), set(users))
+            self._close_loans(set(books), set(users))
+            for book_id in books:
+                del self.book_manager.tombstones[book_id]
+            for user_id in users:
+                del self.user_manager.tombstones[user_id]
+
+        if self.book_manager.event_bus is not None:
+            self.book_manager.event_bus.publish(TombstonesPurged(books, users))
+        return len(books) + len(users)
+
+    def _cancel_reservations(self, books, users):
+        rm = self.reservation_manager
+        live_books = self.book_manager.books
+        active = {}
+        for field, ids in (("book_id", books), ("user_id", users)):
+            for reservation_id, reservation in _referencing(
+                rm.reservations, field, ids
+            ):
+                if reservation["status"] in ("waiting", "ready"):
+                    active[reservation_id] = reservation
+
+        promote = set()
+        cancelled = []
+        for reservation_id, reservation in sorted(active.items()):
+            book_id = reservation["book_id"]
+            queue = rm.book_queues.get(book_id)
+            if queue and reservation_id in queue:
+                # Książka czekała na usuniętego użytkownika: przechodzi
+                # na następną osobę w kolejce.
+                if reservation["status"] == "ready" and book_id in live_books:
+                    promote.add(book_id)
+                queue.remove(reservation_id)
+            reservation["status"] = "cancelled"
+            reservation["cancel_date"] = datetime.now().isoformat()
+            rm.reservations[reservation_id] = reservation
+            cancelled.append((reservation_id, reservation))
+        for book_id in books:
+            rm.book_queues.pop(book_id, None)
+
+        if rm.event_bus is not None:
+            for reservation_id, reservation in cancelled:
+                rm.event_bus.publish(ReservationCancelled(reservation_id, reservation))
+        for book_id in sorted(promote):
+            rm.book_returned(book_id)
+
+    def _close_loans(self, books, users):
+        lm = self.loan_manager
+        live_books = self.book_manager.books
+        active = {}
+        for field, ids in (("book_id", books), ("user_id", users)):
+            for loan_id, loan in _referencing(lm.loans, field, ids):
+                if not loan["returned"]:
+                    active[loan_id] = loan
+
+        closed = []
+        for loan_id, loan in sorted(active.items()):
+            if loan["book_id"] in live_books:
+                # Książka wypożyczona przez usuniętego użytkownika wraca do
+                # obiegu; szyna zdarzeń (jeśli jest) promuje kolejkę rezerwacji.
+                lm.return_book(loan_id)
+                if self.reservation_manager.event_bus is None:
+                    self.reservation_manager.book_returned(loan["book_id"])
+            else:
+                # Usuniętej książki nie ma komu zwrócić: tylko zamykamy wpis.
+                loan["returned"] = True
+                lm.loans[loan_id] = loan
+                closed.append((loan_id, loan))
+
+        if lm.event_bus is not None:
+            for loan_id, loan in closed:
+                lm.event_bus.publish(LoanClosed(loan_id, loan))
+
+    def run_until_empty(self):
+        total = 0
+        while True:
+            processed = self.step()
+            if not processed:
+                return total
+            total += processed
+
+    async def run(self, interval=1.0):
+        # Zadanie w tle dla pętli asyncio (np. serwera HTTP): między partiami
+        # oddaje sterowanie, więc obsługa żądań nie czeka na całe sprzątanie.
+        while True:
+            if self.step():
+                await asyncio.sleep(0)
+            else:
+                await asyncio.sleep(interval)
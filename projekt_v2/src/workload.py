@@ -0,0 +1,276 @@
+import functools
+import gzip
+import json
+import threading
+import time
+from collections.abc import Iterator
+
+# Nazwy managerów w pliku śladu i wywoływane na nich metody publiczne.
+MANAGER_METHODS = {
+    "books": (
+        "add_book",
+        "add_books",
+        "remove_book",
+        "get_book",
+        "find_books_by_title",
+        "find_books_by_author",
+        "search_books",
+        "query_books",
+        "explain_query",
+        "count_available",
+        "count_unavailable",
+        "build_indexes",
+        "save_book",
+        "update_book",
+        "list_books",
+    ),
+    "users": (
+        "add_user",
+        "add_users",
+        "remove_user",
+        "get_user",
+        "find_users_by_name",
+        "update_user",
+        "list_users",
+    ),
+    "loans": ("loan_book", "return_book", "get_loan", "list_loans"),
+    "reservations": (
+        "reserve_book",
+        "cancel_reservation",
+        "get_reservation",
+        "list_reservations",
+        "get_user_reservations",
+        "get_book_reservations",
+        "book_returned",
+        "check_expired_reservations",
+        "complete_reservation",
+        "get_position_in_queue",
+    ),
+    "categories": (
+        "add_category",
+        "remove_category",
+        "get_all_categories",
+        "assign_category",
+        "remove_category_from_book",
+        "get_books_by_category",
+    ),
+}
+
+_MISSING = object()
+
+
+def install_wrapper(manager, method_name, wrapper):
+    # Podmienia metodę na instancji i zwraca wpis dla uninstall_wrapper.
+    # Zapamiętujemy poprzedni atrybut instancji, bo może to być opakowanie
+    # innego narzędzia (np. WorkloadRecorder pod ManagerMetrics).
+    wrapper.active = True
+    wrapper.previous = manager.__dict__.get(method_name, _MISSING)
+    setattr(manager, method_name, wrapper)
+    return manager, method_name, wrapper
+
+
+def uninstall_wrapper(manager, method_name, wrapper):
+    # Wyłączone opakowanie tylko przekazuje wywołania dalej. Zdejmujemy je,
+    # gdy jest na wierzchu; jeśli ktoś opakował metodę po nas, zostaje w
+    # łańcuchu i zniknie przy zdejmowaniu tamtego opakowania.
+    wrapper.active = False
+    if manager.__dict__.get(method_name) is not wrapper:
+        return
+    previous = wrapper.previous
+    while getattr(previous, "active", None) is False:
+        previous = previous.previous
+    if previous is _MISSING:
+        del manager.__dict__[method_name]
+    else:
+        manager.__dict__[method_name] = previous
+
+
+def _encode_default(value):
+    # Wartości spoza JSON zapisujemy w przybliżeniu (zbiory jako listy, daty
+    # w ISO 8601, reszta jako repr), żeby rejestracja nie zmieniała wyniku
+    # wywołania.
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return repr(value)
+
+
+def _open(file_path, mode):
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, mode + "t", encoding="utf-8")
+    return open(file_path, mode, encoding="utf-8")
+
+
+class WorkloadRecorder:
+    def __init__(self, file_path):
+        # Każde wywołanie to jedna linia JSON: [przesunięcie w µs, manager,
+        # metoda, argumenty] (+ argumenty nazwane, jeśli były).
+        self.file_path = file_path
+        self.calls = 0
+        self.dropped = 0  # wywołania, których nie udało się zapisać
+        self._file = _open(file_path, "w")
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._wrapped = []
+        self._started = time.perf_counter()
+        self._encode = json.JSONEncoder(
+            ensure_ascii=False, separators=(",", ":"), default=_encode_default
+        ).encode
+
+    def attach(self, **managers):
+        # np. recorder.attach(books=book_manager, loans=loan_manager)
+        for name, manager in managers.items():
+            if name not in MANAGER_METHODS:
+                raise ValueError(f"Nieznany manager: {name}")
+            for method_name in MANAGER_METHODS[name]:
+                wrapper = self._wrap(name, manager, method_name)
+                self._wrapped.append(install_wrapper(manager, method_name, wrapper))
+        return self
+
+    def _wrap(self, name, manager, method_name):
+        method = getattr(manager, method_name)
+        local = self._local
+
+        @functools.wraps(method)
+        def recorded(*args, **kwargs):
+            # Zapisujemy tylko wywołania zewnętrzne; wywołania wykonane przez
+            # samych managerów (np. book_returned po zwrocie) odtworzą się same.
+            if getattr(local, "depth", 0) or not recorded.active:
+                return method(*args, **kwargs)
+            args = tuple(
+                list(arg) if isinstance(arg, Iterator) else arg for arg in args
+            )
+            try:
+                self._write(name, method_name, args, kwargs)
+            except Exception:
+                # Np. słownik z kluczami spoza JSON albo pełny dysk: gubimy
+                # wpis w śladzie, ale samo wywołanie musi się wykonać.
+                with self._lock:
+                    self.dropped += 1
+            local.depth = 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                local.depth = 0
+
+        return recorded
+
+    def _write(self, name, method_name, args, kwargs):
+        offset = int((time.perf_counter() - self._started) * 1e6)
+        entry = [offset, name, method_name, list(args)]
+        if kwargs:
+            entry.append(kwargs)
+        line = self._encode(entry)
+        with self._lock:
+            self._file.write(line)
+            self._file.write("\n")
+            self.calls += 1
+
+    def detach(self):
+        for entry in reversed(self._wrapped):
+            uninstall_wrapper(*entry)
+        self._wrapped.clear()
+
+    def close(self):
+        self.detach()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+def read_trace(file_path):
+    with _open(file_path, "r") as f:
+        for line in f:
+            entry = json.loads(line)
+            kwargs = entry[4] if len(entry) > 4 else {}
+            yield entry[0], entry[1], entry[2], entry[3], kwargs
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class ReplayReport:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.elapsed = 0.0
+
+    @property
+    def calls(self):
+        return sum(len(latencies) for latencies in self.latencies.values())
+
+    def summary(self):
+        # Czasy w mikrosekundach; przepustowość liczona względem całego odtworzenia.
+        result = {}
+        for operation, latencies in sorted(self.latencies.items()):
+            ordered = sorted(latencies)
+            result[operation] = {
+                "count": len(ordered),
+                "errors": self.errors.get(operation, 0),
+                "throughput": len(ordered) / self.elapsed if self.elapsed else 0.0,
+                "p50": _percentile(ordered, 0.50) / 1000,
+                "p95": _percentile(ordered, 0.95) / 1000,
+                "p99": _percentile(ordered, 0.99) / 1000,
+                "max": ordered[-1] / 1000,
+            }
+        return result
+
+    def format(self):
+        lines = [
+            f"{'operacja':<40} {'liczba':>8} {'błędy':>6} {'op/s':>10} "
+            f"{'p50 µs':>9} {'p95 µs':>9} {'p99 µs':>9} {'max µs':>10}"
+        ]
+        for operation, stats in self.summary().items():
+            lines.append(
+                f"{operation:<40} {stats['count']:>8} {stats['errors']:>6} "
+                f"{stats['throughput']:>10.0f} {stats['p50']:>9.1f} "
+                f"{stats['p95']:>9.1f} {stats['p99']:>9.1f} {stats['max']:>10.1f}"
+            )
+        lines.append(
+            f"razem {self.calls} wywołań w {self.elapsed:.2f} s "
+            f"({self.calls / self.elapsed if self.elapsed else 0:.0f} op/s)"
+        )
+        return "\n".join(lines)
+
+
+def replay(file_path, speed=None, **managers):
+    # speed=None odtwarza ślad z pełną prędkością, speed=1.0 w tempie
+    # nagrania, speed=2.0 dwa razy szybciej. Managerowie powinni być w tym
+    # samym stanie co w chwili rozpoczęcia nagrania.
+    report = ReplayReport()
+    methods = {}
+    clock = time.perf_counter_ns
+    started = clock()
+
+    for offset, name, method_name, args, kwargs in read_trace(file_path):
+        operation = f"{name}.{method_name}"
+        method = methods.get(operation)
+        if method is None:
+            if name not in managers:
+                raise ValueError(f"Brak managera dla śladu: {name}")
+            method = methods[operation] = getattr(managers[name], method_name)
+            report.latencies[operation] = []
+
+        if speed:
+            delay = started + offset * 1000 / speed - clock()
+            if delay > 0:
+                time.sleep(delay / 1e9)
+
+        call_started = clock()
+        try:
+            method(*args, **kwargs)
+        except ValueError:
+            report.errors[operation] = report.errors.get(operation, 0) + 1
+        report.latencies[operation].append(clock() - call_started)
+
+    report.elapsed = (clock() - started) / 1e9
+    return report
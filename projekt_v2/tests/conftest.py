@@ -0,0 +1,14 @@
+import pytest
+
+from src.storage import MemoryStorage, SQLiteStorage
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def storage(request):
+    # Testy managerów przyjmujące ten fixture działają na obu magazynach.
+    if request.param == "memory":
+        yield MemoryStorage()
+    else:
+        storage = SQLiteStorage()
+        yield storage
+        storage.close()
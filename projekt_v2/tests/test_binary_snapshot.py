@@ -0,0 +1,110 @@
+import pytest
+
+from src.binary_snapshot import SnapshotStorage, write_snapshot
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.user_manager import UserManager
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / "library.snap")
+
+
+@pytest.fixture
+def library_snapshot(snapshot_path):
+    book_manager = BookManager()
+    user_manager = UserManager()
+    loan_manager = LoanManager(book_manager, user_manager)
+    reservation_manager = ReservationManager(book_manager, user_manager)
+
+    hobbit = book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227", 1937)
+    book_manager.books[hobbit]["categories"] = ["Fantasy"]
+    other = book_manager.add_book("Zażółć gęślą jaźń", "Autor Ł", "1234567890")
+    book_manager.books[other]["categories"] = []
+    anna = user_manager.add_user("Anna", "anna@example.com")
+    piotr = user_manager.add_user("Piotr", "piotr@example.com")
+    loan_manager.loan_book(anna, hobbit)
+    reservation_manager.reserve_book(piotr, hobbit)
+
+    write_snapshot(
+        snapshot_path,
+        {
+            "books": book_manager.books,
+            "users": user_manager.users,
+            "loans": loan_manager.loans,
+            "reservations": reservation_manager.reservations,
+        },
+        sets={"categories": {"Fantasy"}},
+    )
+    return snapshot_path, book_manager, user_manager, loan_manager, reservation_manager
+
+
+class TestBinarySnapshot:
+    def test_records_roundtrip(self, library_snapshot):
+        path, bm, um, lm, rm = library_snapshot
+        storage = SnapshotStorage(path)
+
+        assert dict(storage.table("books").items()) == bm.books
+        assert dict(storage.table("users").items()) == um.users
+        assert dict(storage.table("loans").items()) == lm.loans
+        assert dict(storage.table("reservations").items()) == rm.reservations
+        assert storage.set("categories") == {"Fantasy"}
+        assert storage.next_id("books") == 3
+        storage.close()
+
+    def test_lazy_materialization(self, library_snapshot):
+        path, *_ = library_snapshot
+        storage = SnapshotStorage(path)
+        books = storage.table("books")
+
+        assert books._loaded == {}
+        assert 2 in books
+        assert books._loaded == {}
+        assert books[2]["title"] == "Zażółć gęślą jaźń"
+        assert list(books._loaded) == [2]
+        storage.close()
+
+    def test_overlay_mutations(self, library_snapshot):
+        path, *_ = library_snapshot
+        storage = SnapshotStorage(path)
+        books = storage.table("books")
+
+        books[1]["available"] = True
+        assert books[1]["available"] is True
+        books[10] = {"title": "Nowa", "author": "A", "isbn": "1"}
+        del books[2]
+
+        assert list(books) == [1, 10]
+        assert len(books) == 2
+        assert 2 not in books
+        with pytest.raises(KeyError):
+            books[2]
+        storage.close()
+
+    def test_managers_start_from_snapshot(self, library_snapshot):
+        path, *_ = library_snapshot
+        storage = SnapshotStorage(path)
+        bm = BookManager(storage)
+        um = UserManager(storage)
+        cm = CategoryManager(bm, storage)
+        lm = LoanManager(bm, um, storage)
+        rm = ReservationManager(bm, um, storage)
+
+        assert bm.get_book(1)["available"] is False
+        assert cm.get_books_by_category("Fantasy") == [1]
+        assert rm.book_queues == {1: [1]}
+        assert rm.get_user_reservations(2)[0]["status"] == "waiting"
+
+        lm.return_book(1)
+        assert rm.book_returned(1) == 1
+        assert bm.add_book("Dune", "Frank Herbert", "9780441013593") == 3
+        storage.close()
+
+    def test_invalid_file(self, snapshot_path):
+        with open(snapshot_path, "wb") as f:
+            f.write(b"\0" * 64)
+        with pytest.raises(ValueError):
+            SnapshotStorage(snapshot_path)
@@ -0,0 +1,253 @@
+import random
+
+import pytest
+
+from src.book_index import AvailabilityIndex, BookIndex, run_query
+from src.book_manager import BookManager
+from src.library import Library
+from src.storage import SQLiteStorage
+
+BOOKS = [
+    ("Hobbit", "J.R.R. Tolkien", 1937),
+    ("Władca Pierścieni", "J.R.R. Tolkien", 1954),
+    ("Diuna", "Frank Herbert", 1965),
+    ("Dzieci Diuny", "Frank Herbert", 1976),
+    ("Solaris", "Stanisław Lem", 1961),
+    ("Cyberiada", "Stanisław Lem", 1965),
+    ("Lalka", "Bolesław Prus", 1890),
+]
+
+
+def add_book(bm, title, author, year):
+    book_id = bm.add_book(title, author, "9780547928227", year)
+    book = bm.books[book_id]
+    book["categories"] = []
+    bm.books[book_id] = book
+    return book_id
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def library(request):
+    storage = SQLiteStorage() if request.param == "sqlite" else None
+    library = Library(storage)
+    bm = library.book_manager
+    for title, author, year in BOOKS:
+        add_book(bm, title, author, year)
+    library.user_manager.add_user("Anna", "anna@example.com")
+    cm = library.category_manager
+    cm.add_category("Fantasy")
+    cm.add_category("Sci-Fi")
+    for book_id in (1, 2):
+        cm.assign_category(book_id, "Fantasy")
+    for book_id in (3, 4, 5, 6):
+        cm.assign_category(book_id, "Sci-Fi")
+    bm.build_indexes()
+    return library
+
+
+def titles(books):
+    return [book["title"] for book in books]
+
+
+def matches(book, filters):
+    return (
+        filters.get("title", "").lower() in book["title"].lower()
+        and filters.get("author", "").lower() in book["author"].lower()
+        and ("category" not in filters or filters["category"] in book["categories"])
+        and filters.get("year_from", 0) <= book["year"] <= filters.get("year_to", 9999)
+        and filters.get("available", book["available"]) == book["available"]
+    )
+
+
+class TestQueryBooks:
+    def test_combined_filters(self, library):
+        bm = library.book_manager
+        assert titles(bm.query_books(author="lem", category="Sci-Fi")) == [
+            "Solaris",
+            "Cyberiada",
+        ]
+        assert titles(bm.query_books(category="Sci-Fi", year_from=1965)) == [
+            "Diuna",
+            "Dzieci Diuny",
+            "Cyberiada",
+        ]
+        assert titles(bm.query_books(title="diun", year_to=1970)) == ["Diuna"]
+        assert titles(bm.query_books(year_from=1950, year_to=1961)) == [
+            "Władca Pierścieni",
+            "Solaris",
+        ]
+        assert bm.query_books(title="Nie ma takiej") == []
+
+    def test_without_filters_returns_all_books_in_id_order(self, library):
+        bm = library.book_manager
+        assert titles(bm.query_books()) == [title for title, _, _ in BOOKS]
+
+    def test_limit_stops_early(self, library):
+        bm = library.book_manager
+        assert titles(bm.query_books(category="Sci-Fi", limit=2)) == [
+            "Diuna",
+            "Dzieci Diuny",
+        ]
+        with pytest.raises(ValueError, match="Limit"):
+            bm.query_books(limit=0)
+
+    def test_unknown_filter(self, library):
+        with pytest.raises(ValueError, match="Nieznany filtr: publisher"):
+            library.book_manager.query_books(publisher="Iskry")
+
+    def test_planner_picks_most_selective_index(self, library):
+        bm = library.book_manager
+        assert bm.explain_query(author="lem", category="Sci-Fi") == ("author", 2)
+        assert bm.explain_query(title="Lalka", year_from=1900) == ("title", 1)
+        assert bm.explain_query(year_to=1900, category="Fantasy") == ("year", 1)
+        # Dwa znaki to za mało na n-gram, zostaje kategoria.
+        assert bm.explain_query(title="ui", category="Fantasy") == ("category", 2)
+        assert bm.explain_query(available=False) == ("available", 0)
+        # Pasują wszystkie książki, więc skan jest tańszy od indeksu.
+        assert bm.explain_query(title="ui", available=True) == ("scan", None)
+        assert bm.explain_query() == ("scan", None)
+
+    def test_weak_condition_scans(self):
+        bm = BookManager()
+        for i in range(200):
+            book_id = bm.add_book(f"Tom {i}", "Autor", "1")
+            book = bm.books[book_id]
+            book["categories"] = ["a"] if i % 4 else ["a", "b"]
+            bm.save_book(book_id, book)
+        bm.build_indexes()
+
+        assert bm.explain_query(category="a") == ("scan", None)
+        assert bm.explain_query(category="b") == ("category", 50)
+        assert bm.explain_query(limit=10, category="b") == ("category", 50)
+        # Co czwarta książka pasuje: jedną znajdzie skan kilku pierwszych.
+        assert bm.explain_query(limit=1, category="b") == ("scan", None)
+        assert titles(bm.query_books(limit=2, category="b")) == ["Tom 0", "Tom 4"]
+
+    def test_query_does_not_build_indexes(self):
+        library = Library()
+        bm = library.book_manager
+        for title, author, year in BOOKS:
+            add_book(bm, title, author, year)
+        assert bm.explain_query(author="lem") == ("scan", None)
+        assert titles(bm.query_books(author="lem", limit=1)) == ["Solaris"]
+        assert bm._query_index is None
+
+        bm.build_indexes()
+        assert bm.explain_query(author="lem") == ("author", 2)
+
+    def test_index_follows_writes(self, library):
+        bm = library.book_manager
+        bm.update_book(5, new_title="Eden", new_year=1959)
+        new_id = add_book(bm, "Solaris", "Stanisław Lem", 1961)
+        bm.remove_book(6)
+        library.category_manager.assign_category(7, "Fantasy")
+
+        assert titles(bm.query_books(author="lem")) == ["Eden", "Solaris"]
+        assert bm.query_books(title="solaris") == [bm.books[new_id]]
+        assert titles(bm.query_books(year_to=1960, author="lem")) == ["Eden"]
+        assert titles(bm.query_books(category="Fantasy", year_to=1900)) == ["Lalka"]
+
+        library.category_manager.remove_category("Fantasy")
+        assert bm.query_books(category="Fantasy") == []
+
+    def test_availability_follows_loans_and_rollback(self, library):
+        bm = library.book_manager
+        bm.query_books()
+        loan_id = library.loan_book(1, 3)
+        assert titles(bm.query_books(title="diun", available=True)) == ["Dzieci Diuny"]
+        library.return_book(loan_id)
+        assert len(bm.query_books(title="diun", available=True)) == 2
+
+        with pytest.raises(RuntimeError):
+            with library.transaction():
+                library.loan_book(1, 4)
+                bm.update_book(4, new_title="Zmieniony")
+                raise RuntimeError
+        assert titles(bm.query_books(title="dzieci", available=True)) == [
+            "Dzieci Diuny"
+        ]
+
+
+class TestAvailability:
+    def test_counts_follow_loans_returns_and_removals(self, library):
+        bm = library.book_manager
+        assert (bm.count_available(), bm.count_unavailable()) == (7, 0)
+        first = library.loan_book(1, 1)
+        library.loan_book(1, 2)
+        assert (bm.count_available(), bm.count_unavailable()) == (5, 2)
+        library.return_book(first)
+        bm.remove_book(2)
+        add_book(bm, "Eden", "Stanisław Lem", 1959)
+        assert (bm.count_available(), bm.count_unavailable()) == (7, 0)
+
+    def test_rolled_back_loan_stays_available(self, library):
+        bm = library.book_manager
+        bm.count_available()
+        with pytest.raises(RuntimeError):
+            with library.transaction():
+                library.loan_book(1, 3)
+                raise RuntimeError
+        assert (bm.count_available(), bm.count_unavailable()) == (7, 0)
+
+    def test_search_apis_filter_by_availability(self, library):
+        bm = library.book_manager
+        library.loan_book(1, 3)
+        assert titles(bm.find_books_by_title("diun", available=True)) == [
+            "Dzieci Diuny"
+        ]
+        assert titles(bm.find_books_by_author("herbert", available=False)) == ["Diuna"]
+        assert len(bm.find_books_by_title("diun")) == 2
+        assert titles(bm.query_books(available=False)) == ["Diuna"]
+
+    def test_search_by_availability_needs_no_text_index(self):
+        library = Library()
+        bm = library.book_manager
+        for title, author, year in BOOKS:
+            add_book(bm, title, author, year)
+        library.user_manager.add_user("Anna", "anna@example.com")
+        library.loan_book(1, 6)
+        assert titles(bm.find_books_by_author("lem", available=True)) == ["Solaris"]
+        assert titles(bm.find_books_by_author("lem", available=False)) == ["Cyberiada"]
+        assert bm._query_index is None
+
+
+class TestBookIndex:
+    def test_matches_full_scan(self):
+        rng = random.Random(7)
+        words = ["dom", "las", "morze", "noc", "ogień", "wiatr", "sen"]
+        names = ["Lem", "Prus", "Herbert", "Tokarczuk", "Sapkowski"]
+        books = {}
+        index, availability = BookIndex(), AvailabilityIndex()
+        for book_id in range(1, 301):
+            books[book_id] = {
+                "title": " ".join(rng.sample(words, 2)).title(),
+                "author": rng.choice(names),
+                "year": rng.randint(1900, 2020),
+                "categories": rng.sample(["a", "b", "c", "d"], rng.randint(0, 2)),
+                "available": rng.random() < 0.7,
+            }
+            index.update(book_id, books[book_id])
+            availability.update(book_id, books[book_id])
+        for book_id in rng.sample(sorted(books), 50):
+            index.remove(book_id)
+            availability.remove(book_id)
+            del books[book_id]
+
+        for _ in range(200):
+            filters = {}
+            if rng.random() < 0.5:
+                filters["title"] = rng.choice(words)[: rng.randint(2, 4)]
+            if rng.random() < 0.5:
+                filters["author"] = rng.choice(names)[1:4].upper()
+            if rng.random() < 0.4:
+                filters["category"] = rng.choice("abcd")
+            if rng.random() < 0.4:
+                filters["year_from"] = rng.randint(1900, 2020)
+            if rng.random() < 0.4:
+                filters["year_to"] = rng.randint(1900, 2020)
+            if rng.random() < 0.3:
+                filters["available"] = rng.random() < 0.5
+
+            expected = [book for book in books.values() if matches(book, filters)]
+            result = run_query(books, (index, availability), filters)
+            assert result == expected, filters
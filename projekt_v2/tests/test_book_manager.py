@@ -3,8 +3,8 @@ from src.book_manager import BookManager
 
 
 class TestAddBook:
-    def test_add_book_success(self):
-        manager = BookManager()
+    def test_add_book_success(self, storage):
+        manager = BookManager(storage)
         book_id = manager.add_book(
             "The Hobbit", "J.R.R. Tolkien", "9780547928227", 1937
         )
@@ -28,13 +28,13 @@ class TestAddBook:
             ("Title", "Author", 789, 2000),
         ],
     )
-    def test_add_book_invalid_data(self, title, author, isbn, year):
-        manager = BookManager()
+    def test_add_book_invalid_data(self, storage, title, author, isbn, year):
+        manager = BookManager(storage)
         with pytest.raises(ValueError):
             manager.add_book(title, author, isbn, year)
 
-    def test_add_multiple_books_unique_ids(self):
-        manager = BookManager()
+    def test_add_multiple_books_unique_ids(self, storage):
+        manager = BookManager(storage)
         id1 = manager.add_book("Book One", "Author A", "1111111111")
         id2 = manager.add_book("Book Two", "Author B", "2222222222")
         assert id1 != id2
@@ -42,19 +42,19 @@ class TestAddBook:
 
 
 class TestRemoveBook:
-    def test_remove_book_success(self):
-        manager = BookManager()
+    def test_remove_book_success(self, storage):
+        manager = BookManager(storage)
         book_id = manager.add_book("Title", "Author", "1234567890")
         manager.remove_book(book_id)
         assert book_id not in manager.books
 
-    def test_remove_book_nonexistent(self):
-        manager = BookManager()
+    def test_remove_book_nonexistent(self, storage):
+        manager = BookManager(storage)
         with pytest.raises(ValueError):
             manager.remove_book(99)
 
-    def test_remove_book_twice(self):
-        manager = BookManager()
+    def test_remove_book_twice(self, storage):
+        manager = BookManager(storage)
         book_id = manager.add_book("Title", "Author", "1234567890")
         manager.remove_book(book_id)
         with pytest.raises(ValueError):
@@ -62,20 +62,20 @@ class TestRemoveBook:
 
 
 class TestGetBook:
-    def test_get_book_success(self):
-        manager = BookManager()
+    def test_get_book_success(self, storage):
+        manager = BookManager(storage)
         book_id = manager.add_book("Title", "Author", "1234567890")
         book = manager.get_book(book_id)
         assert isinstance(book, dict)
         assert book["title"] == "Title"
 
-    def test_get_book_nonexistent(self):
-        manager = BookManager()
+    def test_get_book_nonexistent(self, storage):
+        manager = BookManager(storage)
         with pytest.raises(ValueError):
             manager.get_book(42)
 
-    def test_get_book_after_removal(self):
-        manager = BookManager()
+    def test_get_book_after_removal(self, storage):
+        manager = BookManager(storage)
         book_id = manager.add_book("Title", "Author", "1234567890")
         manager.remove_book(book_id)
         with pytest.raises(ValueError):
@@ -83,20 +83,20 @@ class TestGetBook:
 
 
 class TestListBooks:
-    def test_list_books_empty(self):
-        manager = BookManager()
+    def test_list_books_empty(self, storage):
+        manager = BookManager(storage)
         books = manager.list_books()
         assert books == []
 
-    def test_list_books_single(self):
-        manager = BookManager()
+    def test_list_books_single(self, storage):
+        manager = BookManager(storage)
         manager.add_book("Only Book", "Author", "9999999999")
         books = manager.list_books()
         assert len(books) == 1
         assert books[0]["title"] == "Only Book"
 
-    def test_list_books_multiple(self):
-        manager = BookManager()
+    def test_list_books_multiple(self, storage):
+        manager = BookManager(storage)
         titles = ["Book A", "Book B", "Book C"]
         for title in titles:
             manager.add_book(title, "Author", "0000000000")
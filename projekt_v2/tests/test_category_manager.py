@@ -14,11 +14,14 @@ class DummyBookManager:
             raise ValueError("Book not found")
         return self.books[book_id]
 
+    def save_book(self, book_id, book):
+        self.books[book_id] = book
+
 
 @pytest.fixture
-def category_manager_setup():
+def category_manager_setup(storage):
     book_manager = DummyBookManager()
-    category_manager = CategoryManager(book_manager)
+    category_manager = CategoryManager(book_manager, storage)
 
     book_manager.add_book(1)
     book_manager.add_book(2)
@@ -0,0 +1,163 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.cdc import BLOCK_TIMEOUT, ChangeFeed
+from src.library import Library
+
+
+@pytest.fixture
+def library():
+    library = Library()
+    library.book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+    library.user_manager.add_user("Anna", "anna@example.com")
+    library.user_manager.add_user("Piotr", "piotr@example.com")
+    return library
+
+
+def summary(changes):
+    return [(change.table, change.op, change.key) for change in changes]
+
+
+class TestChangeFeed:
+    def test_mutations_from_all_managers(self, library):
+        feed = ChangeFeed(library.event_bus)
+        library.book_manager.books[1]["categories"] = []
+
+        library.category_manager.add_category("Fantasy")
+        library.category_manager.assign_category(1, "Fantasy")
+        loan_id = library.loan_book(1, 1)
+        library.reserve_book(2, 1)
+        library.return_book(loan_id)
+        library.user_manager.update_user(2, new_name="Piotr Nowak")
+        library.category_manager.remove_category("Fantasy")
+
+        changes = feed.read(1)
+        assert [change.seq for change in changes] == list(range(1, 12))
+        assert summary(changes) == [
+            ("categories", "insert", "Fantasy"),
+            ("books", "update", 1),
+            ("loans", "insert", 1),
+            ("books", "update", 1),
+            ("reservations", "insert", 1),
+            ("loans", "update", 1),
+            ("books", "update", 1),
+            ("reservations", "update", 1),
+            ("users", "update", 2),
+            ("books", "update", 1),
+            ("categories", "delete", "Fantasy"),
+        ]
+
+    def test_records_are_captured_at_change_time(self, library):
+        feed = ChangeFeed(library.event_bus)
+        loan_id = library.loan_book(1, 1)
+        library.return_book(loan_id)
+
+        loan_insert, book_loaned, loan_update, book_returned = feed.read(1)
+        assert loan_insert.record["returned"] is False
+        assert loan_update.record["returned"] is True
+        assert book_loaned.record["available"] is False
+        assert book_returned.record["available"] is True
+
+    def test_rolled_back_changes_are_not_published(self, library):
+        feed = ChangeFeed(library.event_bus)
+        with pytest.raises(RuntimeError):
+            with library.transaction():
+                library.loan_book(1, 1)
+                raise RuntimeError("przerwane")
+        assert feed.read(1) == []
+
+        # ID z wycofanej transakcji przepada.
+        library.loan_book(1, 1)
+        assert summary(feed.read(1)) == [("loans", "insert", 2), ("books", "update", 1)]
+
+    def test_read_from_offset_and_limit(self, library):
+        feed = ChangeFeed(library.event_bus)
+        for i in range(5):
+            library.book_manager.add_book(f"Tytuł {i}", "Autor", "9780547928227")
+
+        assert [change.key for change in feed.read(3, limit=2)] == [4, 5]
+        assert feed.read(feed.last_seq + 1) == []
+
+    def test_drop_policy_reports_lagging_offset(self):
+        feed = ChangeFeed(capacity=3)
+        for key in range(5):
+            feed.append("books", "insert", key, {})
+
+        assert feed.first_seq == 3
+        assert [change.key for change in feed.read(3)] == [2, 3, 4]
+        with pytest.raises(ValueError, match="Zmiany od numeru 1 zostały już usunięte"):
+            feed.read(1)
+
+    def test_tail_in_thread(self):
+        feed = ChangeFeed()
+        received = []
+        consumer = threading.Thread(
+            target=lambda: received.extend(feed.tail(offset=1, timeout=5))
+        )
+        consumer.start()
+        for key in range(100):
+            feed.append("users", "insert", key, {"name": str(key)})
+        feed.close()
+        consumer.join()
+
+        assert [change.seq for change in received] == list(range(1, 101))
+
+    def test_block_policy_applies_backpressure(self):
+        feed = ChangeFeed(capacity=2, on_overflow="block", block_timeout=0.05)
+        tail = feed.tail(offset=1, timeout=0)
+        feed.append("books", "insert", 1)
+        assert next(tail).seq == 1
+        feed.append("books", "insert", 2)
+        feed.append("books", "insert", 3)
+        # Konsument nie odczytał jeszcze zmiany 2, a bufor jest pełny.
+        with pytest.raises(TimeoutError):
+            feed.append("books", "insert", 4)
+
+        assert [change.seq for change in tail] == [2, 3]
+        assert feed.append("books", "insert", 4) == 4
+
+    def test_asyncio_queue(self, library):
+        feed = ChangeFeed(library.event_bus)
+
+        async def scenario():
+            changes = feed.queue(offset=1, maxsize=2)
+            for i in range(5):
+                library.book_manager.add_book(f"Tytuł {i}", "Autor", "9780547928227")
+                await asyncio.sleep(0)
+            feed.close()
+            received = []
+            while (change := await changes.get()) is not None:
+                received.append(change.key)
+            return received
+
+        assert asyncio.run(scenario()) == [2, 3, 4, 5, 6]
+
+    def test_block_policy_does_not_deadlock_own_event_loop(self, library):
+        feed = ChangeFeed(library.event_bus, capacity=4, on_overflow="block")
+        assert feed.block_timeout == BLOCK_TIMEOUT
+        books = [
+            {"title": f"Tytuł {i}", "author": "Autor", "isbn": "9780547928227"}
+            for i in range(10)
+        ]
+
+        async def scenario():
+            changes = feed.queue(offset=1)
+            await asyncio.sleep(0)
+            with pytest.raises(RuntimeError, match="block zablokowałaby"):
+                library.book_manager.add_books(books)
+            # Po oddaniu sterowania pętli konsument nadrabia zaległości.
+            received = []
+            while len(received) < feed.last_seq:
+                received.append((await changes.get()).seq)
+            library.book_manager.add_book("Diuna", "Frank Herbert", "9780441013593")
+            return received, await changes.get()
+
+        received, change = asyncio.run(scenario())
+        assert received == list(range(1, 5))
+        assert change.seq == 5
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError, match="Nieobsługiwana polityka"):
+            ChangeFeed(on_overflow="ignore")
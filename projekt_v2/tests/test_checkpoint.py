@@ -0,0 +1,185 @@
+import json
+import os
+
+import pytest
+
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.checkpoint import Checkpointer, restore_library
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.storage import SQLiteStorage
+from src.user_manager import UserManager
+
+
+@pytest.fixture
+def library():
+    book_manager = BookManager()
+    user_manager = UserManager()
+    return {
+        "book_manager": book_manager,
+        "user_manager": user_manager,
+        "loan_manager": LoanManager(book_manager, user_manager),
+        "reservation_manager": ReservationManager(book_manager, user_manager),
+        "category_manager": CategoryManager(book_manager),
+    }
+
+
+@pytest.fixture
+def checkpointer(library, tmp_path):
+    return Checkpointer(
+        str(tmp_path),
+        library["book_manager"],
+        library["user_manager"],
+        library["loan_manager"],
+        library["reservation_manager"],
+        library["category_manager"],
+        compact_every=3,
+    )
+
+
+class TestChangeTracking:
+    def test_created_modified_deleted(self, library):
+        bm = library["book_manager"]
+        first = bm.add_book("Hobbit", "Tolkien", "9780547928227")
+        second = bm.add_book("Dune", "Herbert", "9780441013593")
+        bm.books.changes.clear()
+
+        third = bm.add_book("Solaris", "Lem", "9788308049432")
+        bm.update_book(first, new_year=1937)
+        bm.remove_book(second)
+
+        assert bm.books.changes.created == {third}
+        assert bm.books.changes.modified == {first}
+        assert bm.books.changes.deleted == {second}
+
+    def test_created_then_deleted_is_forgotten(self, library):
+        bm = library["book_manager"]
+        book_id = bm.add_book("Hobbit", "Tolkien", "9780547928227")
+        bm.update_book(book_id, new_title="The Hobbit")
+        bm.remove_book(book_id)
+        assert not bm.books.changes
+
+    def test_loan_marks_book_and_loan(self, library):
+        bm = library["book_manager"]
+        um = library["user_manager"]
+        lm = library["loan_manager"]
+        book_id = bm.add_book("Hobbit", "Tolkien", "9780547928227")
+        user_id = um.add_user("Anna", "anna@example.com")
+        bm.books.changes.clear()
+
+        loan_id = lm.loan_book(user_id, book_id)
+        assert bm.books.changes.modified == {book_id}
+        assert lm.loans.changes.created == {loan_id}
+
+
+class TestCheckpointer:
+    def test_first_checkpoint_writes_base(self, library, checkpointer):
+        library["book_manager"].add_book("Hobbit", "Tolkien", "9780547928227")
+        path = checkpointer.checkpoint()
+        assert os.path.basename(path) == "base-000000.json"
+        assert not checkpointer.pending_changes()
+
+    def test_delta_contains_only_changes(self, library, checkpointer):
+        bm = library["book_manager"]
+        for i in range(5):
+            bm.add_book(f"Book {i}", "Author", "1234567890")
+        checkpointer.checkpoint()
+
+        bm.update_book(2, new_title="Changed")
+        bm.remove_book(4)
+        path = checkpointer.checkpoint()
+
+        with open(path, encoding="utf-8") as f:
+            delta = json.load(f)
+        assert list(delta["tables"]["books"]["upserts"]) == ["2"]
+        assert delta["tables"]["books"]["deletes"] == [4]
+        assert delta["tables"]["users"]["upserts"] == {}
+
+    def test_restore_applies_deltas(self, library, checkpointer):
+        bm = library["book_manager"]
+        um = library["user_manager"]
+        lm = library["loan_manager"]
+        rm = library["reservation_manager"]
+        cm = library["category_manager"]
+
+        book_id = bm.add_book("Hobbit", "Tolkien", "9780547928227")
+        anna = um.add_user("Anna", "anna@example.com")
+        piotr = um.add_user("Piotr", "piotr@example.com")
+        checkpointer.checkpoint()
+
+        lm.loan_book(anna, book_id)
+        rm.reserve_book(piotr, book_id)
+        cm.add_category("Fantasy")
+        checkpointer.checkpoint()
+        um.remove_user(anna)
+        checkpointer.checkpoint()
+
+        restored = restore_library(checkpointer.directory)
+        assert restored["book_manager"].books == bm.books
+        assert restored["user_manager"].users == um.users
+        assert restored["loan_manager"].loans == lm.loans
+        assert restored["reservation_manager"].reservations == rm.reservations
+        assert restored["reservation_manager"].book_queues == rm.book_queues
+        assert restored["category_manager"].categories == {"Fantasy"}
+        assert restored["user_manager"].next_id == um.next_id
+        assert not restored["book_manager"].books.changes
+
+    def test_periodic_compaction(self, library, checkpointer):
+        bm = library["book_manager"]
+        checkpointer.checkpoint()
+        for i in range(4):
+            bm.add_book(f"Book {i}", "Author", "1234567890")
+            checkpointer.checkpoint()
+
+        files = sorted(os.listdir(checkpointer.directory))
+        assert files == ["base-000003.json"]
+        assert len(restore_library(checkpointer.directory)["book_manager"].books) == 4
+
+    def test_sequence_survives_restart(self, library, checkpointer):
+        bm = library["book_manager"]
+        checkpointer.checkpoint()
+        bm.add_book("Hobbit", "Tolkien", "9780547928227")
+        checkpointer.checkpoint()
+        checkpointer.compact()
+
+        reopened = Checkpointer(
+            checkpointer.directory,
+            library["book_manager"],
+            library["user_manager"],
+            library["loan_manager"],
+            library["reservation_manager"],
+            library["category_manager"],
+        )
+        bm.add_book("Dune", "Herbert", "9780441013593")
+        path = reopened.checkpoint()
+        assert os.path.basename(path) == "delta-000002.json"
+        assert len(restore_library(checkpointer.directory)["book_manager"].books) == 2
+
+    def test_untracked_storage_falls_back_to_full_snapshot(self, tmp_path):
+        storage = SQLiteStorage()
+        bm = BookManager(storage=storage)
+        um = UserManager(storage=storage)
+        checkpointer = Checkpointer(
+            str(tmp_path),
+            bm,
+            um,
+            LoanManager(bm, um, storage=storage),
+            ReservationManager(bm, um, storage=storage),
+            CategoryManager(bm, storage=storage),
+        )
+        assert not checkpointer.tracks_changes()
+        assert checkpointer.pending_changes() == {}
+
+        checkpointer.checkpoint()
+        bm.add_book("Hobbit", "Tolkien", "9780547928227")
+        path = checkpointer.checkpoint()
+        assert os.listdir(tmp_path) == [os.path.basename(path)]
+        assert os.path.basename(path).startswith("base-")
+        restored = restore_library(str(tmp_path))["book_manager"]
+        assert restored.get_book(1)["title"] == "Hobbit"
+        storage.close()
+
+    def test_restore_without_checkpoint(self, tmp_path):
+        with pytest.raises(ValueError):
+            restore_library(str(tmp_path))
@@ -0,0 +1,179 @@
+import json
+import os
+
+import pytest
+
+from src.event_log import EventLog, list_checkpoints, read_events, rebuild
+from src.events import BookAdded, LoanCreated
+from src.library import Library
+from src.snapshot import snapshot_library
+from src.vacuum import Vacuum
+
+
+def state(managers):
+    data = snapshot_library(
+        managers["book_manager"],
+        managers["user_manager"],
+        managers["loan_manager"],
+        managers["reservation_manager"],
+        managers["category_manager"],
+    )
+    # Puste kolejki zostają w żywym stanie, ale nie mają znaczenia.
+    data["book_queues"] = {
+        book_id: queue for book_id, queue in data["book_queues"].items() if queue
+    }
+    return json.loads(json.dumps(data))
+
+
+def library_state(library):
+    return state(vars(library))
+
+
+def run_scenario(library):
+    bm, um, cm = library.book_manager, library.user_manager, library.category_manager
+    for year, title in enumerate(("Hobbit", "Diuna", "Solaris"), 1937):
+        book_id = bm.add_book(title, "Autor", "9780547928227")
+        bm.books[book_id]["categories"] = []
+        bm.update_book(book_id, new_year=year)
+    for name in ("Anna", "Piotr", "Ewa"):
+        um.add_user(name, f"{name.lower()}@example.com")
+    cm.add_category("Fantasy")
+    cm.assign_category(1, "Fantasy")
+    yield
+    loan_id = library.loan_book(1, 1)
+    library.reserve_book(2, 1)
+    second = library.reserve_book(3, 1)
+    library.return_book(loan_id)
+    yield
+    library.reservation_manager.cancel_reservation(second)
+    library.collect_reservation(1)
+    cm.remove_category("Fantasy")
+    bm.remove_book(3)
+    um.remove_user(3)
+    yield
+    Vacuum(bm, um, library.loan_manager, library.reservation_manager).run_until_empty()
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    library = Library()
+    log = EventLog(str(tmp_path), library.event_bus, checkpoint_every=1000)
+    states = {}
+    for _ in run_scenario(library):
+        states[log.offset] = library_state(library)
+    states[log.offset] = library_state(library)
+    log.flush()
+    yield library, log, states
+    log.close()
+
+
+class TestEventLog:
+    def test_rebuild_matches_live_state_at_every_offset(self, recorded):
+        library, log, states = recorded
+        for offset, expected in states.items():
+            assert state(rebuild(log.directory, offset)) == expected
+        assert state(rebuild(log.directory)) == library_state(library)
+
+    def test_checkpoint_bounds_replay(self, recorded):
+        library, log, states = recorded
+        middle = sorted(states)[1]
+        log.checkpoint(middle)
+        log.checkpoint()
+        assert [offset for offset, _ in list_checkpoints(log.directory)] == [
+            middle,
+            log.offset,
+        ]
+        for offset, expected in states.items():
+            assert state(rebuild(log.directory, offset)) == expected
+
+        # Punkt kontrolny nie potrzebuje wcześniejszej części dziennika.
+        os.remove(os.path.join(log.directory, "events.jsonl"))
+        assert state(rebuild(log.directory, log.offset)) == library_state(library)
+
+    def test_background_checkpoints(self, tmp_path):
+        library = Library()
+        log = EventLog(str(tmp_path), library.event_bus, checkpoint_every=10, keep=2)
+        for i in range(35):
+            library.book_manager.add_book(f"Tom {i}", "Autor", "1")
+        log.close()
+        offsets = [offset for offset, _ in list_checkpoints(str(tmp_path))]
+        assert 1 <= len(offsets) <= 2
+        assert all(offset >= 10 for offset in offsets)
+        assert len(rebuild(str(tmp_path))["book_manager"].books) == 35
+
+    def test_read_events_for_audit(self, recorded):
+        library, log, states = recorded
+        events = list(read_events(log.directory, start=2, stop=20))
+        assert [number for number, _ in events] == list(range(2, 21))
+        assert events[1][1] == BookAdded(
+            2,
+            {
+                "title": "Diuna",
+                "author": "Autor",
+                "isbn": "9780547928227",
+                "available": True,
+            },
+        )
+        loans = [e for _, e in events if isinstance(e, LoanCreated)]
+        assert loans[0].loan_id == 1 and loans[0].loan["user_id"] == 1
+
+    def test_reopen_truncates_partial_line(self, tmp_path):
+        library = Library()
+        log = EventLog(str(tmp_path), library.event_bus)
+        library.book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        log.close()
+        with open(tmp_path / "events.jsonl", "ab") as f:
+            f.write(b'["BookAdded",2,{"tit')
+
+        reopened = EventLog(str(tmp_path))
+        assert reopened.offset == 1
+        reopened.close()
+        assert list(rebuild(str(tmp_path))["book_manager"].books) == [1]
+
+    def test_rolled_back_transaction_is_not_logged(self, tmp_path):
+        library = Library()
+        log = EventLog(str(tmp_path), library.event_bus)
+        library.book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        for name in ("Anna", "Piotr"):
+            library.user_manager.add_user(name, f"{name.lower()}@example.com")
+        loan_id = library.loan_book(1, 1)
+        reservation_id = library.reserve_book(2, 1)
+        library.return_book(loan_id)
+        offset = log.offset
+
+        with pytest.raises(RuntimeError):
+            with library.transaction():
+                library.collect_reservation(reservation_id)
+                raise RuntimeError("przerwane")
+        log.flush()
+
+        assert log.offset == offset
+        rebuilt = rebuild(str(tmp_path))
+        assert rebuilt["reservation_manager"].reservations[1]["status"] == "ready"
+        # Wycofana transakcja zostawia lukę w ID wypożyczeń, której dziennik nie zna.
+        assert library.loan_manager.next_id == rebuilt["loan_manager"].next_id + 1
+        rebuilt["loan_manager"].next_id = library.loan_manager.next_id
+        assert state(rebuilt) == library_state(library)
+        log.close()
+
+    def test_every_append_is_visible_and_synced(self, tmp_path, monkeypatch):
+        synced = []
+        monkeypatch.setattr(os, "fsync", synced.append)
+        library = Library()
+        log = EventLog(str(tmp_path), library.event_bus, fsync_every=3)
+        for i in range(7):
+            library.book_manager.add_book(f"Tom {i}", "Autor", "1")
+        # Bez flush(): inny czytelnik widzi już wszystkie zdarzenia.
+        assert len(list(read_events(str(tmp_path)))) == 7
+        assert len(synced) == 2
+        log.flush()
+        assert len(synced) == 3
+        log.close()
+
+        with pytest.raises(ValueError, match="fsync_every"):
+            EventLog(str(tmp_path), fsync_every=0)
+
+    def test_offset_beyond_log(self, recorded):
+        library, log, states = recorded
+        with pytest.raises(ValueError, match="Dziennik zawiera tylko"):
+            rebuild(log.directory, log.offset + 1)
@@ -0,0 +1,185 @@
+import asyncio
+
+import pytest
+
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.events import (
+    BookAdded,
+    BookReturned,
+    CategoryAssigned,
+    EventBus,
+    LoanCreated,
+    ReservationCreated,
+    ReservationReady,
+)
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.user_manager import UserManager
+
+
+@pytest.fixture
+def managers():
+    bus = EventBus()
+    book_manager = BookManager(event_bus=bus)
+    user_manager = UserManager(event_bus=bus)
+    loan_manager = LoanManager(book_manager, user_manager, event_bus=bus)
+    reservation_manager = ReservationManager(book_manager, user_manager, event_bus=bus)
+    category_manager = CategoryManager(book_manager, event_bus=bus)
+    return (
+        bus,
+        book_manager,
+        user_manager,
+        loan_manager,
+        reservation_manager,
+        category_manager,
+    )
+
+
+class TestEventBus:
+    def test_typed_and_wildcard_subscribers(self):
+        bus = EventBus()
+        added, everything = [], []
+        bus.subscribe(BookAdded, added.append)
+        bus.subscribe(None, everything.append)
+
+        bus.publish(BookAdded(1, {"title": "Hobbit"}))
+        bus.publish(BookReturned(1, 1, {}, {}))
+
+        assert added == [BookAdded(1, {"title": "Hobbit"})]
+        assert [type(event) for event in everything] == [BookAdded, BookReturned]
+
+    def test_unsubscribe(self):
+        bus = EventBus()
+        received = []
+        bus.subscribe(BookAdded, received.append)
+        bus.publish(BookAdded(1, {}))
+        bus.unsubscribe(BookAdded, received.append)
+        bus.publish(BookAdded(2, {}))
+
+        assert received == [BookAdded(1, {})]
+        with pytest.raises(ValueError, match="Subskrypcja nie istnieje"):
+            bus.unsubscribe(BookAdded, received.append)
+
+    def test_hold_defers_observers_until_commit(self):
+        bus = EventBus()
+        immediate, deferred = [], []
+        bus.subscribe(BookAdded, immediate.append, immediate=True)
+        bus.subscribe(None, deferred.append)
+
+        with bus.hold():
+            bus.publish(BookAdded(1, {}))
+            assert (immediate, deferred) == ([BookAdded(1, {})], [])
+        assert deferred == [BookAdded(1, {})]
+
+        with pytest.raises(RuntimeError):
+            with bus.hold():
+                bus.publish(BookAdded(2, {}))
+                raise RuntimeError("wycofane")
+        assert len(immediate) == 2
+        assert deferred == [BookAdded(1, {})]
+
+    def test_async_subscriber_inside_loop(self):
+        bus = EventBus()
+        received = []
+
+        async def handler(event):
+            await asyncio.sleep(0)
+            received.append(event.book_id)
+
+        bus.subscribe(BookAdded, handler)
+
+        async def scenario():
+            bus.publish(BookAdded(1, {}))
+            bus.publish(BookAdded(2, {}))
+            assert received == []
+            await bus.drain()
+
+        asyncio.run(scenario())
+        assert received == [1, 2]
+
+    def test_async_subscriber_outside_loop(self):
+        bus = EventBus()
+        received = []
+
+        async def handler(event):
+            received.append(event.book_id)
+
+        bus.subscribe(BookAdded, handler)
+        bus.publish(BookAdded(7, {}))
+        assert received == []
+
+        asyncio.run(bus.drain())
+        assert received == [7]
+
+
+class TestManagerEvents:
+    def test_mutations_publish_events(self, managers):
+        bus, bm, um, lm, rm, cm = managers
+        events = []
+        bus.subscribe(None, events.append)
+
+        book_id = bm.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        bm.books[book_id]["categories"] = []
+        user_id = um.add_user("Anna", "anna@example.com")
+        cm.add_category("Fantasy")
+        cm.assign_category(book_id, "Fantasy")
+        loan_id = lm.loan_book(user_id, book_id)
+
+        assert [type(event).__name__ for event in events] == [
+            "BookAdded",
+            "UserAdded",
+            "CategoryAdded",
+            "CategoryAssigned",
+            "LoanCreated",
+        ]
+        assert events[3] == CategoryAssigned(book_id, "Fantasy", bm.get_book(book_id))
+        assert events[4] == LoanCreated(
+            loan_id, lm.get_loan(loan_id), bm.get_book(book_id)
+        )
+
+    def test_return_promotes_queue_head(self, managers):
+        bus, bm, um, lm, rm, _ = managers
+        ready = []
+        bus.subscribe(ReservationReady, ready.append)
+
+        book_id = bm.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        anna = um.add_user("Anna", "anna@example.com")
+        piotr = um.add_user("Piotr", "piotr@example.com")
+        loan_id = lm.loan_book(anna, book_id)
+        first = rm.reserve_book(piotr, book_id)
+        rm.reserve_book(anna, book_id)
+
+        lm.return_book(loan_id)
+
+        assert rm.get_reservation(first)["status"] == "ready"
+        assert [event.reservation_id for event in ready] == [first]
+
+    def test_failing_subscriber_propagates(self, managers):
+        bus, bm, *_ = managers
+
+        def fail(event):
+            raise RuntimeError("błąd odbiorcy")
+
+        bus.subscribe(BookAdded, fail)
+        with pytest.raises(RuntimeError, match="błąd odbiorcy"):
+            bm.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+
+    def test_bulk_add_publishes_per_record(self, managers):
+        bus, bm, *_ = managers
+        created = []
+        bus.subscribe(BookAdded, lambda event: created.append(event.book_id))
+        bm.add_books(
+            [{"title": f"T{i}", "author": "A", "isbn": "1234567890"} for i in range(3)]
+        )
+        assert created == [1, 2, 3]
+
+    def test_reservation_created_event(self, managers):
+        bus, bm, um, lm, rm, _ = managers
+        created = []
+        bus.subscribe(ReservationCreated, created.append)
+        book_id = bm.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        user_id = um.add_user("Anna", "anna@example.com")
+        lm.loan_book(user_id, book_id)
+        reservation_id = rm.reserve_book(um.add_user("Ewa", "ewa@example.com"), book_id)
+        assert created[0].reservation_id == reservation_id
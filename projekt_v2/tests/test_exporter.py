@@ -0,0 +1,97 @@
+import csv
+import json
+
+import pytest
+
+from src.book_manager import BookManager
+from src.exporter import (
+    export_books,
+    export_loans,
+    export_records,
+    export_reservations,
+)
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.user_manager import UserManager
+
+
+@pytest.fixture
+def library():
+    book_manager = BookManager()
+    user_manager = UserManager()
+    loan_manager = LoanManager(book_manager, user_manager)
+    reservation_manager = ReservationManager(book_manager, user_manager)
+
+    hobbit = book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227", 1937)
+    book_manager.books[hobbit]["categories"] = ["Fantasy", "Klasyka"]
+    dune = book_manager.add_book("Diuna", "Frank Herbert", "9780441013593")
+    anna = user_manager.add_user("Anna", "anna@example.com")
+    piotr = user_manager.add_user("Piotr", "piotr@example.com")
+    loan_manager.loan_book(anna, hobbit)
+    loan_manager.return_book(loan_manager.loan_book(anna, dune))
+    reservation_manager.reserve_book(piotr, hobbit)
+    return book_manager, loan_manager, reservation_manager
+
+
+@pytest.fixture
+def out_path(tmp_path):
+    return str(tmp_path / "export")
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def read_ndjson(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestExport:
+    def test_export_books_csv(self, library, out_path):
+        bm, _, _ = library
+        assert export_books(bm, out_path) == 2
+
+        rows = read_csv(out_path)
+        assert rows[0] == [
+            "id",
+            "title",
+            "author",
+            "isbn",
+            "year",
+            "available",
+            "categories",
+        ]
+        assert rows[1][:5] == ["1", "Hobbit", "J.R.R. Tolkien", "9780547928227", "1937"]
+        assert json.loads(rows[1][6]) == ["Fantasy", "Klasyka"]
+        assert rows[2][4] == ""
+
+    def test_export_loans_ndjson_with_filter(self, library, out_path):
+        _, lm, _ = library
+        written = export_loans(
+            lm, out_path, "ndjson", where=lambda loan: not loan["returned"]
+        )
+        assert written == 1
+        assert read_ndjson(out_path) == [
+            {"id": 1, "user_id": 1, "book_id": 1, "returned": False}
+        ]
+
+    def test_field_projection(self, library, out_path):
+        _, _, rm = library
+        export_reservations(rm, out_path, "ndjson", fields=("book_id", "status"))
+        assert read_ndjson(out_path) == [{"id": 1, "book_id": 1, "status": "waiting"}]
+
+    def test_export_from_generator(self, out_path):
+        records = ((i, {"value": i * i}) for i in range(1, 1001))
+        written = export_records(
+            records, out_path, fields=("value",), where=lambda r: r["value"] % 2 == 0
+        )
+        assert written == 500
+        assert read_csv(out_path)[1] == ["2", "4"]
+
+    def test_invalid_arguments(self, out_path):
+        with pytest.raises(ValueError, match="Nieobsługiwany format eksportu: xml"):
+            export_records([], out_path, "xml", fields=("a",))
+        with pytest.raises(ValueError):
+            export_records([], out_path)
@@ -0,0 +1,120 @@
+import math
+import random
+
+import pytest
+
+from src.book_manager import BookManager
+from src.fulltext import B, K1, FullTextIndex, tokenize
+from src.library import Library
+
+
+def exhaustive(index, text):
+    # Wzorcowy BM25 liczony dla każdej książki, bez przycinania.
+    terms = [term for term in dict.fromkeys(tokenize(text)) if term in index._postings]
+    docs = index._docs
+    average = index._total_length / len(docs) if docs else 0
+    scores = {}
+    for book_id, (_, _, length, frequencies) in docs.items():
+        norm = K1 * (1 - B + B * length / average)
+        score = 0.0
+        for term in terms:
+            if term in frequencies:
+                tf = frequencies[term]
+                count = len(index._postings[term])
+                idf = math.log(1 + (len(docs) - count + 0.5) / (count + 0.5))
+                score += idf * tf * (K1 + 1) / (tf + norm)
+        if score:
+            scores[book_id] = score
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+@pytest.fixture
+def manager():
+    manager = BookManager()
+    manager.add_book("Władca Pierścieni", "J.R.R. Tolkien", "1", 1954)
+    manager.add_book("Hobbit", "J.R.R. Tolkien", "2", 1937)
+    manager.add_book("Diuna", "Frank Herbert", "3", 1965)
+    manager.add_book("Dzieci Diuny", "Frank Herbert", "4", 1976)
+    manager.add_book("Mesjasz Diuny", "Frank Herbert", "5", 1969)
+    manager.add_book("Pierścień", "Frank Herbert", "6", 2000)
+    return manager
+
+
+class TestSearchBooks:
+    def test_ranks_by_bm25(self, manager):
+        titles = [book["title"] for book in manager.search_books("Diuna")]
+        assert titles == ["Diuna"]
+        titles = [book["title"] for book in manager.search_books("herbert diuny")]
+        assert titles[:2] == ["Dzieci Diuny", "Mesjasz Diuny"]
+        assert len(titles) == 4
+        # Słowo z tytułu waży więcej niż to samo słowo w autorze.
+        titles = [book["title"] for book in manager.search_books("tolkien hobbit")]
+        assert titles == ["Hobbit", "Władca Pierścieni"]
+        assert manager.search_books("Sapkowski") == []
+        assert manager.search_books("") == []
+
+    def test_limit(self, manager):
+        assert len(manager.search_books("herbert", limit=2)) == 2
+        with pytest.raises(ValueError, match="Limit"):
+            manager.search_books("herbert", limit=0)
+
+    def test_index_follows_writes(self, manager):
+        manager.search_books("diuna")  # indeks już istnieje
+        manager.update_book(3, new_title="Kapitularz Diuną")
+        manager.remove_book(5)
+        new_id = manager.add_book("Diuna: Ród Atrydów", "Brian Herbert", "7")
+
+        assert [book["title"] for book in manager.search_books("diuna")] == [
+            "Diuna: Ród Atrydów"
+        ]
+        assert [book["title"] for book in manager.search_books("diuny")] == [
+            "Dzieci Diuny"
+        ]
+        assert manager.search_books("brian") == [manager.books[new_id]]
+        assert manager.search_books("kapitularz")[0]["title"] == "Kapitularz Diuną"
+
+    def test_loans_do_not_change_ranking(self):
+        library = Library()
+        bm = library.book_manager
+        bm.add_book("Solaris", "Stanisław Lem", "1")
+        library.user_manager.add_user("Anna", "anna@example.com")
+        bm.search_books("lem")
+        library.loan_book(1, 1)
+        assert bm.search_books("solaris") == [bm.books[1]]
+
+
+class TestFullTextIndex:
+    def test_wand_matches_exhaustive_scoring(self):
+        rng = random.Random(3)
+        words = ["noc", "dom", "las", "morze", "wiatr", "sen", "zamek", "kamień"]
+        rare = ["smok", "kometa", "latarnia"]
+        index = FullTextIndex()
+        for book_id in range(1, 501):
+            title = " ".join(
+                rng.choice(rare) if rng.random() < 0.05 else rng.choice(words)
+                for _ in range(rng.randint(1, 5))
+            )
+            book = {"title": title, "author": f"Autor {rng.choice(words)}"}
+            index.update(book_id, book)
+        for book_id in rng.sample(range(1, 501), 100):
+            index.remove(book_id)
+        for book_id in rng.sample(range(501, 600), 20):
+            index.update(book_id, {"title": "smok noc", "author": "Autor las"})
+
+        for _ in range(100):
+            text = " ".join(rng.sample(words + rare, rng.randint(1, 3)))
+            limit = rng.choice([1, 3, 10, 50])
+            expected = exhaustive(index, text)[:limit]
+            result = index.search(text, limit)
+            assert [score for _, score in result] == pytest.approx(
+                [score for _, score in expected]
+            ), text
+
+    def test_tokenize(self):
+        assert tokenize("Diuna: Ród Atrydów, t.1") == [
+            "diuna",
+            "ród",
+            "atrydów",
+            "t",
+            "1",
+        ]
@@ -0,0 +1,182 @@
+import multiprocessing
+import threading
+
+import pytest
+
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.ids import IdAllocator, LocalCounter, SharedCounter, SQLiteCounter
+from src.library import Library
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.snapshot import hydrate_library, snapshot_library
+from src.user_manager import UserManager
+
+
+def take_blocks(counter, count, queue):
+    queue.put([counter.take(10) for _ in range(count)])
+
+
+class TestIdAllocator:
+    def test_default_allocator_is_dense(self):
+        ids = IdAllocator(start=5)
+        assert [ids.allocate() for _ in range(3)] == [5, 6, 7]
+        assert ids.next_id == 8
+
+    def test_block_leases_are_unique_across_threads(self):
+        ids = IdAllocator(block_size=16)
+        results = [[] for _ in range(8)]
+
+        def insert(result):
+            for _ in range(1000):
+                result.append(ids.allocate())
+
+        threads = [threading.Thread(target=insert, args=(r,)) for r in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        allocated = [book_id for result in results for book_id in result]
+        assert len(set(allocated)) == 8000
+        assert ids.next_id > max(allocated)
+
+    def test_reset_discards_leases(self):
+        ids = IdAllocator(block_size=100)
+        assert ids.allocate() == 1
+        assert ids.next_id == 101
+        ids.reset(500)
+        assert ids.allocate() == 500
+
+    def test_invalid_block_size(self):
+        with pytest.raises(ValueError, match="Rozmiar bloku ID musi być dodatni"):
+            IdAllocator(block_size=0)
+
+
+class TestCounters:
+    def test_shared_counter_across_processes(self):
+        counter = SharedCounter()
+        queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=take_blocks, args=(counter, 50, queue))
+            for _ in range(3)
+        ]
+        for process in processes:
+            process.start()
+        blocks = [first for _ in processes for first in queue.get(timeout=10)]
+        for process in processes:
+            process.join()
+
+        assert sorted(blocks) == list(range(1, 1501, 10))
+        assert counter.value == 1501
+
+    def test_sqlite_counter_shared_by_connections(self, tmp_path):
+        path = str(tmp_path / "ids.db")
+        first = SQLiteCounter(path, "books")
+        second = SQLiteCounter(path, "books", start=1000)
+        assert first.take(10) == 1
+        assert second.take(10) == 11
+        second.advance_to(5)
+        assert first.value == 21
+        first.close()
+        second.close()
+
+    def test_local_counter_advance_to(self):
+        counter = LocalCounter(10)
+        counter.advance_to(3)
+        assert counter.value == 10
+        counter.advance_to(30)
+        assert counter.take(2) == 30
+
+
+class TestManagersWithLeases:
+    def test_managers_share_counter_semantics(self):
+        counter = LocalCounter()
+        first = BookManager(ids=IdAllocator(block_size=4, counter=counter))
+        second = BookManager(ids=IdAllocator(block_size=4, counter=counter))
+        a = first.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        b = second.add_book("Diuna", "Frank Herbert", "9780441013593")
+        c = first.add_book("Silmarillion", "J.R.R. Tolkien", "9780618391110")
+        assert (a, b, c) == (1, 5, 2)
+
+    def test_high_water_mark_survives_snapshot(self):
+        book_manager = BookManager(ids=IdAllocator(block_size=64))
+        user_manager = UserManager()
+        book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        restored = hydrate_library(
+            snapshot_library(
+                book_manager,
+                user_manager,
+                LoanManager(book_manager, user_manager),
+                ReservationManager(book_manager, user_manager),
+                CategoryManager(book_manager),
+            )
+        )
+        # ID z wydzierżawionego bloku nie mogą zostać wydane ponownie.
+        assert restored["book_manager"].next_id == 65
+        assert restored["book_manager"].add_book("Diuna", "F. Herbert", "1") == 65
+
+    @pytest.mark.parametrize("shared", [False, True])
+    def test_rollback_leaves_a_gap(self, tmp_path, shared):
+        library = Library()
+        library.book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        library.user_manager.add_user("Anna", "anna@example.com")
+        counter = SQLiteCounter(str(tmp_path / "ids.db"), "loans") if shared else None
+        library.loan_manager.ids = IdAllocator(counter=counter)
+
+        with pytest.raises(RuntimeError):
+            with library.transaction():
+                library.loan_book(1, 1)
+                raise RuntimeError("przerwane")
+
+        # Wydane ID przepada, licznik się nie cofa.
+        assert library.loan_manager.loans == {}
+        assert library.loan_book(1, 1) == 2
+        if shared:
+            counter.close()
+
+    def test_rollback_removes_records_with_leased_ids(self):
+        library = Library()
+        for isbn in ("1", "2"):
+            library.book_manager.add_book("Hobbit", "J.R.R. Tolkien", isbn)
+        for name in ("Anna", "Piotr"):
+            library.user_manager.add_user(name, f"{name.lower()}@example.com")
+        lm, rm = library.loan_manager, library.reservation_manager
+        lm.ids = IdAllocator(block_size=100)
+        rm.ids = IdAllocator(block_size=100)
+        library.loan_book(1, 1)
+        library.reserve_book(2, 1)  # next_id to już 101, a nie kolejne ID
+
+        with pytest.raises(RuntimeError):
+            with library.transaction():
+                assert library.loan_book(1, 2) == 2
+                assert library.reserve_book(1, 1) == 2
+                raise RuntimeError("przerwane")
+
+        assert list(lm.loans) == [1]
+        assert list(rm.reservations) == [1]
+        assert rm.book_queues[1] == [1]
+        assert library.book_manager.get_book(2)["available"] is True
+
+    def test_rollback_does_not_reissue_ids_of_other_threads(self):
+        library = Library()
+        for isbn in ("1", "2"):
+            library.book_manager.add_book("Hobbit", "J.R.R. Tolkien", isbn)
+        library.user_manager.add_user("Anna", "anna@example.com")
+        lm = library.loan_manager
+        other = []
+
+        with pytest.raises(RuntimeError):
+            with library.transaction():
+                library.loan_book(1, 1)
+                thread = threading.Thread(
+                    target=lambda: other.append(lm.loan_book(1, 2))
+                )
+                thread.start()
+                thread.join()
+                raise RuntimeError("przerwane")
+
+        assert other == [2]
+        assert list(lm.loans) == [2]
+        assert lm.loan_book(1, 1) == 3
+        assert lm.get_loan(2)["book_id"] == 2
@@ -0,0 +1,128 @@
+import pytest
+
+from src.book_manager import BookManager
+from src.importer import (
+    MAX_REPORTED_ERRORS,
+    import_books,
+    import_users,
+    validate_book_rows,
+)
+from src.user_manager import UserManager
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    def write(content):
+        path = tmp_path / "feed.csv"
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        return str(path)
+
+    return write
+
+
+BOOKS_CSV = (
+    "isbn,title,author,year\n"
+    "9780547928227,Hobbit,J.R.R. Tolkien,1937\n"
+    "9780441013593,Dune,Frank Herbert,\n"
+    "12345,Zły ISBN,Autor,2000\n"
+    "9780306406157,,Bez tytułu,2000\n"
+    "0306406152,Zły rok,Autor,rok\n"
+    "0306406152,Solaris,Stanisław Lem,1961\n"
+)
+
+
+class TestValidateBookRows:
+    def test_checksum_option(self):
+        rows = [(2, ["Tytuł", "Autor", "1234567890", ""])]
+        valid, errors = validate_book_rows(rows)
+        assert len(valid) == 1 and not errors
+
+        valid, errors = validate_book_rows(rows, checksum=True)
+        assert not valid
+        assert errors == [(2, "Nieprawidłowy ISBN: 1234567890")]
+
+
+class TestImportBooks:
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_import_books(self, workers, write_csv):
+        manager = BookManager()
+        report = import_books(
+            write_csv(BOOKS_CSV), manager, chunk_size=2, workers=workers
+        )
+
+        assert report.rows_read == 6
+        assert report.imported == 3
+        assert report.rejected == 3
+        assert [line for line, message in report.errors] == [4, 5, 6]
+        titles = [book["title"] for book in manager.list_books()]
+        assert titles == ["Hobbit", "Dune", "Solaris"]
+        assert manager.get_book(1)["year"] == 1937
+        assert "year" not in manager.get_book(2)
+
+    def test_quoted_multiline_fields(self, write_csv):
+        manager = BookManager()
+        content = (
+            "title,author,isbn\n"
+            '"Tytuł, z przecinkiem",Autor,1234567890\n'
+            '"Tytuł\nw dwóch liniach",Autor,1234567890\n'
+            ",Autor,1234567890\n"
+        )
+        report = import_books(write_csv(content), manager, chunk_size=1, workers=0)
+        assert report.imported == 2
+        assert manager.get_book(2)["title"] == "Tytuł\nw dwóch liniach"
+        assert report.errors == [(5, "Tytuł musi być niepustym ciągiem znaków")]
+
+    def test_progress_callback(self, write_csv):
+        progress = []
+        import_books(
+            write_csv(BOOKS_CSV),
+            BookManager(),
+            chunk_size=4,
+            workers=0,
+            progress=lambda report: progress.append(report.rows_read),
+        )
+        assert progress == [4, 6]
+
+    def test_missing_column(self, write_csv):
+        with pytest.raises(ValueError, match="Brak kolumn w pliku CSV: isbn"):
+            import_books(write_csv("title,author\nA,B\n"), BookManager(), workers=0)
+
+    def test_year_column_optional(self, write_csv):
+        manager = BookManager()
+        report = import_books(
+            write_csv("title,author,isbn\nHobbit,Tolkien,9780547928227\n"),
+            manager,
+            workers=0,
+        )
+        assert report.imported == 1
+
+    def test_reported_errors_are_capped(self, write_csv):
+        content = "title,author,isbn\n" + ",,\n" * (MAX_REPORTED_ERRORS + 10)
+        report = import_books(write_csv(content), BookManager(), workers=0)
+        assert report.rejected == MAX_REPORTED_ERRORS + 10
+        assert len(report.errors) == MAX_REPORTED_ERRORS
+
+
+class TestImportUsers:
+    def test_import_users(self, write_csv):
+        manager = UserManager()
+        report = import_users(
+            write_csv(
+                "name,email\n"
+                "Jan Kowalski,jan@example.com\n"
+                "Bez Maila,niepoprawny\n"
+                ",anna@example.com\n"
+            ),
+            manager,
+            workers=2,
+        )
+        assert report.imported == 1
+        assert report.errors == [
+            (3, "Nieprawidłowy email: niepoprawny"),
+            (4, "Imię musi być niepustym ciągiem znaków"),
+        ]
+        assert manager.get_user(1) == {
+            "name": "Jan Kowalski",
+            "email": "jan@example.com",
+        }
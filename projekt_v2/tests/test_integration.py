@@ -11,12 +11,12 @@ from src.utils import validate_email, validate_isbn, save_data, load_data
 
 
 @pytest.fixture
-def library_setup():
-    book_manager = BookManager()
-    user_manager = UserManager()
-    category_manager = CategoryManager(book_manager)
-    loan_manager = LoanManager(book_manager, user_manager)
-    reservation_manager = ReservationManager(book_manager, user_manager)
+def library_setup(storage):
+    book_manager = BookManager(storage)
+    user_manager = UserManager(storage)
+    category_manager = CategoryManager(book_manager, storage)
+    loan_manager = LoanManager(book_manager, user_manager, storage)
+    reservation_manager = ReservationManager(book_manager, user_manager, storage)
 
     sample_user_id = user_manager.add_user("Jan Kowalski", "jan@example.com")
     sample_book_id = book_manager.add_book(
@@ -24,7 +24,10 @@ def library_setup():
     )
 
     if "categories" not in book_manager.books[sample_book_id]:
-        book_manager.books[sample_book_id]["categories"] = []
+        # Magazyn SQLite zwraca kopie rekordów, więc zmianę zapisujemy.
+        book = book_manager.get_book(sample_book_id)
+        book["categories"] = []
+        book_manager.save_book(sample_book_id, book)
 
     if "Fantasy" not in category_manager.categories:
         category_manager.add_category("Fantasy")
@@ -228,7 +231,7 @@ class TestLibrarySystemIntegration:
         book2_title = "Hobbit Edycja Testowa Workflow"
         book2_id = bm.add_book(book2_title, "J.R.R. Tolkien", "9780000000002", 1937)
         if "categories" not in bm.books[book2_id]:
-            bm.books[book2_id]["categories"] = []
+            bm.save_book(book2_id, dict(bm.get_book(book2_id), categories=[]))
         fantasy_cat = "Fantasy"
         adventure_cat = "Przygodowa Test Workflow"
         if adventure_cat not in cm.categories:
@@ -0,0 +1,105 @@
+import pytest
+
+from src.library import Library
+from src.snapshot import hydrate_library, snapshot_library
+from src.storage import SQLiteStorage
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def library(request):
+    storage = SQLiteStorage() if request.param == "sqlite" else None
+    library = Library(storage)
+    library.book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+    library.user_manager.add_user("Anna", "anna@example.com")
+    library.user_manager.add_user("Piotr", "piotr@example.com")
+    return library
+
+
+class TestLibrary:
+    def test_loan_and_return_promotes_reservation(self, library):
+        loan_id = library.loan_book(1, 1)
+        reservation_id = library.reserve_book(2, 1)
+
+        assert library.return_book(loan_id) == reservation_id
+        reservation = library.reservation_manager.get_reservation(reservation_id)
+        assert reservation["status"] == "ready"
+        assert library.loan_manager.get_loan(loan_id)["returned"] is True
+
+    def test_return_without_queue(self, library):
+        assert library.return_book(library.loan_book(1, 1)) is False
+        assert library.book_manager.get_book(1)["available"] is True
+
+    def test_collect_reservation(self, library):
+        loan_id = library.loan_book(1, 1)
+        reservation_id = library.reserve_book(2, 1)
+        library.return_book(loan_id)
+
+        new_loan_id = library.collect_reservation(reservation_id)
+
+        assert library.loan_manager.get_loan(new_loan_id)["user_id"] == 2
+        reservation = library.reservation_manager.get_reservation(reservation_id)
+        assert reservation["status"] == "completed"
+        assert library.reservation_manager.book_queues[1] == []
+
+    def test_failed_step_rolls_back_whole_operation(self, library):
+        loan_id = library.loan_book(1, 1)
+        reservation_id = library.reserve_book(2, 1)
+        library.return_book(loan_id)
+        # Ktoś wypożycza książkę z pominięciem kolejki.
+        library.loan_manager.loan_book(1, 1)
+
+        with pytest.raises(ValueError, match="jest już wypożyczona"):
+            library.collect_reservation(reservation_id)
+
+        reservation = library.reservation_manager.get_reservation(reservation_id)
+        assert reservation["status"] == "ready"
+        assert library.reservation_manager.book_queues[1] == [reservation_id]
+        assert len(library.loan_manager.loans) == 2
+
+    def test_explicit_transaction_rollback(self, library):
+        with pytest.raises(RuntimeError):
+            with library.transaction():
+                library.loan_book(1, 1)
+                library.reserve_book(2, 1)
+                raise RuntimeError("przerwane")
+
+        assert library.book_manager.get_book(1)["available"] is True
+        assert len(library.loan_manager.loans) == 0
+        assert len(library.reservation_manager.reservations) == 0
+        # ID wydane w wycofanej transakcji nie wracają do puli.
+        assert library.loan_manager.next_id == 2
+        assert library.reservation_manager.next_id == 2
+        assert 1 not in library.reservation_manager.book_queues
+
+    def test_lookups_shared_within_transaction(self, library, monkeypatch):
+        calls = []
+        get_book = library.book_manager.get_book
+        monkeypatch.setattr(
+            library.book_manager,
+            "get_book",
+            lambda book_id: calls.append(book_id) or get_book(book_id),
+        )
+
+        with library.transaction():
+            library.loan_book(1, 1)
+            library.reserve_book(2, 1)
+
+        assert calls == [1]
+
+    def test_unknown_records(self, library):
+        with pytest.raises(ValueError, match="Użytkownik o ID 9 nie istnieje"):
+            library.loan_book(9, 1)
+        with pytest.raises(ValueError, match="Książka o ID 9 nie istnieje"):
+            library.reserve_book(1, 9)
+
+    def test_from_hydrated_managers(self, library):
+        library.loan_book(1, 1)
+        managers = (
+            library.book_manager,
+            library.user_manager,
+            library.loan_manager,
+            library.reservation_manager,
+            library.category_manager,
+        )
+        restored = Library.from_managers(**hydrate_library(snapshot_library(*managers)))
+        assert restored.reserve_book(2, 1) == 1
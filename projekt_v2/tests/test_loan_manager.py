@@ -5,10 +5,10 @@ from src.user_manager import UserManager
 
 
 @pytest.fixture
-def setup_managers():
-    book_manager = BookManager()
-    user_manager = UserManager()
-    loan_manager = LoanManager(book_manager, user_manager)
+def setup_managers(storage):
+    book_manager = BookManager(storage)
+    user_manager = UserManager(storage)
+    loan_manager = LoanManager(book_manager, user_manager, storage)
     book_id = book_manager.add_book("1984", "George Orwell", "9780451524935", 1949)
     user_id = user_manager.add_user("John Doe", "john@example.com")
     return loan_manager, book_id, user_id, book_manager, user_manager
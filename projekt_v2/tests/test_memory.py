@@ -0,0 +1,84 @@
+import sys
+
+from src.book_manager import BookManager
+from src.library import Library
+from src.memory import deep_size, format_memory_report, memory_report, trace_allocations
+
+
+class TestDeepSize:
+    def test_counts_nested_and_shared_objects_once(self):
+        shared = ["x" * 1000]
+        nested = {"a": shared, "b": shared}
+        size = deep_size(nested)
+        assert size >= sys.getsizeof(nested) + sys.getsizeof("x" * 1000)
+        assert size < sys.getsizeof(nested) + 2 * sys.getsizeof("x" * 1000)
+
+    def test_seen_set_shared_between_calls(self):
+        record = {"title": "t" * 5000}
+        seen = set()
+        first = deep_size([record], seen)
+        second = deep_size([record], seen)
+        assert second == sys.getsizeof([record])
+        assert first > second
+
+
+class TestMemoryReport:
+    def test_report_per_manager_and_structure(self):
+        library = Library()
+        bm = library.book_manager
+        for i in range(100):
+            bm.add_book(f"Tytuł {i}", "Autor", "9780547928227")
+        library.user_manager.add_user("Anna", "anna@example.com")
+        library.loan_manager.loan_book(1, 1)
+        library.reservation_manager.reserve_book(1, 1)
+        library.category_manager.add_category("Fantasy")
+
+        report = memory_report(
+            books=bm,
+            loans=library.loan_manager,
+            reservations=library.reservation_manager,
+            categories=library.category_manager,
+        )
+
+        assert set(report["reservations"]) == {"reservations", "book_queues", "total"}
+        assert "_indexes" not in report["books"]
+        assert report["books"]["books"] > report["loans"]["loans"] > 0
+        assert report["categories"]["categories"] > 0
+        assert report["total"] == sum(
+            structures["total"]
+            for name, structures in report.items()
+            if name != "total"
+        )
+        text = format_memory_report(report)
+        assert text.splitlines()[0].startswith("books: ")
+        assert "  book_queues: " in text
+        assert text.splitlines()[-1].startswith("razem: ")
+
+    def test_each_search_index_reported_separately(self):
+        bm = BookManager()
+        for i in range(100):
+            bm.add_book(f"Tytuł {i}", f"Autor {i % 7}", "9780547928227")
+        bm.build_indexes()
+
+        books = memory_report(books=bm)["books"]
+        for attribute in ("_query_index", "_availability_index", "_fulltext_index"):
+            assert books[attribute] > 0
+        assert "_indexes" not in books
+        assert books["total"] == sum(
+            size for attribute, size in books.items() if attribute != "total"
+        )
+
+
+class TestTraceAllocations:
+    def test_reports_allocation_diff(self):
+        manager = BookManager()
+        with trace_allocations(top=5) as allocations:
+            manager.add_books(
+                {"title": f"Tytuł {i}", "author": "Autor", "isbn": "9780547928227"}
+                for i in range(10_000)
+            )
+
+        assert allocations.allocated > deep_size(manager.books) // 2
+        assert allocations.peak >= allocations.allocated
+        assert 0 < len(allocations.top) <= 5
+        assert allocations.format().startswith("przyrost: ")
@@ -0,0 +1,122 @@
+import urllib.request
+
+import pytest
+
+from src.book_manager import BookManager
+from src.metrics import (
+    LatencyHistogram,
+    ManagerMetrics,
+    bucket_index,
+    bucket_upper_bound,
+)
+from src.workload import WorkloadRecorder
+
+
+class TestLatencyHistogram:
+    def test_buckets_are_monotonic_with_bounded_error(self):
+        previous = -1
+        for value in list(range(0, 200)) + [10**3, 12_345, 10**6, 987_654_321]:
+            index = bucket_index(value)
+            assert index >= previous
+            previous = index
+            upper = bucket_upper_bound(index)
+            assert value <= upper <= value * (1 + 1 / 32) + 1
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 1001):
+            histogram.record(value * 1000)
+
+        assert histogram.count == 1000
+        assert histogram.max == 1_000_000
+        assert histogram.percentile(0.5) == pytest.approx(500_000, rel=1 / 32)
+        assert histogram.percentile(0.99) == pytest.approx(990_000, rel=1 / 32)
+        assert histogram.percentile(1.0) == 1_000_000
+        assert LatencyHistogram().percentile(0.5) == 0
+
+
+class TestManagerMetrics:
+    def test_counts_calls_and_errors(self):
+        manager = BookManager()
+        metrics = ManagerMetrics().instrument(books=manager)
+
+        book_id = manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        manager.get_book(book_id)
+        with pytest.raises(ValueError):
+            manager.get_book(99)
+
+        summary = metrics.summary()
+        assert summary["books.add_book"]["calls"] == 1
+        assert summary["books.get_book"]["calls"] == 2
+        assert summary["books.get_book"]["errors"] == 1
+        assert summary["books.get_book"]["p50"] <= summary["books.get_book"]["max"]
+        assert "books.list_books" not in summary
+
+    def test_uninstrument_restores_methods(self):
+        manager = BookManager()
+        metrics = ManagerMetrics().instrument(books=manager)
+        metrics.uninstrument()
+        assert "get_book" not in vars(manager)
+
+    @pytest.mark.parametrize("metrics_first", [True, False])
+    def test_uninstrument_keeps_recorder_wrappers(self, tmp_path, metrics_first):
+        manager = BookManager()
+        book_id = manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        recorder = WorkloadRecorder(str(tmp_path / "slad.ndjson"))
+        metrics = ManagerMetrics()
+        if metrics_first:
+            metrics.instrument(books=manager)
+            recorder.attach(books=manager)
+        else:
+            recorder.attach(books=manager)
+            metrics.instrument(books=manager)
+
+        metrics.uninstrument()
+        manager.get_book(book_id)
+        manager.query_books(author="J.R.R. Tolkien")
+        assert recorder.calls == 2
+        assert metrics.summary() == {}
+        recorder.close()
+        assert "get_book" not in vars(manager)
+
+    def test_unknown_manager(self):
+        with pytest.raises(ValueError, match="Nieznany manager: shelves"):
+            ManagerMetrics().instrument(shelves=object())
+
+    def test_prometheus_text(self):
+        manager = BookManager()
+        metrics = ManagerMetrics().instrument(books=manager)
+        manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+
+        text = metrics.prometheus_text()
+        labels = 'manager="books",method="add_book"'
+        assert f"library_calls_total{{{labels}}} 1" in text
+        assert f"library_errors_total{{{labels}}} 0" in text
+        assert f'library_call_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+        assert f"library_call_duration_seconds_count{{{labels}}} 1" in text
+        assert "# TYPE library_call_duration_seconds histogram" in text
+
+    def test_write_prometheus_file(self, tmp_path):
+        manager = BookManager()
+        metrics = ManagerMetrics().instrument(books=manager)
+        manager.list_books()
+        path = str(tmp_path / "library.prom")
+
+        metrics.write_prometheus(path)
+
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == metrics.prometheus_text()
+
+    def test_serve_prometheus(self):
+        manager = BookManager()
+        metrics = ManagerMetrics().instrument(books=manager)
+        manager.list_books()
+        server = metrics.serve_prometheus(port=0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read().decode("utf-8")
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'library_calls_total{manager="books",method="list_books"} 1' in body
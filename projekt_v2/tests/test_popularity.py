@@ -0,0 +1,93 @@
+import random
+from collections import Counter
+
+import pytest
+
+from src.library import Library
+from src.popularity import CountMinSketch, PopularityTracker
+
+DAY = 24 * 3600
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+class TestCountMinSketch:
+    def test_never_underestimates_and_subtracts(self):
+        rng = random.Random(1)
+        sketch, other = CountMinSketch(width=64), CountMinSketch(width=64)
+        counts = Counter(rng.randrange(500) for _ in range(5000))
+        for key, count in counts.items():
+            sketch.add(key, count)
+            other.add(key, count)
+        assert all(sketch.estimate(key) >= count for key, count in counts.items())
+
+        sketch.subtract(other)
+        assert all(sketch.estimate(key) == 0 for key in counts)
+
+
+class TestPopularityTracker:
+    def test_top_k_from_loans_and_reservations(self, clock):
+        library = Library()
+        tracker = PopularityTracker(library.event_bus, clock=clock)
+        for title in ("Hobbit", "Diuna", "Solaris"):
+            library.book_manager.add_book(title, "Autor", "1")
+        for name in ("Anna", "Piotr", "Ewa"):
+            library.user_manager.add_user(name, f"{name.lower()}@example.com")
+
+        loan_id = library.loan_book(1, 2)
+        library.reserve_book(2, 2)
+        library.reserve_book(3, 2)
+        library.return_book(loan_id)
+        library.loan_book(2, 3)
+
+        assert tracker.top(2) == [(2, 3), (3, 1)]
+        assert tracker.estimate(2) == 3
+        assert tracker.estimate(1) == 0
+        assert tracker.top(0) == []
+
+    def test_counts_leave_the_window(self, clock):
+        tracker = PopularityTracker(window=7 * DAY, buckets=7, clock=clock)
+        for _ in range(5):
+            tracker.record(1)
+        clock.now += 3 * DAY
+        for _ in range(3):
+            tracker.record(2)
+        assert tracker.top() == [(1, 5), (2, 3)]
+
+        clock.now += 5 * DAY  # zliczenia książki 1 mają już ponad tydzień
+        assert tracker.top() == [(2, 3)]
+        clock.now += 30 * DAY
+        assert tracker.top() == []
+        assert tracker.estimate(2) == 0
+
+    def test_heavy_hitters_match_exact_counts(self, clock):
+        rng = random.Random(5)
+        tracker = PopularityTracker(capacity=50, clock=clock)
+        exact = Counter()
+        for _ in range(20_000):
+            # Rozkład o długim ogonie: kilka książek jest bardzo popularnych.
+            book_id = int(rng.paretovariate(1.2))
+            tracker.record(book_id)
+            exact[book_id] += 1
+
+        top = tracker.top(10)
+        assert [book_id for book_id, _ in top] == [
+            book_id for book_id, _ in exact.most_common(10)
+        ]
+        for book_id, estimate in top:
+            assert exact[book_id] <= estimate <= exact[book_id] + 20_000 * 2 / 2048
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError):
+            PopularityTracker(capacity=0)
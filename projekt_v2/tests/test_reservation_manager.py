@@ -30,10 +30,10 @@ class DummyUserManager:
 
 
 @pytest.fixture
-def reservation_manager_setup():
+def reservation_manager_setup(storage):
     book_manager = DummyBookManager()
     user_manager = DummyUserManager()
-    rm = ReservationManager(book_manager, user_manager)
+    rm = ReservationManager(book_manager, user_manager, storage)
 
     user_manager.add_user(1)
     book_manager.add_book(101, available=False)
@@ -82,9 +82,11 @@ class TestReservationManager:
         reservation_id = rm.reserve_book(1, 101)
         rm.book_returned(101)
         assert "expiry_date" in rm.reservations[reservation_id]
-        rm.reservations[reservation_id]["expiry_date"] = (
+        reservation = rm.reservations[reservation_id]
+        reservation["expiry_date"] = (
             datetime.now() - timedelta(days=rm.reservation_expiry_days + 1)
         ).isoformat()
+        rm.reservations[reservation_id] = reservation
 
         expired_ids = rm.check_expired_reservations()
         assert reservation_id in expired_ids
@@ -0,0 +1,228 @@
+import asyncio
+import json
+
+import pytest
+
+from src.library import Library
+from src.server import LibraryService, serve
+
+
+@pytest.fixture
+def service():
+    service = LibraryService()
+    service.library.book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+    service.library.user_manager.add_user("Anna", "anna@example.com")
+    service.library.user_manager.add_user("Piotr", "piotr@example.com")
+    return service
+
+
+def request(method, path, payload=None, close=False):
+    body = b"" if payload is None else json.dumps(payload).encode()
+    head = f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n"
+    if close:
+        head += "Connection: close\r\n"
+    return head.encode() + b"\r\n" + body
+
+
+async def read_response(reader):
+    head = (await reader.readuntil(b"\r\n\r\n")).decode()
+    status = int(head.split(" ")[1])
+    length = int(head.lower().split("content-length: ")[1].split("\r\n")[0])
+    body = await reader.readexactly(length)
+    return status, json.loads(body) if body else None
+
+
+def exchange(service, raw, responses):
+    async def scenario():
+        server = await serve(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        results = [await read_response(reader) for _ in range(responses)]
+        closed = await reader.read() == b""
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return results, closed
+
+    return asyncio.run(scenario())
+
+
+class TestDispatch:
+    def test_book_crud(self, service):
+        status, created = service.dispatch(
+            "POST", "/books", {"title": "Diuna", "author": "Herbert", "isbn": "123"}
+        )
+        assert (status, created) == (201, {"id": 2})
+        status, book = service.dispatch("PATCH", "/books/2", {"year": 1965})
+        assert status == 200 and book["year"] == 1965
+        assert service.dispatch("DELETE", "/books/2", None) == (204, None)
+        assert service.dispatch("GET", "/books/2", None) == (
+            404,
+            {"error": "Książka o ID 2 nie istnieje"},
+        )
+
+    def test_loan_return_promotes_reservation(self, service):
+        assert service.dispatch("POST", "/loans", {"user_id": 1, "book_id": 1}) == (
+            201,
+            {"id": 1},
+        )
+        service.dispatch("POST", "/reservations", {"user_id": 2, "book_id": 1})
+        status, result = service.dispatch("POST", "/loans/1/return", None)
+        assert result == {"returned": True, "ready_reservation_id": 1}
+        status, loan = service.dispatch("POST", "/reservations/1/collect", None)
+        assert (status, loan) == (201, {"loan_id": 2})
+
+    def test_search_categories_and_pagination(self, service):
+        service.library.book_manager.books[1]["categories"] = []
+        service.dispatch("POST", "/categories", {"name": "Fantasy"})
+        service.dispatch("POST", "/books/1/categories", {"category": "Fantasy"})
+        assert service.dispatch("GET", "/categories/Fantasy/books", None) == (200, [1])
+        status, found = service.dispatch("GET", "/books/search?title=hob", None)
+        assert [book["title"] for book in found] == ["Hobbit"]
+        status, found = service.dispatch("GET", "/books/search?q=tolkien", None)
+        assert [book["title"] for book in found] == ["Hobbit"]
+        service.dispatch("POST", "/loans", {"user_id": 1, "book_id": 1})
+        status, found = service.dispatch(
+            "GET", "/books/search?title=hob&available=true", None
+        )
+        assert found == []
+        status, popular = service.dispatch("GET", "/books/popular?limit=5", None)
+        assert [(book["id"], book["score"]) for book in popular] == [(1, 1)]
+        assert service.dispatch("GET", "/books/availability", None) == (
+            200,
+            {"available": 0, "unavailable": 1},
+        )
+        assert (
+            service.dispatch("GET", "/books/search?title=a&available=tak", None)[0]
+            == 400
+        )
+        status, users = service.dispatch("GET", "/users?offset=1&limit=5", None)
+        assert [user["id"] for user in users] == [2]
+
+    def test_errors(self, service):
+        assert service.dispatch("GET", "/nieznane", None)[0] == 404
+        assert service.dispatch("PUT", "/books", None)[0] == 405
+        assert service.dispatch("POST", "/loans", {"user_id": 1}) == (
+            400,
+            {"error": "Brak pola book_id"},
+        )
+        assert (
+            service.dispatch(
+                "POST", "/books", {"title": "", "author": "A", "isbn": "1"}
+            )[0]
+            == 400
+        )
+
+    def test_batch(self, service):
+        status, results = service.dispatch(
+            "POST",
+            "/batch",
+            [
+                {
+                    "method": "POST",
+                    "path": "/loans",
+                    "body": {"user_id": 1, "book_id": 1},
+                },
+                {
+                    "method": "POST",
+                    "path": "/loans",
+                    "body": {"user_id": 2, "book_id": 1},
+                },
+                {"path": "/loans/1"},
+            ],
+        )
+        assert status == 200
+        assert [result["status"] for result in results] == [201, 400, 200]
+        assert results[2]["body"]["book_id"] == 1
+
+    def test_malformed_paths_are_not_found(self, service):
+        assert service.dispatch("GET", "books", None)[0] == 404
+        assert service.dispatch("GET", "", None)[0] == 404
+        status, results = service.dispatch(
+            "POST", "/batch", [{"path": "books"}, {"path": 5}, {"path": "/books/1"}]
+        )
+        assert [result["status"] for result in results] == [404, 400, 200]
+
+    def test_unexpected_error_is_500(self, service):
+        def broken(query, payload):
+            raise KeyError("categories")
+
+        service.route("GET", "/broken", broken)
+        assert service.dispatch("GET", "/broken", None) == (
+            500,
+            {"error": "Błąd serwera: KeyError"},
+        )
+
+    def test_indexes_are_built_up_front(self):
+        library = Library()
+        bm = library.book_manager
+        bm.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        LibraryService(library)
+        # Żądania nie budują już indeksów w pętli zdarzeń.
+        assert bm._query_index is not None
+        assert bm._availability_index is not None
+        assert bm._fulltext_index is not None
+        assert bm.query_books(author="tolkien") == [bm.books[1]]
+
+    def test_assign_category_to_book_without_categories(self, service):
+        service.dispatch("POST", "/categories", {"name": "Fantasy"})
+        status, book = service.dispatch(
+            "POST", "/books/1/categories", {"category": "Fantasy"}
+        )
+        assert (status, book["categories"]) == (200, ["Fantasy"])
+
+
+class TestHttpServer:
+    def test_pipelined_keep_alive_requests(self, service):
+        raw = (
+            request("GET", "/books/1")
+            + request("POST", "/loans", {"user_id": 1, "book_id": 1})
+            + request("GET", "/books/1", close=True)
+        )
+        results, closed = exchange(service, raw, 3)
+
+        assert [status for status, _ in results] == [200, 201, 200]
+        assert results[0][1]["available"] is True
+        assert results[2][1]["available"] is False
+        assert closed
+
+    def test_invalid_json_keeps_earlier_responses(self, service):
+        raw = request("GET", "/users/1") + (
+            b"POST /books HTTP/1.1\r\nContent-Length: 3\r\nConnection: close\r\n\r\n{x}"
+        )
+        results, closed = exchange(service, raw, 2)
+        assert results[0] == (
+            200,
+            {"id": 1, "name": "Anna", "email": "anna@example.com"},
+        )
+        assert results[1] == (400, {"error": "Nieprawidłowy JSON"})
+
+    def test_malformed_request_closes_connection(self, service):
+        results, closed = exchange(service, b"NONSENSE\r\n\r\n", 1)
+        assert results[0][0] == 400
+        assert closed
+
+    def test_error_keeps_pipelined_requests(self, service):
+        def broken(query, payload):
+            raise KeyError("categories")
+
+        service.route("GET", "/broken", broken)
+        raw = (
+            request("GET", "/broken")
+            + request("POST", "/batch", [{"path": "books"}])
+            + request("GET", "/books/1", close=True)
+        )
+        results, closed = exchange(service, raw, 3)
+        assert [status for status, _ in results] == [500, 200, 200]
+        assert results[1][1] == [
+            {"status": 404, "body": {"error": "Nieznany zasób: books"}}
+        ]
+        assert closed
+
+    @pytest.mark.parametrize("length", ["-1", "abc", "1_0", "+3"])
+    def test_invalid_content_length(self, service, length):
+        raw = f"POST /books HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}"
+        results, closed = exchange(service, raw.encode(), 1)
+        assert results[0] == (400, {"error": "Nieprawidłowe żądanie"})
+        assert closed
@@ -0,0 +1,106 @@
+import pytest
+
+from src.events import BookAdded, BookRemoved, EventBus
+from src.loan_manager import LoanManager
+from src.sharding import ShardedBookManager
+from src.user_manager import UserManager
+
+
+@pytest.fixture
+def sharded():
+    manager = ShardedBookManager(shards=2)
+    yield manager
+    manager.close()
+
+
+class TestShardedBookManager:
+    def test_point_operations_route_by_id(self, sharded):
+        first = sharded.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        second = sharded.add_book("Diuna", "Frank Herbert", "9780441013593", 1965)
+
+        assert sharded._call(first, "contains", first)
+        assert sharded.get_book(second)["year"] == 1965
+        assert sharded.update_book(first, new_title="Hobbit, czyli tam i z powrotem")
+        assert sharded.get_book(first)["title"] == "Hobbit, czyli tam i z powrotem"
+
+        sharded.remove_book(first)
+        assert first not in sharded.books
+        with pytest.raises(ValueError, match="Książka o ID 1 nie istnieje"):
+            sharded.get_book(first)
+        with pytest.raises(ValueError):
+            sharded.remove_book(first)
+
+    def test_search_merges_results_in_id_order(self, sharded):
+        sharded.add_books(
+            {"title": f"Tom {i}", "author": "Autor" if i % 3 else "Inny", "isbn": "1"}
+            for i in range(10)
+        )
+
+        assert [len(rows) for rows in sharded._scatter("items")] == [5, 5]
+        assert [b["title"] for b in sharded.find_books_by_title("tom")] == [
+            f"Tom {i}" for i in range(10)
+        ]
+        assert [b["title"] for b in sharded.find_books_by_author("inny")] == [
+            "Tom 0",
+            "Tom 3",
+            "Tom 6",
+            "Tom 9",
+        ]
+        sharded.books[4] = dict(sharded.get_book(4), available=False)
+        assert [b["title"] for b in sharded.find_books_by_author("in", True)] == [
+            "Tom 0",
+            "Tom 6",
+            "Tom 9",
+        ]
+        assert [b["title"] for b in sharded.find_books_by_title("tom", False)] == [
+            "Tom 3"
+        ]
+        assert len(sharded.books) == 10
+        assert list(sharded.books) == list(range(1, 11))
+        assert [b["title"] for b in sharded.list_books()][:2] == ["Tom 0", "Tom 1"]
+
+    def test_events_and_loans_through_books_view(self):
+        bus = EventBus()
+        events = []
+        bus.subscribe(None, events.append)
+        with ShardedBookManager(shards=3, event_bus=bus) as books:
+            users = UserManager()
+            loans = LoanManager(books, users)
+            book_id = books.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+            user_id = users.add_user("Anna", "anna@example.com")
+
+            loan_id = loans.loan_book(user_id, book_id)
+            assert books.get_book(book_id)["available"] is False
+            assert books.count_unavailable() == 1
+            assert books.find_books_by_title("hob", available=True) == []
+            loans.return_book(loan_id)
+            assert books.get_book(book_id)["available"] is True
+
+            books.remove_book(book_id)
+
+        assert isinstance(events[0], BookAdded)
+        assert isinstance(events[-1], BookRemoved)
+
+    def test_worker_survives_unexpected_error(self, sharded):
+        sharded.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        sharded.books[2] = {"title": "Bez autora", "available": True}
+
+        with pytest.raises(RuntimeError, match="KeyError: 'author'"):
+            sharded.find_books_by_author("tolkien")
+        # Oba shardy nadal działają i żadna odpowiedź nie została w potoku.
+        assert [b["title"] for b in sharded.find_books_by_title("o")] == [
+            "Hobbit",
+            "Bez autora",
+        ]
+        assert len(sharded.books) == 2
+        assert all(process.is_alive() for process in sharded._processes)
+
+    def test_close_stops_workers(self):
+        manager = ShardedBookManager(shards=2)
+        processes = list(manager._processes)
+        manager.close()
+        assert not any(process.is_alive() for process in processes)
+
+    def test_invalid_shard_count(self):
+        with pytest.raises(ValueError, match="Liczba shardów musi być dodatnia"):
+            ShardedBookManager(shards=0)
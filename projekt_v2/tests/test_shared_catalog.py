@@ -0,0 +1,84 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+import pytest
+
+from src.book_manager import BookManager
+from src.shared_catalog import SharedCatalog, SharedCatalogReader
+
+
+@pytest.fixture
+def book_manager():
+    bm = BookManager()
+    bm.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227", 1937)
+    bm.add_book("Władca Pierścieni", "J.R.R. Tolkien", "9780618640157")
+    bm.add_book("Diuna", "Frank Herbert", "9780441013593", 1965)
+    return bm
+
+
+@pytest.fixture
+def catalog(book_manager, request):
+    with SharedCatalog(book_manager, name=f"test_katalog_{id(request)}") as catalog:
+        yield catalog
+
+
+def search_in_child(name, queue):
+    with SharedCatalogReader(name) as reader:
+        queue.put([book["title"] for book in reader.find_books_by_author("tolkien")])
+
+
+class TestSharedCatalog:
+    def test_reader_sees_published_catalog(self, catalog, book_manager):
+        catalog.publish()
+        with SharedCatalogReader(catalog.name) as reader:
+            assert reader.get_book(3) == book_manager.get_book(3)
+            assert reader.list_books() == book_manager.list_books()
+            assert [b["title"] for b in reader.find_books_by_title("PIERŚ")] == [
+                "Władca Pierścieni"
+            ]
+            assert reader.find_books_by_author("tolkien") == (
+                book_manager.find_books_by_author("tolkien")
+            )
+            assert len(reader.find_books_by_title("")) == 3
+            assert reader.find_books_by_title("hobbit\nwład") == []
+            with pytest.raises(ValueError, match="Książka o ID 9 nie istnieje"):
+                reader.get_book(9)
+
+    def test_reader_switches_to_new_generation(self, catalog, book_manager):
+        catalog.publish()
+        reader = SharedCatalogReader(catalog.name)
+        assert reader.generation == 1
+
+        book_manager.update_book(1, new_title="Hobbit, czyli tam i z powrotem")
+        book_manager.remove_book(3)
+        assert catalog.publish() == 2
+        assert catalog.publish() == 3
+
+        assert reader.get_book(1)["title"] == "Hobbit, czyli tam i z powrotem"
+        assert reader.generation == 3
+        assert reader.find_books_by_author("herbert") == []
+        reader.close()
+
+    def test_old_generations_are_removed(self, catalog):
+        for _ in range(4):
+            catalog.publish()
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(f"{catalog.name}_g2")
+        assert [segment.name for segment in catalog._segments] == [
+            f"{catalog.name}_g3",
+            f"{catalog.name}_g4",
+        ]
+
+    def test_reader_in_other_process(self, catalog):
+        catalog.publish()
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=search_in_child, args=(catalog.name, queue)
+        )
+        process.start()
+        assert queue.get(timeout=10) == ["Hobbit", "Władca Pierścieni"]
+        process.join()
+
+    def test_unpublished_catalog(self, catalog):
+        with pytest.raises(ValueError, match="Katalog nie został jeszcze opublikowany"):
+            SharedCatalogReader(catalog.name)
@@ -0,0 +1,87 @@
+import pytest
+
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.snapshot import hydrate_library, load_library, save_library, snapshot_library
+from src.user_manager import UserManager
+
+
+@pytest.fixture
+def library():
+    book_manager = BookManager()
+    user_manager = UserManager()
+    loan_manager = LoanManager(book_manager, user_manager)
+    reservation_manager = ReservationManager(book_manager, user_manager)
+    category_manager = CategoryManager(book_manager)
+
+    book_id = book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227", 1937)
+    book_manager.books[book_id]["categories"] = []
+    category_manager.add_category("Fantasy")
+    category_manager.assign_category(book_id, "Fantasy")
+
+    anna = user_manager.add_user("Anna", "anna@example.com")
+    piotr = user_manager.add_user("Piotr", "piotr@example.com")
+    ewa = user_manager.add_user("Ewa", "ewa@example.com")
+    loan_manager.loan_book(anna, book_id)
+    reservation_manager.reserve_book(piotr, book_id)
+    reservation_manager.reserve_book(ewa, book_id)
+
+    return (
+        book_manager,
+        user_manager,
+        loan_manager,
+        reservation_manager,
+        category_manager,
+    )
+
+
+class TestSnapshotLibrary:
+    def test_file_roundtrip(self, library, tmp_path):
+        bm, um, lm, rm, cm = library
+        path = str(tmp_path / "library.json")
+        save_library(path, bm, um, lm, rm, cm)
+
+        restored = load_library(path)
+
+        assert restored["book_manager"].books == bm.books
+        assert restored["user_manager"].users == um.users
+        assert restored["loan_manager"].loans == lm.loans
+        assert restored["reservation_manager"].reservations == rm.reservations
+        assert restored["reservation_manager"].book_queues == {1: [1, 2]}
+        assert restored["category_manager"].categories == {"Fantasy"}
+
+    def test_counters_continue_after_hydrate(self, library, tmp_path):
+        path = str(tmp_path / "library.json")
+        save_library(path, *library)
+        restored = load_library(path)
+
+        assert restored["book_manager"].add_book("Dune", "Herbert", "1") == 2
+        assert restored["user_manager"].add_user("Jan", "jan@example.com") == 4
+        assert restored["reservation_manager"].next_id == 3
+
+    def test_hydrated_managers_are_wired(self, library, tmp_path):
+        path = str(tmp_path / "library.json")
+        save_library(path, *library)
+        restored = load_library(path)
+        lm = restored["loan_manager"]
+        rm = restored["reservation_manager"]
+
+        lm.return_book(1)
+        assert restored["book_manager"].get_book(1)["available"] is True
+        assert rm.book_returned(1) == 1
+        assert rm.get_position_in_queue(2) == 2
+        assert restored["category_manager"].get_books_by_category("Fantasy") == [1]
+
+    def test_queues_rebuilt_when_missing(self, library):
+        data = snapshot_library(*library)
+        del data["book_queues"]
+        restored = hydrate_library(data)
+        assert restored["reservation_manager"].book_queues == {1: [1, 2]}
+
+    def test_invalid_snapshot(self, tmp_path):
+        with pytest.raises(ValueError):
+            hydrate_library({"version": 99})
+        with pytest.raises(ValueError):
+            load_library(str(tmp_path / "missing.json"))
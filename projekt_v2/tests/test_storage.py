@@ -0,0 +1,167 @@
+import pytest
+
+from src.book_manager import BookManager
+from src.category_manager import CategoryManager
+from src.loan_manager import LoanManager
+from src.reservation_manager import ReservationManager
+from src.storage import SQLiteStorage, select
+from src.user_manager import UserManager
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "library.db")
+
+
+def build_library(storage):
+    book_manager = BookManager(storage)
+    user_manager = UserManager(storage)
+    return {
+        "book_manager": book_manager,
+        "user_manager": user_manager,
+        "category_manager": CategoryManager(book_manager, storage),
+        "loan_manager": LoanManager(book_manager, user_manager, storage),
+        "reservation_manager": ReservationManager(book_manager, user_manager, storage),
+    }
+
+
+class TestSQLiteTable:
+    def test_mapping_roundtrip(self):
+        storage = SQLiteStorage()
+        table = storage.table("books", indexes=("isbn",))
+        table[1] = {"title": "Hobbit", "isbn": "9780547928227"}
+        table[2] = {"title": "Dune", "isbn": "9780441013593"}
+
+        assert 1 in table
+        assert 3 not in table
+        assert len(table) == 2
+        assert list(table) == [1, 2]
+        assert table[1]["title"] == "Hobbit"
+        assert select(table, "isbn", "9780441013593") == [
+            (2, {"title": "Dune", "isbn": "9780441013593"})
+        ]
+
+        del table[1]
+        with pytest.raises(KeyError):
+            table[1]
+        with pytest.raises(KeyError):
+            del table[1]
+
+    def test_records_are_copies(self):
+        table = SQLiteStorage().table("books")
+        table[1] = {"title": "Hobbit", "categories": []}
+        book = table[1]
+        book["categories"].append("Fantasy")
+        assert table[1]["categories"] == []
+        table[1] = book
+        assert table[1]["categories"] == ["Fantasy"]
+
+    def test_wal_mode_enabled(self, db_path):
+        storage = SQLiteStorage(db_path)
+        mode = storage.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        storage.close()
+        assert mode == "wal"
+
+    def test_transaction_rollback(self):
+        storage = SQLiteStorage()
+        table = storage.table("users")
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                table[1] = {"name": "Jan"}
+                raise RuntimeError("przerwano")
+        assert 1 not in table
+
+
+class TestManagersOnStorage:
+    def test_loan_and_return_workflow(self, storage):
+        library = build_library(storage)
+        bm = library["book_manager"]
+        um = library["user_manager"]
+        lm = library["loan_manager"]
+
+        book_id = bm.add_book("1984", "George Orwell", "9780451524935", 1949)
+        user_id = um.add_user("John Doe", "john@example.com")
+
+        loan_id = lm.loan_book(user_id, book_id)
+        assert bm.get_book(book_id)["available"] is False
+
+        lm.return_book(loan_id)
+        assert bm.get_book(book_id)["available"] is True
+        assert lm.get_loan(loan_id)["returned"] is True
+
+    def test_reservation_queue_workflow(self, storage):
+        library = build_library(storage)
+        bm = library["book_manager"]
+        um = library["user_manager"]
+        lm = library["loan_manager"]
+        rm = library["reservation_manager"]
+
+        book_id = bm.add_book("Dune", "Frank Herbert", "9780441013593")
+        user1 = um.add_user("Anna", "anna@example.com")
+        user2 = um.add_user("Piotr", "piotr@example.com")
+        lm.loan_book(user1, book_id)
+
+        res_id = rm.reserve_book(user2, book_id)
+        with pytest.raises(ValueError):
+            rm.reserve_book(user2, book_id)
+        assert rm.get_position_in_queue(res_id) == 1
+
+        assert rm.book_returned(book_id) == res_id
+        assert rm.get_reservation(res_id)["status"] == "ready"
+        assert rm.list_reservations("ready")[0]["user_id"] == user2
+
+        rm.complete_reservation(res_id)
+        assert rm.get_reservation(res_id)["status"] == "completed"
+        assert rm.get_position_in_queue(res_id) == -1
+
+    def test_categories_workflow(self, storage):
+        library = build_library(storage)
+        bm = library["book_manager"]
+        cm = library["category_manager"]
+
+        book_id = bm.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+        bm.books[book_id] = dict(bm.get_book(book_id), categories=[])
+
+        cm.add_category("Fantasy")
+        cm.assign_category(book_id, "Fantasy")
+        assert cm.get_books_by_category("Fantasy") == [book_id]
+
+        cm.remove_category("Fantasy")
+        assert bm.get_book(book_id)["categories"] == []
+        assert cm.get_all_categories() == []
+
+    def test_update_persists(self, storage):
+        library = build_library(storage)
+        bm = library["book_manager"]
+        um = library["user_manager"]
+
+        book_id = bm.add_book("Old", "Author", "1234567890")
+        bm.update_book(book_id, new_title="New", new_year=2001)
+        assert bm.get_book(book_id)["title"] == "New"
+        assert bm.get_book(book_id)["year"] == 2001
+
+        user_id = um.add_user("Jan", "jan@example.com")
+        um.update_user(user_id, new_email="jan.k@example.com")
+        assert um.get_user(user_id)["email"] == "jan.k@example.com"
+
+
+class TestSQLitePersistence:
+    def test_reopen_restores_state(self, db_path):
+        storage = SQLiteStorage(db_path)
+        library = build_library(storage)
+        book_id = library["book_manager"].add_book("Dune", "Herbert", "9780441013593")
+        user1 = library["user_manager"].add_user("Anna", "anna@example.com")
+        user2 = library["user_manager"].add_user("Piotr", "piotr@example.com")
+        library["loan_manager"].loan_book(user1, book_id)
+        res_id = library["reservation_manager"].reserve_book(user2, book_id)
+        library["category_manager"].add_category("Sci-Fi")
+        storage.close()
+
+        storage = SQLiteStorage(db_path)
+        library = build_library(storage)
+        assert library["book_manager"].get_book(book_id)["available"] is False
+        assert library["book_manager"].next_id == book_id + 1
+        assert library["user_manager"].next_id == user2 + 1
+        assert library["reservation_manager"].book_queues == {book_id: [res_id]}
+        assert "Sci-Fi" in library["category_manager"].categories
+        storage.close()
@@ -0,0 +1,143 @@
+import asyncio
+import json
+
+import pytest
+
+from src.library import Library
+from src.tracing import (
+    JsonLinesExporter,
+    Tracer,
+    current_span,
+    set_tracer,
+    span,
+    traced,
+)
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = str(tmp_path / "spans.jsonl")
+    exporter = JsonLinesExporter(path, buffer_spans=1)
+    yield path, exporter
+    set_tracer(None)
+    exporter.close()
+
+
+def read_spans(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def make_library():
+    library = Library()
+    library.book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+    library.user_manager.add_user("Anna", "anna@example.com")
+    library.user_manager.add_user("Piotr", "piotr@example.com")
+    return library
+
+
+class TestTracing:
+    def test_disabled_by_default(self):
+        with span("cokolwiek") as active:
+            active.set_attribute("klucz", 1)
+            assert current_span() is None
+
+    def test_reserve_book_spans(self, trace_file):
+        path, exporter = trace_file
+        library = make_library()
+        library.loan_manager.loan_book(1, 1)
+        set_tracer(Tracer(exporter))
+
+        library.reservation_manager.reserve_book(2, 1)
+
+        spans = {item["name"]: item for item in read_spans(path)}
+        root = spans["reservations.reserve_book"]
+        assert "parentSpanId" not in root
+        for child in (
+            "users.get_user",
+            "books.get_book",
+            "reservations.duplicate_scan",
+            "reservations.queue_append",
+        ):
+            assert spans[child]["parentSpanId"] == root["spanId"]
+            assert spans[child]["traceId"] == root["traceId"]
+        assert spans["users.get_user"]["attributes"] == [
+            {"key": "user_id", "value": {"intValue": "2"}}
+        ]
+        assert int(root["endTimeUnixNano"]) >= int(root["startTimeUnixNano"])
+        assert root["status"] == {"code": "STATUS_CODE_OK"}
+        assert root["kind"] == "SPAN_KIND_INTERNAL"
+
+    def test_event_driven_call_is_child_span(self, trace_file):
+        path, exporter = trace_file
+        library = make_library()
+        loan_id = library.loan_book(1, 1)
+        library.reserve_book(2, 1)
+        set_tracer(Tracer(exporter))
+
+        library.return_book(loan_id)
+
+        spans = {item["name"]: item for item in read_spans(path)}
+        assert (
+            spans["reservations.book_returned"]["parentSpanId"]
+            == spans["loans.return_book"]["spanId"]
+        )
+        assert (
+            spans["loans.return_book"]["parentSpanId"]
+            == spans["library.return_book"]["spanId"]
+        )
+
+    def test_error_status(self, trace_file):
+        path, exporter = trace_file
+        set_tracer(Tracer(exporter))
+        with pytest.raises(ValueError):
+            make_library().loan_manager.loan_book(9, 1)
+
+        spans = {item["name"]: item for item in read_spans(path)}
+        assert spans["loans.loan_book"]["status"] == {
+            "code": "STATUS_CODE_ERROR",
+            "message": "ValueError: Użytkownik o ID 9 nie istnieje",
+        }
+
+    def test_sampling_keeps_or_drops_whole_traces(self, trace_file):
+        path, exporter = trace_file
+        set_tracer(Tracer(exporter, sample_rate=0.3, seed=1))
+
+        @traced("zewnętrzny")
+        def outer():
+            with span("wewnętrzny"):
+                pass
+
+        for _ in range(200):
+            outer()
+
+        spans = read_spans(path)
+        roots = [item for item in spans if item["name"] == "zewnętrzny"]
+        children = [item for item in spans if item["name"] == "wewnętrzny"]
+        assert 30 < len(roots) < 90
+        assert {item["parentSpanId"] for item in children} == {
+            item["spanId"] for item in roots
+        }
+
+    def test_context_propagates_to_asyncio_tasks(self, trace_file):
+        path, exporter = trace_file
+        set_tracer(Tracer(exporter))
+
+        async def child():
+            with span("zadanie"):
+                await asyncio.sleep(0)
+
+        async def main():
+            with span("główny"):
+                await asyncio.gather(child(), child())
+
+        asyncio.run(main())
+        spans = read_spans(path)
+        root = next(item for item in spans if item["name"] == "główny")
+        tasks = [item for item in spans if item["name"] == "zadanie"]
+        assert len(tasks) == 2
+        assert all(item["parentSpanId"] == root["spanId"] for item in tasks)
+
+    def test_invalid_sample_rate(self, trace_file):
+        with pytest.raises(ValueError, match="Częstość próbkowania"):
+            Tracer(trace_file[1], sample_rate=1.5)
@@ -1,5 +1,13 @@
 import pytest
-from src.utils import validate_email, validate_isbn, validate_user_id
+from src.utils import (
+    normalize_isbn,
+    validate_email,
+    validate_emails,
+    validate_isbn,
+    validate_isbn_checksum,
+    validate_isbns,
+    validate_user_id,
+)
 
 
 class TestValidateEmail:
@@ -40,6 +48,60 @@ class TestValidateISBN:
             validate_isbn(1234567890)
 
 
+class TestValidateISBNChecksum:
+    @pytest.mark.parametrize(
+        "isbn,expected",
+        [
+            ("9780547928227", True),
+            ("9780306406157", True),
+            ("9780306406158", False),
+            ("0306406152", True),
+            ("0306406153", False),
+            ("080442957X", True),
+            ("080442957x", True),
+            ("12345678X0", False),
+            ("1234567890", False),
+            ("978030640615", False),
+            ("９７８０３０６４０６１５７", False),
+            (None, False),
+        ],
+    )
+    def test_validate_isbn_checksum(self, isbn, expected):
+        assert validate_isbn_checksum(isbn) == expected
+
+    @pytest.mark.parametrize(
+        "isbn,expected",
+        [
+            ("0306406152", "9780306406157"),
+            ("0-306-40615-2", "9780306406157"),
+            ("080442957x", "9780804429573"),
+            ("978-0-306-40615-7", "9780306406157"),
+            ("0306406153", None),
+            (1234567890, None),
+        ],
+    )
+    def test_normalize_isbn(self, isbn, expected):
+        assert normalize_isbn(isbn) == expected
+
+
+class TestBatchValidators:
+    def test_validate_emails_mask(self):
+        emails = ["test@example.com", "invalid-email", None, "user.name@domain.co"]
+        assert validate_emails(emails) == [True, False, False, True]
+
+    def test_validate_emails_accepts_generator(self):
+        emails = (f"user{i}@example.com" for i in range(3))
+        assert validate_emails(emails) == [True, True, True]
+
+    def test_validate_isbns_checksum_mask(self):
+        isbns = ["9780547928227", "1234567890", "0306406152", None]
+        assert validate_isbns(isbns) == [True, False, True, False]
+
+    def test_validate_isbns_format_only(self):
+        isbns = ["1234567890", "1234567890123", "12345", 42]
+        assert validate_isbns(isbns, checksum=False) == [True, True, False, False]
+
+
 class TestValidateUserID:
     @pytest.mark.parametrize(
         "user_id,expected",
@@ -0,0 +1,206 @@
+import asyncio
+
+import pytest
+
+from src.book_manager import BookManager
+from src.cdc import ChangeFeed
+from src.library import Library
+from src.snapshot import hydrate_library, snapshot_library
+from src.storage import SQLiteStorage
+from src.vacuum import Vacuum
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def library(request):
+    storage = SQLiteStorage() if request.param == "sqlite" else None
+    library = Library(storage)
+    for title in ("Hobbit", "Diuna", "Solaris"):
+        library.book_manager.add_book(title, "Autor", "9780547928227")
+    for name in ("Anna", "Piotr", "Ewa"):
+        library.user_manager.add_user(name, f"{name.lower()}@example.com")
+    return library
+
+
+def vacuum_for(library, batch_size=100):
+    return Vacuum(
+        library.book_manager,
+        library.user_manager,
+        library.loan_manager,
+        library.reservation_manager,
+        batch_size=batch_size,
+    )
+
+
+class TestVacuum:
+    def test_removed_book_is_tombstoned_until_vacuum(self, library):
+        loan_id = library.loan_book(1, 1)
+        reservation_id = library.reserve_book(2, 1)
+        library.book_manager.remove_book(1)
+
+        assert 1 not in library.book_manager.books
+        assert library.book_manager.tombstones[1]["record"]["title"] == "Hobbit"
+        assert loan_id in library.loan_manager.loans
+
+        vacuum = vacuum_for(library)
+        assert vacuum.pending() == 1
+        assert vacuum.step() == 1
+        assert vacuum.pending() == 0
+        assert library.loan_manager.get_loan(loan_id)["returned"] is True
+        reservation = library.reservation_manager.get_reservation(reservation_id)
+        assert reservation["status"] == "cancelled"
+        assert 1 not in library.reservation_manager.book_queues
+
+    def test_removed_user_returns_loans_and_promotes_queue(self, library):
+        loan_id = library.loan_book(1, 1)
+        waiting = library.reserve_book(2, 1)
+        other_loan = library.loan_book(3, 2)
+        library.user_manager.remove_user(1)
+
+        vacuum_for(library).run_until_empty()
+
+        assert library.book_manager.get_book(1)["available"] is True
+        assert library.loan_manager.get_loan(loan_id)["returned"] is True
+        assert library.loan_manager.get_loan(other_loan)["returned"] is False
+        reservation = library.reservation_manager.get_reservation(waiting)
+        assert reservation["status"] == "ready"
+
+    def test_ready_reservation_of_removed_user_passes_to_next(self, library):
+        loan_id = library.loan_book(1, 1)
+        first = library.reserve_book(2, 1)
+        second = library.reserve_book(3, 1)
+        library.return_book(loan_id)
+        library.user_manager.remove_user(2)
+
+        vacuum_for(library).run_until_empty()
+
+        status = library.reservation_manager.get_reservation(first)["status"]
+        assert status == "cancelled"
+        assert library.reservation_manager.book_queues[1] == [second]
+        status = library.reservation_manager.get_reservation(second)["status"]
+        assert status == "ready"
+
+    def test_batches(self, library):
+        for book_id in (1, 2, 3):
+            library.book_manager.remove_book(book_id)
+        library.user_manager.remove_user(1)
+        vacuum = vacuum_for(library, batch_size=2)
+        assert [vacuum.step(), vacuum.step(), vacuum.step()] == [2, 2, 0]
+
+    def test_removals_reach_change_feed(self, library):
+        feed = ChangeFeed(library.event_bus)
+        loan_id = library.loan_book(1, 1)
+        reservation_id = library.reserve_book(2, 1)
+        library.book_manager.remove_book(1)
+        vacuum_for(library).step()
+
+        changes = feed.read(1)
+        deletes = [(c.table, c.key) for c in changes if c.op == "delete"]
+        assert deletes == [("books", 1)]
+        cancelled = [c for c in changes if c.table == "reservations"][-1]
+        assert (cancelled.op, cancelled.key) == ("update", reservation_id)
+        assert cancelled.record["status"] == "cancelled"
+        closed = changes[-1]
+        assert (closed.table, closed.op, closed.key) == ("loans", "update", loan_id)
+        assert closed.record["returned"] is True
+
+    def test_loan_history_survives(self, library):
+        returned = library.loan_book(1, 1)
+        library.return_book(returned)
+        returned_by_removed_user = library.loan_book(2, 2)
+        library.return_book(returned_by_removed_user)
+        library.book_manager.remove_book(1)
+        library.user_manager.remove_user(2)
+
+        vacuum_for(library).run_until_empty()
+
+        assert library.loan_manager.get_loan(returned) == {
+            "user_id": 1,
+            "book_id": 1,
+            "returned": True,
+        }
+        loan = library.loan_manager.get_loan(returned_by_removed_user)
+        assert loan["user_id"] == 2 and loan["returned"] is True
+        assert len(library.loan_manager.loans) == 2
+
+    def test_reservation_history_survives(self, library):
+        rm = library.reservation_manager
+        loan_id = library.loan_book(1, 1)
+        completed = library.reserve_book(2, 1)
+        cancelled = library.reserve_book(3, 1)
+        rm.cancel_reservation(cancelled)
+        library.return_book(loan_id)
+        library.collect_reservation(completed)
+        finished = {
+            reservation_id: dict(rm.get_reservation(reservation_id))
+            for reservation_id in (completed, cancelled)
+        }
+        library.book_manager.remove_book(1)
+        library.user_manager.remove_user(2)
+
+        vacuum_for(library).run_until_empty()
+
+        for reservation_id, reservation in finished.items():
+            assert rm.get_reservation(reservation_id) == reservation
+        assert len(rm.reservations) == 2
+
+    def test_background_task(self, library):
+        library.user_manager.remove_user(3)
+        vacuum = vacuum_for(library)
+
+        async def scenario():
+            task = asyncio.create_task(vacuum.run(interval=0.01))
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+        asyncio.run(scenario())
+        assert vacuum.pending() == 0
+
+
+def test_tombstoned_ids_are_not_reused_after_reopen(tmp_path):
+    path = str(tmp_path / "library.db")
+    storage = SQLiteStorage(path)
+    library = Library(storage)
+    library.book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+    library.book_manager.add_book("Diuna", "Frank Herbert", "9780441013593")
+    library.user_manager.add_user("Anna", "anna@example.com")
+    library.book_manager.remove_book(2)
+    storage.close()
+
+    storage = SQLiteStorage(path)
+    library = Library(storage)
+    book_id = library.book_manager.add_book("Solaris", "Stanisław Lem", "1")
+    assert book_id == 3
+    loan_id = library.loan_book(1, book_id)
+
+    vacuum_for(library).run_until_empty()
+    assert library.book_manager.get_book(book_id)["available"] is False
+    assert library.loan_manager.get_loan(loan_id)["returned"] is False
+    storage.close()
+
+    # Również po sprzątnięciu tombstone ID nie wraca do obiegu.
+    storage = SQLiteStorage(path)
+    assert BookManager(storage).add_book("Lalka", "Bolesław Prus", "1") == 4
+    storage.close()
+
+
+def test_tombstones_survive_snapshot():
+    library = Library()
+    library.book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+    library.book_manager.remove_book(1)
+    restored = hydrate_library(
+        snapshot_library(
+            library.book_manager,
+            library.user_manager,
+            library.loan_manager,
+            library.reservation_manager,
+            library.category_manager,
+        )
+    )
+    assert list(restored["book_manager"].tombstones) == [1]
+    assert not restored["user_manager"].tombstones
+
+
+def test_invalid_batch_size():
+    library = Library()
+    with pytest.raises(ValueError, match="Rozmiar partii musi być dodatni"):
+        vacuum_for(library, batch_size=0)
@@ -0,0 +1,155 @@
+import time
+from datetime import date
+
+import pytest
+
+from src.library import Library
+from src.workload import WorkloadRecorder, read_trace, replay
+
+
+def make_library():
+    library = Library()
+    library.book_manager.add_book("Hobbit", "J.R.R. Tolkien", "9780547928227")
+    library.book_manager.add_book("Diuna", "Frank Herbert", "9780441013593")
+    library.user_manager.add_user("Anna", "anna@example.com")
+    library.user_manager.add_user("Piotr", "piotr@example.com")
+    return library
+
+
+def managers_of(library):
+    return {
+        "books": library.book_manager,
+        "users": library.user_manager,
+        "loans": library.loan_manager,
+        "reservations": library.reservation_manager,
+    }
+
+
+def run_workload(library):
+    bm = library.book_manager
+    lm = library.loan_manager
+    rm = library.reservation_manager
+    bm.find_books_by_title("hob")
+    loan_id = lm.loan_book(1, 1)
+    rm.reserve_book(2, 1)
+    lm.return_book(loan_id)
+    bm.update_book(2, new_year=1965)
+    with pytest.raises(ValueError):
+        lm.loan_book(1, 99)
+
+
+@pytest.fixture(params=["slad.ndjson", "slad.ndjson.gz"])
+def trace_path(request, tmp_path):
+    return str(tmp_path / request.param)
+
+
+class TestWorkloadRecorder:
+    def test_records_top_level_calls(self, trace_path):
+        library = make_library()
+        with WorkloadRecorder(trace_path).attach(**managers_of(library)) as recorder:
+            run_workload(library)
+
+        assert recorder.calls == 6
+        entries = list(read_trace(trace_path))
+        # book_returned wywołane przez szynę zdarzeń nie jest zapisywane.
+        assert [(name, method) for _, name, method, _, _ in entries] == [
+            ("books", "find_books_by_title"),
+            ("loans", "loan_book"),
+            ("reservations", "reserve_book"),
+            ("loans", "return_book"),
+            ("books", "update_book"),
+            ("loans", "loan_book"),
+        ]
+        assert entries[4][3:] == ([2], {"new_year": 1965})
+        offsets = [entry[0] for entry in entries]
+        assert offsets == sorted(offsets)
+
+    def test_detach_restores_methods(self, trace_path):
+        library = make_library()
+        recorder = WorkloadRecorder(trace_path).attach(books=library.book_manager)
+        recorder.close()
+        assert "get_book" not in vars(library.book_manager)
+
+    @pytest.mark.parametrize("first_closed", [0, 1])
+    def test_nested_recorders_detach_in_any_order(self, trace_path, first_closed):
+        library = make_library()
+        bm = library.book_manager
+        recorders = [
+            WorkloadRecorder(f"{trace_path}.{index}").attach(books=bm)
+            for index in range(2)
+        ]
+        bm.get_book(1)
+        recorders[first_closed].close()
+        bm.search_books("diuna")
+        assert "get_book" in vars(bm)
+        recorders[1 - first_closed].close()
+        bm.get_book(1)
+        assert "get_book" not in vars(bm)
+
+        # Zamknięty wcześniej rejestrator niczego już nie dopisał.
+        assert recorders[first_closed].calls == 1
+        assert recorders[1 - first_closed].calls == 2
+        entries = list(read_trace(f"{trace_path}.{1 - first_closed}"))
+        assert entries[1][1:4] == ("books", "search_books", ["diuna"])
+
+    def test_unserializable_arguments_do_not_break_calls(self, trace_path):
+        library = make_library()
+        bm = library.book_manager
+        with WorkloadRecorder(trace_path).attach(books=bm) as recorder:
+            row = {"title": "Solaris", "author": "Lem", "isbn": "1"}
+            first = bm.add_books([{**row, "year": date(1961, 1, 1), "tags": {"sf"}}])
+            second = bm.add_books([{**row, ("klucz", "krotka"): None}])
+
+        assert bm.get_book(first[0])["year"] == date(1961, 1, 1)
+        assert bm.get_book(second[0])["title"] == "Solaris"
+        assert (recorder.calls, recorder.dropped) == (1, 1)
+        [entry] = read_trace(trace_path)
+        assert entry[3] == [[{**row, "year": "1961-01-01", "tags": ["sf"]}]]
+
+    def test_unknown_manager(self, trace_path):
+        with WorkloadRecorder(trace_path) as recorder:
+            with pytest.raises(ValueError, match="Nieznany manager: shelves"):
+                recorder.attach(shelves=object())
+
+
+class TestReplay:
+    def test_replay_reproduces_state(self, trace_path):
+        recorded = make_library()
+        with WorkloadRecorder(trace_path).attach(**managers_of(recorded)):
+            run_workload(recorded)
+
+        replayed = make_library()
+        report = replay(trace_path, **managers_of(replayed))
+
+        assert replayed.reservation_manager.get_reservation(1)["status"] == "ready"
+        assert replayed.book_manager.get_book(2)["year"] == 1965
+        summary = report.summary()
+        assert summary["loans.loan_book"]["count"] == 2
+        assert summary["loans.loan_book"]["errors"] == 1
+        assert set(summary["loans.return_book"]) == {
+            "count",
+            "errors",
+            "throughput",
+            "p50",
+            "p95",
+            "p99",
+            "max",
+        }
+        assert "razem 6 wywołań" in report.format()
+
+    def test_scaled_speed(self, trace_path):
+        library = make_library()
+        with WorkloadRecorder(trace_path).attach(books=library.book_manager):
+            library.book_manager.get_book(1)
+            time.sleep(0.05)
+            library.book_manager.get_book(2)
+
+        report = replay(trace_path, speed=2.0, books=make_library().book_manager)
+        assert 0.02 <= report.elapsed < 0.05
+
+    def test_missing_manager(self, trace_path):
+        library = make_library()
+        with WorkloadRecorder(trace_path).attach(books=library.book_manager):
+            library.book_manager.get_book(1)
+        with pytest.raises(ValueError, match="Brak managera dla śladu: books"):
+            replay(trace_path, loans=library.loan_manager)